@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Benchmark of the time taken to refresh an input branch of the pipeline tree
+after a status change, against the number of variables in the branch.
+
+The incremental update, which only touches the items whose status changed,
+is compared with rebuilding every item of the branch. Run with::
+
+    $ python benchmarks/pipeline_refresh.py
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import sys
+import timeit
+from collections import OrderedDict
+
+from PyQt4 import QtCore, QtGui
+
+from dtocean_app.pipeline import (InputBranchControl,
+                                  PipelineFilterProxyModel,
+                                  PipelineItemModel)
+
+N_VARIABLES = [100, 500, 1000, 2000, 5000]
+REPEATS = 5
+STATUSES = ["required", "optional", "satisfied"]
+
+
+class MockMetaData(object):
+
+    def __init__(self, identifier):
+        self.identifier = identifier
+        self.title = identifier.title()
+
+
+class MockVariable(object):
+
+    def __init__(self, var_id):
+        self._id = var_id
+
+    def get_metadata(self, core):
+        return MockMetaData(self._id)
+
+
+class MockBranch(object):
+
+    def __init__(self, n_variables):
+        self.input_status = OrderedDict()
+        for i in range(n_variables):
+            var_id = "variable.{}".format(i)
+            self.input_status[var_id] = STATUSES[i % len(STATUSES)]
+
+    def get_input_status(self, core, project):
+        return OrderedDict(self.input_status)
+
+    def get_inputs(self, core, project):
+        return self.input_status.keys()
+
+    def get_input_variable(self, core, project, var_id):
+        return MockVariable(var_id)
+
+
+class MockCore(object):
+
+    def get_branch_status(self, project, branch, outputs=False):
+        return branch.get_input_status(self, project)
+
+
+class MockShell(object):
+
+    def __init__(self):
+        self.core = MockCore()
+        self.project = None
+
+
+def make_branch_control(n_variables):
+
+    model = PipelineItemModel()
+    proxy = PipelineFilterProxyModel()
+    proxy.setSourceModel(model)
+    proxy.setDynamicSortFilter(True)
+
+    view = QtGui.QTreeView()
+    view.setModel(proxy)
+
+    address = "Inputs.Branch"
+    user_dict = {"address": address,
+                 "visible": True,
+                 "section": "branch",
+                 "status": None}
+
+    item = QtGui.QStandardItem("Branch")
+    item.setData(address, QtCore.Qt.UserRole)
+    item.setData((user_dict,), 33)
+    model.appendRow(item)
+
+    control = InputBranchControl(address,
+                                 "Branch",
+                                 view,
+                                 model,
+                                 proxy,
+                                 "Inputs",
+                                 MockBranch(n_variables))
+    control._make_input_items(MockShell())
+
+    # Keep the view alive with the control
+    control._bench_view = view
+
+    return control
+
+
+def time_rebuild(control, shell):
+
+    def rebuild():
+        index = control._get_index_from_address()
+        item = control._model.itemFromIndex(index)
+        control._clear(item)
+        control._make_input_items(shell, item)
+
+    return min(timeit.repeat(rebuild, number=1, repeat=REPEATS))
+
+
+def time_update(control, shell):
+
+    input_status = control._branch.input_status
+    var_id = input_status.keys()[0]
+
+    def update():
+        if input_status[var_id] == "satisfied":
+            input_status[var_id] = "required"
+        else:
+            input_status[var_id] = "satisfied"
+        control._update_status(shell)
+
+    return min(timeit.repeat(update, number=1, repeat=REPEATS))
+
+
+def main():
+
+    app = QtGui.QApplication(sys.argv)
+    shell = MockShell()
+
+    print "{:>10} {:>14} {:>14}".format("Variables",
+                                        "Rebuild [ms]",
+                                        "Update [ms]")
+
+    for n_variables in N_VARIABLES:
+
+        control = make_branch_control(n_variables)
+
+        rebuild = time_rebuild(control, shell)
+        update = time_update(control, shell)
+
+        print "{:>10} {:>14.1f} {:>14.1f}".format(n_variables,
+                                                  rebuild * 1e3,
+                                                  update * 1e3)
+
+    app.quit()
+
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -101,6 +101,106 @@ def start_logging(debug=False):
 
 def get_log_dir():
     
+    userdir = UserDataDirectory("dtocean_app", "DTOcean", "config")
+    files_config = _get_files_config()
+    
+    appdir_path = userdir.get_path("..")
+    log_folder = files_config["logs"]["path"]
+    log_path = os.path.join(appdir_path, log_folder)
+    logdir = Directory(log_path)
+    
+    return logdir
+
+
+def get_save_options():
+    
+    """Return the options used for saving .dto archives, as a dictionary
+    with keys "compression", "level" and "incremental"."""
+    
+    files_config = _get_files_config()
+    
+    # Older user configurations may not have a save section
+    save_config = {"compression": "gzip",
+                   "level": 6,
+                   "incremental": True}
+    
+    if "save" in files_config:
+        save_config.update(files_config["save"])
+    
+    save_options = {"compression": str(save_config["compression"]),
+                    "level": int(save_config["level"]),
+                    "incremental": _parse_bool(save_config["incremental"])}
+    
+    return save_options
+
+
+def get_autosave_dir():
+    
+    userdir = UserDataDirectory("dtocean_app", "DTOcean", "config")
+    files_config = _get_files_config()
+    
+    # Older user configurations may not have an autosave section
+    autosave_folder = "autosave"
+    
+    if "autosave" in files_config and "path" in files_config["autosave"]:
+        autosave_folder = files_config["autosave"]["path"]
+    
+    appdir_path = userdir.get_path("..")
+    autosave_path = os.path.join(appdir_path, autosave_folder)
+    autosavedir = Directory(autosave_path)
+    
+    return autosavedir
+
+
+def get_autosave_options():
+    
+    """Return the options used for autosaving projects, as a dictionary
+    with keys "enabled", "interval" (in minutes) and "snapshots"."""
+    
+    files_config = _get_files_config()
+    
+    autosave_config = {"enabled": True,
+                       "interval": 10,
+                       "snapshots": 3}
+    
+    if "autosave" in files_config:
+        autosave_config.update(files_config["autosave"])
+    
+    autosave_options = {
+                    "enabled": _parse_bool(autosave_config["enabled"]),
+                    "interval": float(autosave_config["interval"]),
+                    "snapshots": int(autosave_config["snapshots"])}
+    
+    return autosave_options
+
+
+def get_cache_options():
+    
+    """Return the options used for caching display widgets, as a
+    dictionary with key "widget_memory" (in MB)."""
+    
+    files_config = _get_files_config()
+    
+    cache_config = {"widget_memory": 256}
+    
+    if "cache" in files_config:
+        cache_config.update(files_config["cache"])
+    
+    cache_options = {"widget_memory": float(cache_config["widget_memory"])}
+    
+    return cache_options
+
+
+def _parse_bool(value):
+    
+    if isinstance(value, basestring):
+        value = value.strip().lower() in ["true", "yes", "1"]
+    
+    return bool(value)
+
+
+def _get_files_config():
+    
     userdir = UserDataDirectory("dtocean_app", "DTOcean", "config")
     
     # Look for files.ini
@@ -112,12 +212,7 @@ def get_log_dir():
     files_ini = ReadINI(configdir, "files.ini")
     files_config = files_ini.get_config()
     
-    appdir_path = userdir.get_path("..")
-    log_folder = files_config["logs"]["path"]
-    log_path = os.path.join(appdir_path, log_folder)
-    logdir = Directory(log_path)
-    
-    return logdir
+    return files_config
 
 
 #def main(debug=False, trace_warnings=False):
@@ -217,6 +312,9 @@ def main_(debug=False, trace_warnings=False, force_quit=False):
     
     splash.finish(main_window)
     
+    # Offer to recover from any crash and start autosaving
+    main_window.start_autosave()
+    
     if not force_quit:
         sys.exit(app.exec_())
     
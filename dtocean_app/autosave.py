@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Rolling journal of autosave snapshots of the open project.
+
+Snapshots are complete .dto archives, which are moved into the journal only
+once fully written, and carry an extra member recording the path and title
+of the project they were taken from. The journal is cleared whenever the
+project is saved or closed, so any snapshots found when the application
+starts were left behind by a crash.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import os
+import glob
+import logging
+import datetime
+
+from .storage import (AUTOSAVE_NAME,
+                      MANIFEST_NAME,
+                      get_extra_member,
+                      read_manifest)
+from .utils.archive import ArchiveReader
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = "autosave-"
+
+
+class AutosaveJournal(object):
+
+    """Rolling journal of project snapshots, kept in a directory.
+
+    Args:
+        path (str): the journal directory
+        size (int, optional): the number of snapshots to keep
+
+    """
+
+    def __init__(self, path, size=3):
+
+        if size < 1:
+
+            errStr = ("At least one autosave snapshot must be kept. Given "
+                      "size is {}").format(size)
+            raise ValueError(errStr)
+
+        self.path = path
+        self._size = size
+
+        return
+
+    def get_new_path(self):
+
+        """Return the path for a new snapshot, which sorts after all the
+        existing snapshots"""
+
+        if not os.path.isdir(self.path): os.makedirs(self.path)
+
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        file_name = "{}{}.dto".format(SNAPSHOT_PREFIX, stamp)
+
+        return os.path.join(self.path, file_name)
+
+    def get_snapshots(self):
+
+        """Return the paths of the snapshots in the journal, newest first"""
+
+        pattern = os.path.join(self.path, "{}*.dto".format(SNAPSHOT_PREFIX))
+        snapshot_paths = sorted(glob.glob(pattern), reverse=True)
+
+        return snapshot_paths
+
+    def find_recoverable(self):
+
+        """Return the path and details of the newest snapshot which can be
+        read, or None if there are none"""
+
+        for snapshot_path in self.get_snapshots():
+
+            info = read_snapshot_info(snapshot_path)
+
+            if info is not None: return snapshot_path, info
+
+        return None
+
+    def remove(self, snapshot_path):
+
+        try:
+            os.remove(snapshot_path)
+        except OSError:
+            msg = "Failed to remove autosave snapshot {}".format(
+                                                                snapshot_path)
+            module_logger.debug(msg, exc_info=True)
+
+        return
+
+    def prune(self, keep=None):
+
+        """Remove all but the newest snapshots and any partial snapshots.
+        The snapshot at path keep, which may be linked to the open project,
+        is never removed."""
+
+        snapshot_paths = self.get_snapshots()
+
+        for snapshot_path in snapshot_paths[self._size:]:
+            if not _is_same_file(snapshot_path, keep):
+                self.remove(snapshot_path)
+
+        # Partial snapshots left by a crash
+        pattern = os.path.join(self.path,
+                               ".{}*.part".format(SNAPSHOT_PREFIX))
+
+        for part_path in glob.glob(pattern): self.remove(part_path)
+
+        return
+
+    def clear(self, keep=None):
+
+        """Remove all snapshots, except for the snapshot at path keep"""
+
+        for snapshot_path in self.get_snapshots():
+            if not _is_same_file(snapshot_path, keep):
+                self.remove(snapshot_path)
+
+        return
+
+
+def read_snapshot_info(snapshot_path):
+
+    """Return the details recorded in an autosave snapshot, or None if the
+    snapshot can not be read"""
+
+    try:
+
+        with ArchiveReader(snapshot_path, MANIFEST_NAME) as archive:
+
+            manifest = read_manifest(archive)
+            member = get_extra_member(archive, manifest, AUTOSAVE_NAME)
+
+            if member is None:
+                errStr = "Snapshot has no autosave details"
+                raise KeyError(errStr)
+
+            info = archive.read_json(member)
+
+    except Exception:
+
+        msg = "Autosave snapshot {} is not readable".format(snapshot_path)
+        module_logger.debug(msg, exc_info=True)
+
+        return None
+
+    return info
+
+
+def _is_same_file(path, other):
+
+    if other is None: return False
+
+    path = os.path.normcase(os.path.abspath(path))
+    other = os.path.normcase(os.path.abspath(other))
+
+    return path == other
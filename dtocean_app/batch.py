@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Headless execution of saved projects, for use on compute nodes and with job
+schedulers. No QApplication or widgets are created.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import sys
+import time
+import logging
+import argparse
+import datetime
+
+from dtocean_core.menu import ModuleMenu, ThemeMenu
+
+from . import get_save_options
+from .core import GUICore
+from .storage import read_project_file, write_project_file
+from .utils import SmartFormatter
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+MODES = ["auto", "strategy", "current", "modules", "themes"]
+
+
+def get_core():
+
+    """Create a GUICore ready for executing projects"""
+
+    core = GUICore()
+    core._create_data_catalog()
+    core._create_control()
+    core._create_sockets()
+
+    return core
+
+
+def run_project(core, project, strategy=None, mode="auto"):
+
+    """Execute a project, as done by the GUI's run actions.
+
+    Args:
+        core (GUICore): the core
+        project (GUIProject): the project to execute
+        strategy (GUIStrategy, optional): the project's strategy
+        mode (str, optional): one of "strategy" (run the strategy),
+            "current" (run the current module and then the themes),
+            "modules" (run all scheduled modules and then the themes),
+            "themes" (run the themes only) or "auto" (run the strategy if
+            there is one, otherwise as "modules")
+
+    """
+
+    if mode not in MODES:
+
+        errStr = ("Argument mode must be one of {}. Given value is "
+                  "'{}'").format(", ".join(MODES), mode)
+        raise ValueError(errStr)
+
+    if mode == "auto":
+        mode = "modules" if strategy is None else "strategy"
+
+    if mode == "strategy":
+
+        if strategy is None:
+            errStr = "The project has no strategy to execute"
+            raise ValueError(errStr)
+
+        _run_blocked(core, project, strategy.execute)
+
+        # Emit signals on project
+        project.sims_updated.emit()
+        project.active_index_changed.emit()
+
+        # If the strategy is no longer active release the hidden variables
+        if not strategy.allow_run(core, project):
+            [sim.set_unavailable_variables()
+                                        for sim in project._simulations]
+            project._set_all_changed()
+
+        core.set_interface_status(project)
+
+        return
+
+    module_menu = ModuleMenu()
+    theme_menu = ThemeMenu()
+
+    if mode == "current":
+
+        if module_menu.get_current(core, project) is not None:
+            _run_blocked(core, project, module_menu.execute_current)
+            core.set_interface_status(project)
+
+    elif mode == "modules":
+
+        while module_menu.get_current(core, project) is not None:
+
+            msg = "Executing module '{}'".format(
+                                    module_menu.get_current(core, project))
+            module_logger.info(msg)
+
+            _run_blocked(core, project, module_menu.execute_current)
+            core.set_interface_status(project)
+
+    if theme_menu.get_scheduled(core, project):
+        _run_blocked(core, project, theme_menu.execute_all)
+        core.set_interface_status(project)
+
+    return
+
+
+def run_batch(file_path, save_path=None, mode="auto"):
+
+    """Open a .dto or .prj project file, execute it and save the result.
+
+    Args:
+        file_path (str): path to the project file
+        save_path (str, optional): path to save the result to, defaulting to
+            the path the project was opened from
+        mode (str, optional): execution mode, as for run_project
+
+    """
+
+    start = time.time()
+    core = get_core()
+
+    msg = "Core ready in {:.1f}s".format(time.time() - start)
+    module_logger.info(msg)
+
+    project_file = read_project_file(core, file_path)
+    project = project_file["project"]
+
+    msg = "Opened project '{}' from {}".format(project.title, file_path)
+    module_logger.info(msg)
+
+    run_project(core, project, project_file["strategy"], mode)
+
+    if save_path is None: save_path = project_file["project_path"]
+
+    save_options = get_save_options()
+    write_project_file(core,
+                       save_path,
+                       project,
+                       project_file["scope"],
+                       project_file["interfaces"],
+                       project_file["strategy"],
+                       **save_options)
+
+    msg = "Saved project '{}' to {}".format(project.title, save_path)
+    module_logger.info(msg)
+
+    return
+
+
+def _run_blocked(core, project, execute):
+
+    # Block signals, as when executing in the GUI's threads
+    core.blockSignals(True)
+    project.blockSignals(True)
+
+    try:
+        execute(core, project)
+    finally:
+        core.blockSignals(False)
+        project.blockSignals(False)
+
+    return
+
+
+def batch_parser(args):
+
+    '''Command line parser for run_batch.
+
+    Example:
+
+        To get help::
+
+            $ dtocean-app-batch -h
+
+    '''
+
+    now = datetime.datetime.now()
+    epiStr = 'The DTOcean Developers (c) {}.'.format(now.year)
+
+    desStr = ("Execute a saved DTOcean project without the graphical "
+              "interface and save the results.")
+
+    parser = argparse.ArgumentParser(description=desStr,
+                                     epilog=epiStr,
+                                     formatter_class=SmartFormatter)
+
+    parser.add_argument("path",
+                        help="path to the .dto or .prj project file")
+
+    parser.add_argument("-o", "--out",
+                        help=("path to save the results to (defaults to "
+                              "the project file)"),
+                        default=None)
+
+    parser.add_argument("-m", "--mode",
+                        choices=MODES,
+                        default="auto",
+                        help="R|Select what to execute, where\n"
+                             " auto = the strategy, if there is one, or "
+                                     "else as modules (default)\n"
+                             " strategy = the project's strategy\n"
+                             " current = the current module and the "
+                                        "themes\n"
+                             " modules = all scheduled modules and the "
+                                        "themes\n"
+                             " themes = the themes only")
+
+    parser.add_argument("--debug",
+                        help="log debugging messages",
+                        action="store_true")
+
+    args = parser.parse_args(args)
+
+    return args.path, args.out, args.mode, args.debug
+
+
+def batch_interface():
+
+    '''Command line interface for run_batch. The exit status is non-zero if
+    the project could not be executed or saved.'''
+
+    file_path, save_path, mode, debug = batch_parser(sys.argv[1:])
+
+    level = logging.DEBUG if debug else logging.INFO
+    logging.basicConfig(level=level,
+                        format="%(asctime)s - %(name)s - %(levelname)s - "
+                               "%(message)s")
+
+    try:
+        run_batch(file_path, save_path, mode)
+    except Exception:
+        module_logger.exception("Batch execution failed")
+        sys.exit(1)
+
+    return
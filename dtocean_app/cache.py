@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Caches of objects which are expensive to rebuild for display.
+
+The WidgetCache keeps the most recently used data widgets of the pipeline,
+so that returning to a variable does not load its interface and copy its
+data into a new widget again. The memory held by the cached widgets is
+estimated from the tables they display and kept within a budget, by
+discarding the least recently used widgets.
+
+The ValuesCache keeps the values of variables collected from every
+simulation of a project, for the comparison views, so that switching
+between the table and plot of a variable, or back to a variable seen
+before, does not search the data of every simulation again.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import copy
+import logging
+from collections import OrderedDict
+
+from .widgets.datatable import DataTableWidget
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+# Estimated bytes used by a widget, excluding its data
+WIDGET_OVERHEAD = 64 * 1024
+
+
+def get_widget_size(widget):
+
+    """Estimate the memory used by a widget, in bytes, from the size of the
+    tables that it displays"""
+
+    size = WIDGET_OVERHEAD
+
+    tables = widget.findChildren(DataTableWidget)
+    if isinstance(widget, DataTableWidget): tables.append(widget)
+
+    for table in tables:
+
+        model = table.model()
+        if model is None or not hasattr(model, "dataFrame"): continue
+
+        data = model.dataFrame()
+        if data is None: continue
+
+        size += int(data.memory_usage(index=True).sum())
+
+    return size
+
+
+class WidgetCache(object):
+
+    """Least recently used cache of widgets, bounded by the estimated
+    memory of the widgets.
+
+    Widgets which are removed from the cache are deleted, unless they still
+    have a parent, in which case they are left to their owner.
+
+    Args:
+        max_bytes (int): memory budget of the cached widgets, in bytes
+        get_size (function, optional): returns the estimated size of a
+            widget in bytes
+
+    """
+
+    def __init__(self, max_bytes, get_size=get_widget_size):
+
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._get_size = get_size
+        self._entries = OrderedDict()
+        self._size = 0
+
+        return
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+
+        """Return the widget stored with the given key, or None"""
+
+        if key not in self._entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        # Mark as most recently used
+        widget, size = self._entries.pop(key)
+        self._entries[key] = (widget, size)
+
+        return widget
+
+    def put(self, key, widget):
+
+        """Store a widget, discarding the least recently used widgets if
+        the budget is exceeded. Returns False, without storing, if the
+        widget alone exceeds the budget."""
+
+        self.pop(key)
+
+        size = self._get_size(widget)
+
+        if size > self.max_bytes:
+
+            msg = ("Widget for '{}' exceeds the cache budget and will not "
+                   "be stored").format(key)
+            module_logger.debug(msg)
+
+            return False
+
+        while self._entries and self._size + size > self.max_bytes:
+            old_key = next(iter(self._entries))
+            self.pop(old_key)
+
+        self._entries[key] = (widget, size)
+        self._size += size
+
+        return True
+
+    def pop(self, key):
+
+        """Remove the widget with the given key, if stored"""
+
+        if key not in self._entries: return
+
+        widget, size = self._entries.pop(key)
+        self._size -= size
+        _release(widget)
+
+        return
+
+    def discard(self, condition):
+
+        """Remove all widgets whose key meets the condition"""
+
+        for key in [key for key in self._entries if condition(key)]:
+            self.pop(key)
+
+        return
+
+    def clear(self):
+
+        self.discard(lambda key: True)
+
+        return
+
+    def has_widget(self, widget):
+
+        return any([stored is widget for stored, _ in self._entries.values()])
+
+
+class ValuesCache(object):
+
+    """Cache of values collected from the simulations of a project, such
+    as the values of a variable at each level of each simulation. Results
+    are stored once and copies are returned, so that they can not be
+    modified by their users.
+
+    The cache is not bounded and should be cleared whenever the simulations
+    of the project change.
+
+    """
+
+    def __init__(self):
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = {}
+
+        return
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+
+        """Return a copy of the values stored with the given key, or the
+        default"""
+
+        if key not in self._entries:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+
+        return copy.deepcopy(self._entries[key])
+
+    def put(self, key, values):
+
+        self._entries[key] = copy.deepcopy(values)
+
+        return
+
+    def clear(self):
+
+        if self._entries:
+
+            msg = ("Clearing {} cached values. Hits: {}, "
+                   "misses: {}").format(len(self._entries),
+                                        self.hits,
+                                        self.misses)
+            module_logger.debug(msg)
+
+        self._entries = {}
+
+        return
+
+
+def get_values_key(name, *args, **kwargs):
+
+    """Return a hashable key for a call to the named function with the
+    given arguments. Lists and dicts are keyed by their contents and other
+    unhashable objects by their identity."""
+
+    args = tuple([_freeze(arg) for arg in args])
+    kwargs = tuple([(key, _freeze(value))
+                                    for key, value in sorted(kwargs.items())])
+
+    return (name, args, kwargs)
+
+
+def _freeze(value):
+
+    if isinstance(value, (list, tuple)):
+        return tuple([_freeze(x) for x in value])
+
+    if isinstance(value, dict):
+        return tuple([(key, _freeze(x)) for key, x in sorted(value.items())])
+
+    try:
+        hash(value)
+    except TypeError:
+        return ("id", id(value))
+
+    return value
+
+
+def _release(widget):
+
+    # Widgets still on display are deleted by their owner
+    if widget.parent() is None: widget.deleteLater()
+
+    return
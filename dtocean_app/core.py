@@ -16,6 +16,9 @@
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import logging
+import cPickle as pickle
+from contextlib import contextmanager
+
 from PyQt4 import QtCore
 
 from aneris.boundary.interface import (AutoInterface,
@@ -31,10 +34,12 @@ from dtocean_core.core import (Core,
                                AutoPlot,
                                AutoFileInput,
                                AutoFileOutput)
+from dtocean_core.menu import ModuleMenu
 #from dtocean_core.menu import ConnectorMenu
 
 from . import data as gui_data
 from . import interfaces as gui_interfaces
+from . import storage
 
 # Set up logging
 module_logger = logging.getLogger(__name__)
@@ -105,6 +110,10 @@ class GUIProject(QtCore.QObject, Project):
         
         QtCore.QObject.__init__(self)
         Project.__init__(self, title)
+        self._archive = None
+        self._changed_simulations = {}
+        self._all_changed = True
+        self._profile = []
         
         return
     
@@ -117,6 +126,8 @@ class GUIProject(QtCore.QObject, Project):
     
     def set_simulation_title(self, new_title, index=None, title=None):
         
+        # Saved simulations are renamed in the archive manifest only, so
+        # they are not marked as changed
         super(GUIProject, self).set_simulation_title(new_title,
                                                      index,
                                                      title)
@@ -124,6 +135,25 @@ class GUIProject(QtCore.QObject, Project):
         
         return
     
+    def get_profile(self):
+        
+        """Return the recorded execution profile, as a list of stage
+        records"""
+        
+        return list(self._profile)
+    
+    def add_profile_records(self, records):
+        
+        self._profile.extend(records)
+        
+        return
+    
+    def clear_profile(self):
+        
+        self._profile = []
+        
+        return
+    
     def _set_active_index(self, index):
         
         super(GUIProject, self)._set_active_index(index)
@@ -136,6 +166,42 @@ class GUIProject(QtCore.QObject, Project):
         
         return
     
+    def _set_simulation_changed(self, simulation=None):
+        
+        """Record that a simulation (by default the active simulation) has
+        changed since the project was last saved"""
+        
+        if simulation is None: simulation = self.get_simulation()
+        if simulation is None: return
+        
+        simulation = storage.unwrap(simulation)
+        self._changed_simulations[id(simulation)] = simulation
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _set_all_changed(self):
+        
+        self._all_changed = True
+        
+        return
+    
+    def _get_changed_simulations(self):
+        
+        """Return the ids of the simulations changed since the last save,
+        or None if any simulation may have changed"""
+        
+        if self._all_changed: return None
+        
+        return set(self._changed_simulations)
+    
+    def _clear_changed(self):
+        
+        self._changed_simulations = {}
+        self._all_changed = False
+        
+        return
+    
     def _load(self, project):
         
         self.title = project.title
@@ -145,6 +211,19 @@ class GUIProject(QtCore.QObject, Project):
         self._db_cred = project._db_cred
         
         return
+    
+    def _dump(self):
+        
+        """Return a pure Project sharing this project's contents, suitable
+        for pickling"""
+        
+        project = Project(self.title)
+        project._pool = self._pool
+        project._simulations = self._simulations
+        project._active_index = self._active_index
+        project._db_cred = self._db_cred
+        
+        return project
 
 
 class GUICore(QtCore.QObject, Core):
@@ -182,6 +261,12 @@ class GUICore(QtCore.QObject, Core):
         self.control = None
         self.socket_map = None
         self._input_parent = None
+        self._progress = None
+        self._cancel_token = None
+        self._profiler = None
+        self._status_version = 0
+        self._status_state = None
+        self._status_cache = {}
         
         return
 
@@ -232,6 +317,99 @@ class GUICore(QtCore.QObject, Core):
         gui_project._load(core_project)
         
         return gui_project
+    
+    def dump_project_archive(self, project,
+                                   archive,
+                                   update=False,
+                                   extras=None):
+        
+        """Write the project into an open ArchiveWriter, with a separate
+        member for each simulation. If update is True, only the changes
+        since the project was last saved are appended to its archive. The
+        contents of any extra members to save with the project are given
+        by name in extras. Returns the save result, for use with
+        link_project_archive."""
+        
+        source = getattr(project, "_archive", None)
+        changed = None
+        
+        if isinstance(project, GUIProject):
+            changed = project._get_changed_simulations()
+            project = project._dump()
+        
+        saved = storage.dump_project(project,
+                                     archive,
+                                     source,
+                                     changed,
+                                     update,
+                                     extras)
+        
+        return saved
+    
+    def load_project_archive(self, archive):
+        
+        """Read a project from an open ArchiveReader. Only the active
+        simulation is read, the others are read when first used."""
+        
+        core_project, project_archive = storage.load_project(archive)
+        
+        gui_project = GUIProject("temp")
+        gui_project._load(core_project)
+        gui_project._archive = project_archive
+        gui_project._clear_changed()
+        
+        return gui_project
+    
+    def link_project_archive(self, project, path, saved, update=False):
+        
+        """Read any unloaded simulations from the archive at path, to which
+        the project has just been saved"""
+        
+        project._archive = storage.link_project(project,
+                                                path,
+                                                saved,
+                                                project._archive,
+                                                update)
+        project._clear_changed()
+        
+        return
+    
+    def can_update_project_archive(self, project, path):
+        
+        """Test if the changes to the project can be appended to the
+        archive at path"""
+        
+        project_archive = getattr(project, "_archive", None)
+        
+        return storage.can_update(project_archive, path)
+    
+    def get_project_archive_path(self, project):
+        
+        """Return the path of the archive from which the project reads its
+        unloaded simulations, if any"""
+        
+        project_archive = getattr(project, "_archive", None)
+        
+        if project_archive is None: return None
+        
+        return project_archive.path
+    
+    def load_project_stream(self, fileobj):
+        
+        """Unpickle a whole project from an open file-like object"""
+        
+        core_project = pickle.load(fileobj)
+        
+        if not isinstance(core_project, Project):
+            
+            errStr = ("The loaded object of type {} is not a "
+                      "Project").format(type(core_project).__name__)
+            raise ValueError(errStr)
+        
+        gui_project = GUIProject("temp")
+        gui_project._load(core_project)
+        
+        return gui_project
         
     def set_input_parent(self, widget):
         
@@ -239,6 +417,159 @@ class GUICore(QtCore.QObject, Core):
         
         return
         
+    def set_progress(self, progress):
+        
+        """Record the execution of modules and themes in an
+        ExecutionProgress object, or stop recording if progress is None"""
+        
+        self._progress = progress
+        
+        return
+    
+    def set_cancel_token(self, cancel_token):
+        
+        """Check a CancelToken before executing each module or the themes,
+        or stop checking if cancel_token is None"""
+        
+        self._cancel_token = cancel_token
+        
+        return
+    
+    def set_profiler(self, profiler):
+        
+        """Record the resources used by each execution of a module, the
+        themes or a strategy using an ExecutionProfiler, or stop recording
+        if profiler is None. Records are added to the executed project."""
+        
+        self._profiler = profiler
+        
+        return
+    
+    def is_profiling(self):
+        
+        return self._profiler is not None
+    
+    @contextmanager
+    def profile_stage(self, project, name, simulation=None):
+        
+        """Context in which an execution stage is profiled, if required.
+        The stage is recorded even if it fails."""
+        
+        # The profiler may be changed from another thread
+        profiler = self._profiler
+        
+        if profiler is None:
+            yield
+            return
+        
+        profiler.start_stage(name, simulation)
+        
+        try:
+            yield
+        finally:
+            record = profiler.finish_stage()
+            project.add_profile_records([record])
+    
+    def execute_current(self, project, *args, **kwargs):
+        
+        """Record the progress and profile of the module execution, if
+        required"""
+        
+        if self._cancel_token is not None: self._cancel_token.check()
+        
+        started = False
+        module_name = ModuleMenu().get_current(self, project)
+        
+        if self._progress is not None:
+            started = self._progress.start_stage(module_name,
+                                                 project.get_simulation())
+        
+        try:
+            with self.profile_stage(project,
+                                    module_name,
+                                    project.get_simulation_title()):
+                result = super(GUICore, self).execute_current(project,
+                                                              *args,
+                                                              **kwargs)
+        finally:
+            if started: self._progress.finish_stage()
+        
+        return result
+    
+    def execute_themes(self, project, *args, **kwargs):
+        
+        """Record the progress and profile of the themes execution, if
+        required"""
+        
+        if self._cancel_token is not None: self._cancel_token.check()
+        
+        started = False
+        
+        if self._progress is not None:
+            started = self._progress.start_stage("Themes",
+                                                 project.get_simulation())
+        
+        try:
+            with self.profile_stage(project,
+                                    "Themes",
+                                    project.get_simulation_title()):
+                result = super(GUICore, self).execute_themes(project,
+                                                             *args,
+                                                             **kwargs)
+        finally:
+            if started: self._progress.finish_stage()
+        
+        return result
+        
+    def get_branch_status(self, project, branch, outputs=False):
+        
+        """Return the status of the inputs (or outputs) of a pipeline
+        branch. The status of each branch is evaluated once and shared
+        until the interface status is set again or another simulation
+        becomes active."""
+        
+        simulation = project.get_simulation()
+        
+        if (self._status_state is None or
+            self._status_state[0] is not project or
+            self._status_state[1] is not simulation or
+            self._status_state[2] != self._status_version):
+            
+            self._status_state = (project, simulation, self._status_version)
+            self._status_cache = {}
+        
+        # Keep the branch with its status, so that its id is not reused
+        cache_key = (id(branch), outputs)
+        
+        if cache_key in self._status_cache:
+            
+            cached_branch, status = self._status_cache[cache_key]
+            
+            if cached_branch is branch: return status.copy()
+        
+        if outputs:
+            status = branch.get_output_status(self, project)
+        else:
+            status = branch.get_input_status(self, project)
+        
+        self._status_cache[cache_key] = (branch, status)
+        
+        return status.copy()
+    
+    def get_status_version(self):
+        
+        """Return a number which changes whenever the interface status is
+        set, and so the stored data may have changed"""
+        
+        return self._status_version
+    
+    def clear_status_cache(self):
+        
+        self._status_state = None
+        self._status_cache = {}
+        
+        return
+    
     def reset_level(self, project,
                           level=None,
                           preserve_level=False,
@@ -253,6 +584,7 @@ class GUICore(QtCore.QObject, Core):
                                          force_scheduled,
                                          skip_missing)
         
+        self._status_version += 1
         self.pipeline_reset.emit()
         
         return
@@ -262,6 +594,13 @@ class GUICore(QtCore.QObject, Core):
         """Emit a signal on status update"""
                 
         super(GUICore, self).set_interface_status(project, simulation)
+        
+        # Invalidate the shared branch status
+        self._status_version += 1
+        
+        if isinstance(project, GUIProject):
+            project._set_simulation_changed(simulation)
+        
         self.status_updated.emit()
         
         return
@@ -25,8 +25,9 @@ from PyQt4 import QtGui, QtCore
 from dtocean_core.extensions import StrategyManager, ToolManager
 
 from . import strategies, tools
+from .cache import ValuesCache, get_values_key
 from .widgets.dialogs import ListFrameEditor, Message
-from .widgets.display import MPLWidget
+from .widgets.display import MPLWidget, decimate_figure
 from .widgets.output import OutputDataTable
 
 
@@ -45,9 +46,19 @@ class GUIStrategyManager(ListFrameEditor, StrategyManager):
         self._last_df = None
         self._last_selected = None
         
+        # Values collected from the simulations, shared by the comparison
+        # tables and plots
+        self._values_cache = ValuesCache()
+        
         # Store widget handles
         self._strategy_widget = None
         
+        # Collected values are out of date if the data or strategy changes
+        shell.core.status_updated.connect(self.clear_values_cache)
+        shell.strategy_loaded.connect(self.clear_values_cache)
+        shell.project_activated.connect(self.clear_values_cache)
+        shell.project_closed.connect(self.clear_values_cache)
+        
         return
         
     def _init_ui(self, title=None):
@@ -121,6 +132,51 @@ class GUIStrategyManager(ListFrameEditor, StrategyManager):
             
         return sorted_names
         
+    def get_level_values(self, core, project, *args, **kwargs):
+        
+        """Collect the values of a variable at each level of each
+        simulation, or return them from the cache if collected before"""
+        
+        key = get_values_key("level", *args, **kwargs)
+        values = self._values_cache.get(key)
+        
+        if values is None:
+            
+            values = super(GUIStrategyManager, self).get_level_values(
+                                                                core,
+                                                                project,
+                                                                *args,
+                                                                **kwargs)
+            self._values_cache.put(key, values)
+        
+        return values
+    
+    def get_comparison_values(self, core, project, *args, **kwargs):
+        
+        """Collect the values of two variables from each simulation, or
+        return them from the cache if collected before"""
+        
+        key = get_values_key("comparison", *args, **kwargs)
+        values = self._values_cache.get(key)
+        
+        if values is None:
+            
+            values = super(GUIStrategyManager, self).get_comparison_values(
+                                                                core,
+                                                                project,
+                                                                *args,
+                                                                **kwargs)
+            self._values_cache.put(key, values)
+        
+        return values
+    
+    @QtCore.pyqtSlot()
+    def clear_values_cache(self):
+        
+        self._values_cache.clear()
+        
+        return
+        
     def get_level_values_df(self, shell, var_id, scope, ignore_strategy):
         
         if ignore_strategy or shell.strategy is None:
@@ -163,6 +219,7 @@ class GUIStrategyManager(ListFrameEditor, StrategyManager):
                                                        sim_titles,
                                                        scope)
         
+        decimate_figure(fig_handle)
         widget = MPLWidget(fig_handle, shell.core._input_parent)
         
         return widget
@@ -217,6 +274,7 @@ class GUIStrategyManager(ListFrameEditor, StrategyManager):
                                                             strategy,
                                                             scope)
         
+        decimate_figure(fig_handle)
         widget = MPLWidget(fig_handle, shell.core._input_parent)
         
         return widget
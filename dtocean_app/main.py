@@ -26,17 +26,16 @@ Created on Thu Apr 23 12:51:14 2015
 import os
 import sys
 import json
-import shutil
+import time
 import logging
-import tarfile
-import tempfile
 import threading
 import traceback
+import multiprocessing
+import cPickle as pickle
 from collections import namedtuple
 
 import sip
 import pandas as pd
-import matplotlib.pyplot as plt
 from win32event import CreateMutex
 from PyQt4 import QtGui, QtCore
 
@@ -48,11 +47,33 @@ from dtocean_core.utils.database import (database_from_files,
                                          get_database,
                                          get_table_map)
 
-from . import get_log_dir
+from . import (get_autosave_dir,
+               get_autosave_options,
+               get_cache_options,
+               get_log_dir,
+               get_save_options)
+from .autosave import AutosaveJournal
+from .cache import WidgetCache
 from .help import HelpWidget
 from .menu import DBSelector
 from .simulation import SimulationDock
+from .storage import (AUTOSAVE_NAME,
+                      read_project_file,
+                      select_simulations,
+                      write_project_file,
+                      write_project_members)
 from .extensions import GUIStrategyManager, GUIToolManager
+from .profiling import ExecutionProfiler, write_profile_csv
+from .progress import CancelToken, ExecutionCancelled, ExecutionProgress
+from .strategies.parallel import ParallelStrategy, get_max_workers
+from .plotting import (PLOT_FIGURE,
+                       PLOT_UNPICKLABLE,
+                       close_render_pool,
+                       export_plot_tasks,
+                       get_export_tasks,
+                       get_render_pool,
+                       render_plot,
+                       write_plot_index)
 from .pipeline import (PipeLine,
                        SectionControl,
                        HubControl,
@@ -69,14 +90,18 @@ from .widgets.central import (ContextArea,
                               SimulationComparison)
 from .widgets.dialogs import (DataCheck,
                               MainWindow,
+                              PlotExport,
                               ProjProperties,
                               Shuttle,
                               ProgressBar,
                               About)
 from .widgets.display import (MPLWidget,
+                              PlotPlaceholder,
+                              figure_pool,
                               get_current_filetypes,
                               save_current_figure)
-from .widgets.docks import LogDock
+from .widgets.docks import LogDock, ProfileDock
+from .utils.archive import ArchiveWriter
 
 # Set up logging
 module_logger = logging.getLogger(__name__)
@@ -87,6 +112,9 @@ HOME = os.path.expanduser("~")
 # Check if running coverage
 RUNNING_COVERAGE = "coverage" in sys.modules
 
+# Seconds between checks for cancellation while waiting for plots
+PLOT_POLL_INTERVAL = 0.1
+
 
 class ThreadReadRaw(QtCore.QThread):
     
@@ -203,78 +231,15 @@ class ThreadOpen(QtCore.QThread):
         
         try:
             
-            load_path = str(self._file_path)
-            dto_dir_path = None
-            prj_file_path = None
-            sco_file_path = None
-            stg_file_path = None
-            int_file_path = None
+            project_file = read_project_file(self._core, str(self._file_path))
             
-            # Check the extension
-            if os.path.splitext(load_path)[1] == ".dto":
-                
-                dto_dir_path = tempfile.mkdtemp()
-                tar = tarfile.open(load_path)
-                tar.extractall(dto_dir_path)
-                
-                prj_file_path = os.path.join(dto_dir_path, "project.prj")
-                sco_file_path = os.path.join(dto_dir_path, "scope.json")
-                stg_file_path = os.path.join(dto_dir_path, "strategy.pkl")
-                int_file_path = os.path.join(dto_dir_path, "interfaces.json")
-                
-                if not os.path.isfile(stg_file_path): stg_file_path = None
-                if not os.path.isfile(int_file_path): int_file_path = None
-                
-            elif os.path.splitext(load_path)[1] == ".prj":
-                
-                prj_file_path = load_path
-                
-            else:
-                
-                errStr = ("The file path must be a file with either .dto or "
-                          ".prj extension")
-                raise ValueError(errStr)
-                
-            # Load up the project
-            load_project = self._core.load_project(prj_file_path)
-            self._project = load_project
-            
-            # Load up the scope if one was found
-            if sco_file_path is not None:
-                
-                with open(sco_file_path, 'rb') as json_file:
-                    self._current_scope = json.load(json_file)
-            
-            else:
-                
-                self._current_scope = "global"
-            
-            # Load up the activated interfaces if found
-            if int_file_path is not None:
-                
-                with open(int_file_path, 'rb') as json_file:
-                    self._activated_interfaces = json.load(json_file)
-            
-            else:
-                
-                self._activated_interfaces = {}
-            
-            # Load up the strategy if one was found
-            if stg_file_path is not None:
-                
-                strategy_manager = GUIStrategyManager(None)
-                self._strategy = strategy_manager.load_strategy(stg_file_path,
-                                                                load_project)
-            
-            else:
-                
-                self._strategy = None
+            self._project = project_file["project"]
+            self._current_scope = project_file["scope"]
+            self._activated_interfaces = project_file["interfaces"]
+            self._strategy = project_file["strategy"]
             
             # Record the path after a successful load
-            self._project_path = load_path
-            
-            # Delete temp directory
-            if dto_dir_path is not None: shutil.rmtree(dto_dir_path)
+            self._project_path = project_file["project_path"]
             
             self.taskFinished.emit()
         
@@ -300,7 +265,10 @@ class ThreadSave(QtCore.QThread):
                        save_path,
                        current_scope,
                        activated_interfaces,
-                       strategy):
+                       strategy,
+                       compression="gzip",
+                       level=6,
+                       incremental=False):
         
         super(ThreadSave, self).__init__()
         self._core = core
@@ -309,6 +277,9 @@ class ThreadSave(QtCore.QThread):
         self._current_scope = current_scope
         self._activated_interfaces = activated_interfaces
         self._strategy = strategy
+        self._compression = compression
+        self._level = level
+        self._incremental = incremental
         
         return
     
@@ -323,89 +294,88 @@ class ThreadSave(QtCore.QThread):
         
         try:
             
-            if self._save_path is None:
-                
-                errStr = ("A file path must be provided in order to save a "
-                          "project")
-                raise ValueError(errStr)
-                
-            # Check the extension
-            if os.path.splitext(self._save_path)[1] not in [".dto", ".prj"]:
-            
-                errStr = ("The file path must be a file with either .dto or "
-                          ".prj extension")
-                raise ValueError(errStr)
-                
-            dto_dir_path = tempfile.mkdtemp()
-                
-            # Dump the project
-            prj_file_path = os.path.join(dto_dir_path, "project.prj")
-            self._core.dump_project(self._project, prj_file_path)
-            
-            # If saving a project file only
-            if os.path.splitext(self._save_path)[1] == ".prj":
-                
-                shutil.move(prj_file_path, self._save_path)
-                shutil.rmtree(dto_dir_path)
-                
-                self.taskFinished.emit()
-                
-                return
-            
-            # Dump the output scope
-            sco_file_path = os.path.join(dto_dir_path, "scope.json")
+            write_project_file(self._core,
+                               self._save_path,
+                               self._project,
+                               self._current_scope,
+                               self._activated_interfaces,
+                               self._strategy,
+                               self._compression,
+                               self._level,
+                               self._incremental)
             
-            with open(sco_file_path, 'wb') as json_file:
-                json.dump(self._current_scope, json_file)
+            self.taskFinished.emit()
+        
+        except: 
             
-            # Set the standard archive contents
-            arch_files = [prj_file_path, sco_file_path]
-            arch_paths = ["project.prj", "scope.json"]
+            etype, evalue, etraceback = sys.exc_info()
+            self.error_detected.emit(etype, evalue, etraceback)
             
-            # Dump the activated interfaces
-            if self._activated_interfaces:
-                
-                int_file_path = os.path.join(dto_dir_path, "interfaces.json")
-                
-                with open(int_file_path, 'wb') as json_file:
-                    json.dump(self._activated_interfaces, json_file)
-                    
-                # Set the standard archive contents
-                arch_files.append(int_file_path)
-                arch_paths.append("interfaces.json")
+            self.taskFinished.emit()
+        
+        return
+
+
+class ThreadAutosave(ThreadSave):
+    
+    """QThread for writing snapshots of the project to the autosave
+    journal. Unlike ThreadSave, the project remains linked to the file it
+    was opened from or last saved to, and failures are only logged."""
+    
+    def __init__(self, core,
+                       project,
+                       journal,
+                       project_path,
+                       current_scope,
+                       activated_interfaces,
+                       strategy,
+                       compression="gzip",
+                       level=6):
+        
+        super(ThreadAutosave, self).__init__(core,
+                                             project,
+                                             journal.get_new_path(),
+                                             current_scope,
+                                             activated_interfaces,
+                                             strategy,
+                                             compression,
+                                             level)
+        self._journal = journal
+        self._project_path = project_path
+        self._saved = False
+        
+        return
+    
+    def _run(self):
+        
+        try:
             
-            # Dump the strategy (if there is one)
-            if self._strategy is not None:
+            with ArchiveWriter(self._save_path,
+                               self._compression,
+                               self._level) as archive:
                 
-                strategy_manager = GUIStrategyManager(None)
-                stg_file_path = os.path.join(dto_dir_path, "strategy.pkl")
-                strategy_manager.dump_strategy(self._strategy, stg_file_path)
+                info = {"project_path": self._project_path,
+                        "title": self._project.title}
                 
-                arch_files.append(stg_file_path)
-                arch_paths.append("strategy.pkl")
-            
-            # Now tar the files together
-            dto_file_name = os.path.split(self._save_path)[1]
-            tar_file_name = "{}.tar".format(dto_file_name)
-            
-            archive = tarfile.open(tar_file_name, "w")
-            
-            for arch_file, arch_path in zip(arch_files, arch_paths):
-                archive.add(arch_file, arcname=arch_path)
+                write_project_members(self._core,
+                                      archive,
+                                      self._project,
+                                      self._current_scope,
+                                      self._activated_interfaces,
+                                      self._strategy,
+                                      extras={AUTOSAVE_NAME: json.dumps(info)})
             
-            archive.close()
+            self._saved = True
             
-            shutil.move(tar_file_name, self._save_path)
-            shutil.rmtree(dto_dir_path)
-            
-            self.taskFinished.emit()
+            msg = "Autosaved project to {}".format(self._save_path)
+            module_logger.debug(msg)
         
         except: 
             
-            etype, evalue, etraceback = sys.exc_info()
-            self.error_detected.emit(etype, evalue, etraceback)
-            
-            self.taskFinished.emit()
+            msg = "Autosave of project to {} failed".format(self._save_path)
+            module_logger.warning(msg, exc_info=True)
+        
+        self.taskFinished.emit()
         
         return
 
@@ -482,12 +452,14 @@ class ThreadCurrent(QtCore.QThread):
     
     taskFinished = QtCore.pyqtSignal()
     error_detected =  QtCore.pyqtSignal(object, object, object)
+    progress_updated = QtCore.pyqtSignal(object)
 
-    def __init__(self, core, project):
+    def __init__(self, core, project, cancel_token=None):
         
         super(ThreadCurrent, self).__init__()
         self._core = core
         self._project = project
+        self._cancel_token = cancel_token
         
         self._module_menu = ModuleMenu()
         
@@ -508,9 +480,29 @@ class ThreadCurrent(QtCore.QThread):
             self._core.blockSignals(True)
             self._project.blockSignals(True)
         
+            progress = ExecutionProgress(1, 1, self.progress_updated.emit)
+            self._core.set_progress(progress)
+            self._core.set_cancel_token(self._cancel_token)
+            
             self._module_menu.execute_current(self._core,
                                               self._project)
             
+            progress.finish()
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
+            # Reinstate signals and emit
+            self._core.blockSignals(False)
+            self._project.blockSignals(False)
+            self.taskFinished.emit()
+        
+        except ExecutionCancelled:
+            
+            module_logger.info("Execution cancelled")
+            
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
             # Reinstate signals and emit
             self._core.blockSignals(False)
             self._project.blockSignals(False)
@@ -521,6 +513,9 @@ class ThreadCurrent(QtCore.QThread):
             etype, evalue, etraceback = sys.exc_info()
             self.error_detected.emit(etype, evalue, etraceback)
             
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
             # Reinstate signals and emit
             self._core.blockSignals(False)
             self._project.blockSignals(False)
@@ -535,12 +530,14 @@ class ThreadThemes(QtCore.QThread):
     
     taskFinished = QtCore.pyqtSignal()
     error_detected =  QtCore.pyqtSignal(object, object, object)
+    progress_updated = QtCore.pyqtSignal(object)
     
-    def __init__(self, core, project):
+    def __init__(self, core, project, cancel_token=None):
         
         super(ThreadThemes, self).__init__()
         self._core = core
         self._project = project
+        self._cancel_token = cancel_token
         
         self._theme_menu = ThemeMenu()
         
@@ -561,19 +558,42 @@ class ThreadThemes(QtCore.QThread):
             self._core.blockSignals(True)
             self._project.blockSignals(True)
         
+            progress = ExecutionProgress(1, 1, self.progress_updated.emit)
+            self._core.set_progress(progress)
+            self._core.set_cancel_token(self._cancel_token)
+            
             self._theme_menu.execute_all(self._core,
                                          self._project)
             
+            progress.finish()
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
             # Reinstate signals and emit
             self._core.blockSignals(False)
             self._project.blockSignals(False)
             self.taskFinished.emit()
                                      
+        except ExecutionCancelled:
+            
+            module_logger.info("Execution cancelled")
+            
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
+            # Reinstate signals and emit
+            self._core.blockSignals(False)
+            self._project.blockSignals(False)
+            self.taskFinished.emit()
+        
         except: 
             
             etype, evalue, etraceback = sys.exc_info()
             self.error_detected.emit(etype, evalue, etraceback)
             
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
             # Reinstate signals and emit
             self._core.blockSignals(False)
             self._project.blockSignals(False)
@@ -588,14 +608,19 @@ class ThreadStrategy(QtCore.QThread):
     
     taskFinished = QtCore.pyqtSignal()
     error_detected =  QtCore.pyqtSignal(object, object, object)
+    progress_updated = QtCore.pyqtSignal(object)
 
-    def __init__(self, core, project, strategy):
+    def __init__(self, core, project, strategy, cancel_token=None):
         
         super(ThreadStrategy, self).__init__()
         self._core = core
         self._project = project
+        self._cancel_token = cancel_token
         self._strategy = strategy
         
+        self._module_menu = ModuleMenu()
+        self._theme_menu = ThemeMenu()
+        
         return
     
     def run(self): # pragma: no cover
@@ -613,8 +638,52 @@ class ThreadStrategy(QtCore.QThread):
             self._core.blockSignals(True)
             self._project.blockSignals(True)
             
-            self._strategy.execute(self._core,
-                                   self._project)
+            # Expect the scheduled modules and themes for each simulation
+            n_stages = len(self._module_menu.get_scheduled(self._core,
+                                                           self._project))
+            
+            if self._theme_menu.get_scheduled(self._core, self._project):
+                n_stages += 1
+            
+            progress = ExecutionProgress(
+                                    self._strategy.get_simulation_count(),
+                                    n_stages,
+                                    self.progress_updated.emit)
+            self._core.set_progress(progress)
+            self._core.set_cancel_token(self._cancel_token)
+            
+            n_simulations = len(self._project)
+            
+            with self._core.profile_stage(self._project,
+                                          self._strategy.get_name()):
+                
+                # Parallel strategies report the simulations completed
+                if isinstance(self._strategy, ParallelStrategy):
+                    self._strategy.execute(self._core,
+                                           self._project,
+                                           progress.set_completed,
+                                           self._cancel_token)
+                else:
+                    self._strategy.execute(self._core,
+                                           self._project)
+            
+            progress.finish()
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
+            # Reinstate signals and emit
+            self._core.blockSignals(False)
+            self._project.blockSignals(False)
+            self.taskFinished.emit()
+        
+        except ExecutionCancelled:
+            
+            module_logger.info("Execution cancelled")
+            
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
+            self._remove_incomplete(n_simulations)
             
             # Reinstate signals and emit
             self._core.blockSignals(False)
@@ -626,12 +695,38 @@ class ThreadStrategy(QtCore.QThread):
             etype, evalue, etraceback = sys.exc_info()
             self.error_detected.emit(etype, evalue, etraceback)
             
+            self._core.set_progress(None)
+            self._core.set_cancel_token(None)
+            
             # Reinstate signals and emit
             self._core.blockSignals(False)
             self._project.blockSignals(False)
             self.taskFinished.emit()
         
         return
+    
+    def _remove_incomplete(self, n_simulations):
+        
+        """Remove the simulations added by the strategy, after the first
+        n_simulations, which it did not record as complete"""
+        
+        sim_record = self._strategy.get_simulation_record()
+        if sim_record is None: sim_record = []
+        
+        sim_titles = self._project.get_simulation_titles()
+        incomplete = [sim_titles[i]
+                        for i in range(n_simulations, len(sim_titles))
+                                                    if i not in sim_record]
+        
+        for sim_title in incomplete:
+            
+            msg = ("Removing partly executed simulation "
+                   "'{}'").format(sim_title)
+            module_logger.info(msg)
+            
+            self._core.remove_simulation(self._project, sim_title=sim_title)
+        
+        return
 
 
 class ThreadTool(QtCore.QThread):
@@ -842,6 +937,228 @@ class ThreadScope(QtCore.QThread):
         return
 
 
+class ThreadPlot(QtCore.QThread):
+    
+    """QThread for loading the data of a plot interface and making its
+    figure in a plotting worker process. If a file path is given, the
+    figure is saved, otherwise it is returned unpickled, without a canvas,
+    for display by the GUI. The request is abandoned if cancelled before
+    the figure is made."""
+    
+    taskFinished = QtCore.pyqtSignal()
+    error_detected =  QtCore.pyqtSignal(object, object, object)
+    plot_ready = QtCore.pyqtSignal(object, object, object)
+    plot_fallback = QtCore.pyqtSignal(object)
+    
+    def __init__(self, core,
+                       project,
+                       interface,
+                       request_id,
+                       save_args=None):
+        
+        super(ThreadPlot, self).__init__()
+        self._core = core
+        self._project = project
+        self._interface = interface
+        self._request_id = request_id
+        self._save_args = save_args
+        self._pool = get_render_pool()
+        self._cancelled = False
+        self._snapshot_taken = threading.Event()
+        
+        return
+    
+    def cancel(self):
+        self._cancelled = True
+    
+    def is_snapshot_taken(self):
+        return self._snapshot_taken.is_set()
+    
+    def wait_for_snapshot(self):
+        
+        """Wait until the project is no longer read by this thread"""
+        
+        self._snapshot_taken.wait()
+        
+        return
+    
+    def run(self): # pragma: no cover
+        
+        if RUNNING_COVERAGE:
+            sys.settrace(threading._trace_hook)
+        
+        self._run()
+    
+    def _run(self):
+        
+        try:
+            
+            interface_data = None
+            
+            try:
+                
+                if not self._cancelled:
+                    interface = self._core.load_interface(self._project,
+                                                          self._interface)
+                    interface_data = pickle.dumps(interface,
+                                                  pickle.HIGHEST_PROTOCOL)
+            
+            except (pickle.PicklingError, TypeError):
+                
+                module_logger.debug("Plot interface can not be pickled",
+                                    exc_info=True)
+                self.plot_fallback.emit(self._request_id)
+                self.taskFinished.emit()
+                return
+            
+            finally:
+                
+                self._snapshot_taken.set()
+            
+            if self._cancelled:
+                self.taskFinished.emit()
+                return
+            
+            result = self._pool.apply_async(render_plot,
+                                            ((interface_data,
+                                              self._save_args),))
+            
+            while not self._cancelled:
+                
+                try:
+                    status, data = result.get(timeout=PLOT_POLL_INTERVAL)
+                    break
+                except multiprocessing.TimeoutError:
+                    pass
+            
+            if self._cancelled:
+                self.taskFinished.emit()
+                return
+            
+            # The figure is not registered with pyplot, so it can be
+            # unpickled here and given a canvas by the GUI
+            if status == PLOT_FIGURE: data = pickle.loads(data)
+            
+            if status == PLOT_UNPICKLABLE:
+                self.plot_fallback.emit(self._request_id)
+            else:
+                self.plot_ready.emit(self._request_id, status, data)
+            
+            self.taskFinished.emit()
+        
+        except: 
+            
+            etype, evalue, etraceback = sys.exc_info()
+            self.error_detected.emit(etype, evalue, etraceback)
+            self.taskFinished.emit()
+        
+        return
+
+
+class ThreadPlotExport(QtCore.QThread):
+    
+    """QThread for exporting the plots of pipeline variables for many
+    simulations, using a pool of worker processes, and writing an index of
+    the saved files. The workers read the project from project_path, if
+    given, or otherwise from a copy of the selected simulations, made by
+    this thread."""
+    
+    taskFinished = QtCore.pyqtSignal()
+    error_detected =  QtCore.pyqtSignal(object, object, object)
+    progress_updated = QtCore.pyqtSignal(object, object)
+    export_complete = QtCore.pyqtSignal(object, object)
+    
+    def __init__(self, project,
+                       project_path,
+                       sim_titles,
+                       tasks,
+                       out_dir,
+                       n_workers):
+        
+        super(ThreadPlotExport, self).__init__()
+        self._project = project
+        self._project_path = project_path
+        self._sim_titles = sim_titles
+        self._tasks = tasks
+        self._out_dir = out_dir
+        self._n_workers = n_workers
+        self._cancel_token = CancelToken()
+        self._snapshot_taken = threading.Event()
+        
+        return
+    
+    def cancel(self):
+        self._cancel_token.cancel()
+    
+    def is_snapshot_taken(self):
+        return self._snapshot_taken.is_set()
+    
+    def wait_for_snapshot(self):
+        
+        """Wait until the project is no longer read by this thread"""
+        
+        self._snapshot_taken.wait()
+        
+        return
+    
+    def run(self): # pragma: no cover
+        
+        if RUNNING_COVERAGE:
+            sys.settrace(threading._trace_hook)
+        
+        self._run()
+    
+    def _run(self):
+        
+        try:
+            
+            project_data = None
+            
+            try:
+                
+                if self._project_path is None:
+                    project = select_simulations(self._project,
+                                                 self._sim_titles)
+                    project_data = pickle.dumps(project,
+                                                pickle.HIGHEST_PROTOCOL)
+            
+            finally:
+                
+                self._snapshot_taken.set()
+            
+            records, errors = export_plot_tasks(project_data,
+                                                self._tasks,
+                                                self._n_workers,
+                                                self.progress_updated.emit,
+                                                self._cancel_token,
+                                                self._project_path)
+            
+            for error in errors:
+                module_logger.warning("Plot not exported: {}".format(error))
+            
+            index_path = write_plot_index(records, self._out_dir)
+            
+            msg = "Exported {} plots to {}".format(len(records),
+                                                   self._out_dir)
+            module_logger.info(msg)
+            
+            self.export_complete.emit(index_path, len(records))
+            self.taskFinished.emit()
+        
+        except ExecutionCancelled:
+            
+            module_logger.info("Plot export cancelled")
+            self.taskFinished.emit()
+        
+        except: 
+            
+            etype, evalue, etraceback = sys.exc_info()
+            self.error_detected.emit(etype, evalue, etraceback)
+            self.taskFinished.emit()
+        
+        return
+
+
 class Shell(QtCore.QObject):
     
     # Signals
@@ -884,8 +1201,16 @@ class Shell(QtCore.QObject):
         self.queued_interfaces = {"modules": None,
                                   "themes": None}
         self.activated_interfaces = {}
+        self.autosave_journal = None
+        self.cancel_token = CancelToken()
         self._active_thread = None
         self._current_scope = None
+        self._autosave_thread = None
+        self._autosave_timer = None
+        self._autosave_deferred = False
+        self._snapshot_threads = []
+        self._change_count = 0
+        self._saved_change_count = None
         
         self.core = self._init_core(core)
         self.project_menu = self._init_project_menu()
@@ -893,6 +1218,9 @@ class Shell(QtCore.QObject):
         self.theme_menu = self._init_theme_menu()
         self.data_menu = self._init_data_menu()
         
+        # Count changes, to detect those made while autosaving
+        self.core.status_updated.connect(self._count_change)
+        
         # Clean up after thread execution
         self.database_convert_complete.connect(self._clear_active_thread)
         self.dataflow_active.connect(self._clear_active_thread)
@@ -933,7 +1261,10 @@ class Shell(QtCore.QObject):
         
     def set_project_title(self, title):
         
+        self._wait_for_threads()
+        
         self.project.title = title
+        self._count_change()
         self.project_title_change.emit(title)
         
         return
@@ -1009,6 +1340,11 @@ class Shell(QtCore.QObject):
         # Update the active project
         self.project_activated.emit()
         
+        # Count changes to the simulations, for autosaving
+        self.project.sims_updated.connect(self._count_change)
+        self.project.active_index_changed.connect(self._count_change)
+        self._saved_change_count = None
+        
         # Relay active simulation change
         self.project.active_index_changed.connect(self._emit_update_pipeline)
         self.project.active_index_changed.connect(self.check_active_simulation)
@@ -1046,19 +1382,22 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(str)
     def save_project(self, file_path=None):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         if file_path is None:
             save_path = self.project_path
         else:
             save_path = str(file_path)
         
+        save_options = get_save_options()
+        
         self._active_thread = ThreadSave(self.core,
                                          self.project,
                                          save_path,
                                          self._current_scope,
                                          self.activated_interfaces,
-                                         self.strategy)
+                                         self.strategy,
+                                         **save_options)
         self._active_thread.taskFinished.connect(self._finalize_save_project)
         self._active_thread.start()
 
@@ -1067,12 +1406,15 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot()
     def close_project(self):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         self.project = None
         self.project_path = None
         self.strategy = None
         
+        # The project is no longer at risk
+        if self.autosave_journal is not None: self.autosave_journal.clear()
+        
         self.project_closed.emit()
         self.project_title_change.emit("")
         self.database_updated.emit("None")
@@ -1080,10 +1422,78 @@ class Shell(QtCore.QObject):
         
         return
         
+    def start_autosave(self, journal, interval):
+        
+        """Snapshot the open project into the given AutosaveJournal every
+        interval minutes"""
+        
+        self.stop_autosave()
+        
+        self.autosave_journal = journal
+        self._autosave_timer = QtCore.QTimer(self)
+        self._autosave_timer.timeout.connect(self.autosave_project)
+        self._autosave_timer.start(int(interval * 60000))
+        
+        return
+    
+    def stop_autosave(self, clear=False):
+        
+        if self._autosave_timer is not None:
+            self._autosave_timer.stop()
+            self._autosave_timer = None
+        
+        if self._autosave_thread is not None:
+            self._autosave_thread.wait()
+            self._autosave_thread = None
+        
+        if clear and self.autosave_journal is not None:
+            self.autosave_journal.clear()
+        
+        self._autosave_deferred = False
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def autosave_project(self):
+        
+        if self.project is None or self.autosave_journal is None: return
+        
+        # Skip projects which have not changed since they were last saved
+        # or snapshot
+        if (not self.project_unsaved or
+            self._change_count == self._saved_change_count): return
+        
+        # Wait for threads which may change the project
+        if (self._active_thread is not None or
+            self._autosave_thread is not None or
+            not all([thread.is_snapshot_taken()
+                                for thread in self._snapshot_threads])):
+            self._autosave_deferred = True
+            return
+        
+        self._autosave_deferred = False
+        save_options = get_save_options()
+        
+        self._autosave_thread = ThreadAutosave(
+                                        self.core,
+                                        self.project,
+                                        self.autosave_journal,
+                                        self.project_path,
+                                        self._current_scope,
+                                        self.activated_interfaces,
+                                        self.strategy,
+                                        save_options["compression"],
+                                        save_options["level"])
+        self._autosave_thread.change_count = self._change_count
+        self._autosave_thread.taskFinished.connect(self._finalize_autosave)
+        self._autosave_thread.start()
+        
+        return
+        
     @QtCore.pyqtSlot(str, str)
     def set_simulation_title(self, old_title, new_title):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         if old_title == new_title: return
         
         msg = "Changing title of simulation {} to {}".format(old_title,
@@ -1114,7 +1524,7 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(str)
     def set_active_simulation(self, title):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         msg = "Setting simulation '{}' as active".format(title)
         module_logger.debug(msg)
@@ -1183,7 +1593,7 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(str, str, dict)
     def dump_database(self, root_path, selected, credentials):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         self._active_thread = ThreadDump(credentials, root_path, selected)
         self._active_thread.start()
@@ -1197,7 +1607,7 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(str, str, dict)
     def load_database(self, root_path, selected, credentials):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         self._active_thread = ThreadLoad(credentials, root_path, selected)
         self._active_thread.start()
@@ -1211,6 +1621,8 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot()
     def initiate_pipeline(self):
         
+        self._wait_for_threads()
+        
         self.project_menu.initiate_pipeline(self.core, self.project)
         
         sites_available = self.core.has_data(self.project,
@@ -1230,6 +1642,8 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot()
     def initiate_bathymetry(self):
         
+        self._wait_for_threads()
+        
         self.project_menu.initiate_bathymetry(self.core, self.project)
         self.bathymetry_active.emit()
         
@@ -1259,6 +1673,8 @@ class Shell(QtCore.QObject):
 
     def activate_module_queue(self):
         
+        self._wait_for_threads()
+        
         if self.queued_interfaces["modules"] is None: return
 
         active_mods = self.module_menu.get_active(self.core, self.project)
@@ -1279,6 +1695,8 @@ class Shell(QtCore.QObject):
 
     def activate_theme_queue(self):
         
+        self._wait_for_threads()
+        
         if self.queued_interfaces["themes"] is None: return
         
         active_themes = self.theme_menu.get_active(self.core, self.project)
@@ -1299,7 +1717,7 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(object)
     def select_strategy(self, strategy):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         if strategy is None:
             logMsg = "Null strategy detected"
@@ -1330,7 +1748,7 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(object)
     def initiate_dataflow(self, pipeline):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         self._active_thread = ThreadDataFlow(pipeline,
                                              self)
@@ -1355,7 +1773,7 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(str, bool)
     def import_data(self, file_path, skip_satisfied=False):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         self.data_menu.import_data(self.core,
                                    self.project,
@@ -1367,7 +1785,7 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot(object, str, str)
     def read_file(self, variable, interface_name, file_path):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
                 
         variable.read_file(self.core,
                            self.project,
@@ -1389,7 +1807,7 @@ class Shell(QtCore.QObject):
 
     def read_raw(self, variable, value):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
     
         self._active_thread = ThreadReadRaw(self,
                                             variable,
@@ -1401,7 +1819,7 @@ class Shell(QtCore.QObject):
 
     def read_test_data(self, control, path, overwrite):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
     
         self._active_thread = ThreadReadTest(self,
                                              control,
@@ -1415,10 +1833,12 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot()
     def execute_current(self):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
+        self.cancel_token.reset()
         self._active_thread = ThreadCurrent(self.core,
-                                            self.project)
+                                            self.project,
+                                            self.cancel_token)
         
         self._active_thread.taskFinished.connect(
                                         lambda: self.module_executed.emit())
@@ -1430,10 +1850,12 @@ class Shell(QtCore.QObject):
     @QtCore.pyqtSlot()
     def execute_themes(self):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
+        self.cancel_token.reset()
         self._active_thread = ThreadThemes(self.core,
-                                           self.project)
+                                           self.project,
+                                           self.cancel_token)
         
         self._active_thread.taskFinished.connect(
                                         lambda: self.themes_executed.emit())
@@ -1447,11 +1869,13 @@ class Shell(QtCore.QObject):
         
         if self.strategy is None: return
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
+        self.cancel_token.reset()
         self._active_thread = ThreadStrategy(self.core,
                                              self.project,
-                                             self.strategy)
+                                             self.strategy,
+                                             self.cancel_token)
         
         self._active_thread.taskFinished.connect(
                                         lambda: self.strategy_executed.emit())
@@ -1460,10 +1884,37 @@ class Shell(QtCore.QObject):
         
         return
     
+    @QtCore.pyqtSlot()
+    def cancel_execution(self):
+        
+        """Stop the running modules, themes or strategy once the module
+        being executed has finished"""
+        
+        if self._active_thread is None: return
+        
+        self.cancel_token.cancel()
+        module_logger.info("Cancelling execution after the current module")
+        
+        return
+    
+    @QtCore.pyqtSlot(bool)
+    def set_profiling(self, enabled):
+        
+        """Record the execution profile of modules, themes and strategies
+        in the project, or stop recording"""
+        
+        if enabled:
+            self.core.set_profiler(ExecutionProfiler())
+            module_logger.info("Recording execution profile")
+        else:
+            self.core.set_profiler(None)
+        
+        return
+    
     @QtCore.pyqtSlot(str)
     def set_output_scope(self, scope):
         
-        if self._active_thread is not None: self._active_thread.wait()
+        self._wait_for_threads()
         
         self._active_thread = ThreadScope(self.core,
                                           self.project,
@@ -1491,6 +1942,11 @@ class Shell(QtCore.QObject):
         
         self.project_title_change.emit(self.project.title)
         
+        # Count changes to the simulations, for autosaving
+        self.project.sims_updated.connect(self._count_change)
+        self.project.active_index_changed.connect(self._count_change)
+        self._saved_change_count = None
+        
         # Relay active simulation change
         self.project.active_index_changed.connect(self._emit_update_pipeline)
         self.project.active_index_changed.connect(self.check_active_simulation)
@@ -1516,9 +1972,16 @@ class Shell(QtCore.QObject):
         
         self.project_path = self._active_thread._save_path
         self.project_saved.emit()
+        
+        # Older snapshots are superseded, except for any snapshot that the
+        # project still reads simulations from
+        if self.autosave_journal is not None:
+            keep = self.core.get_project_archive_path(self.project)
+            self.autosave_journal.clear(keep)
 
         # Release the active thread
         self._clear_active_thread()
+        self._saved_change_count = self._change_count
         
         return
 
@@ -1541,6 +2004,7 @@ class Shell(QtCore.QObject):
         if not allow_run:
             [sim.set_unavailable_variables()
                                         for sim in self.project._simulations]
+            self.project._set_all_changed()
         
         # Emit signals on core
         self._finalize_core()
@@ -1558,17 +2022,60 @@ class Shell(QtCore.QObject):
         
         return
 
-    @QtCore.pyqtSlot()
-    def _finalize_core(self):
+    @QtCore.pyqtSlot()
+    def _finalize_core(self):
+        
+        # Update the interface status
+        self.core.set_interface_status(self.project)
+            
+        # Release the active thread
+        self._clear_active_thread()
+        
+        return
+
+    @QtCore.pyqtSlot()
+    def _finalize_autosave(self):
+        
+        thread = self._autosave_thread
+        if thread is None: return
+        
+        thread.wait()
+        self._autosave_thread = None
+        
+        # Discard the snapshot if the project changed while it was taken
+        if (self._active_thread is not None or
+            self._change_count != thread.change_count):
+            
+            if thread._saved: self.autosave_journal.remove(thread._save_path)
+            
+            module_logger.debug("Project changed during autosave. Deferring")
+            self._autosave_deferred = True
+            
+            return
+        
+        if thread._saved:
+            keep = self.core.get_project_archive_path(self.project)
+            self.autosave_journal.prune(keep)
+            self._saved_change_count = thread.change_count
+        
+        return
+
+    def _wait_for_threads(self):
         
-        # Update the interface status
-        self.core.set_interface_status(self.project)
-            
-        # Release the active thread
-        self._clear_active_thread()
+        """Wait for the threads using the project, before it is changed.
+        An autosave still pickling the project is finished first, so that
+        its snapshot is complete."""
+        
+        if self._active_thread is not None: self._active_thread.wait()
+        
+        for thread in self._snapshot_threads: thread.wait_for_snapshot()
+        
+        if self._autosave_thread is not None:
+            self._autosave_thread.wait()
+            self._finalize_autosave()
         
         return
-
+    
     @QtCore.pyqtSlot()
     def _clear_active_thread(self):
         
@@ -1576,12 +2083,27 @@ class Shell(QtCore.QObject):
         
         self._active_thread.wait()
         self._active_thread = None
+        self._change_count += 1
+        
+        # Take any autosave that was deferred by the thread
+        if self._autosave_deferred:
+            QtCore.QTimer.singleShot(0, self.autosave_project)
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _count_change(self):
+        
+        self._change_count += 1
         
         return
     
     @QtCore.pyqtSlot(object)
     def _emit_update_pipeline(self):
         
+        # Statuses are evaluated once per update and shared by the branches
+        self.core.clear_status_cache()
+        
         Husk = namedtuple('Husk', ['core', 'project'])
         husk = Husk(self.core, self.project)
         
@@ -1624,6 +2146,7 @@ class DTOceanWindow(MainWindow):
         self._pipeline_dock = None
         self._simulation_dock = None
         self._system_dock = None
+        self._profile_dock = None
         
         # Widget re-use
         self._last_tree_controller = None
@@ -1632,6 +2155,12 @@ class DTOceanWindow(MainWindow):
         self._last_plot_id = None
         self._last_plot_name = "auto"
         self._force_plot = False
+        self._plot_request_id = 0
+        self._plot_request = None
+        self._plot_thread = None
+        self._plot_threads = []
+        self._plot_export_thread = None
+        self._widget_cache = None
                 
         # Last used stack index
         self._last_stack_index = None
@@ -1649,6 +2178,9 @@ class DTOceanWindow(MainWindow):
         # Init Shell
         self._shell = self._init_shell(shell)
         
+        # Init data widget cache
+        self._init_widget_cache()
+        
         # Init context areas
         self._init_context()
         
@@ -1660,6 +2192,7 @@ class DTOceanWindow(MainWindow):
         self._init_pipeline_dock()
         self._init_simulation_dock()
         self._init_system_dock(debug)
+        self._init_profile_dock()
         
         # Initiate menus
         self._init_file_menu()
@@ -1699,6 +2232,18 @@ class DTOceanWindow(MainWindow):
 
         return shell
         
+    def _init_widget_cache(self):
+        
+        cache_options = get_cache_options()
+        max_bytes = int(cache_options["widget_memory"] * 1024 ** 2)
+        
+        self._widget_cache = WidgetCache(max_bytes)
+        
+        # Widgets made before the data changed can not be reused
+        self._shell.core.status_updated.connect(self._purge_widget_cache)
+        
+        return
+    
     def _init_context(self):
         
         # Blank context
@@ -1788,6 +2333,7 @@ class DTOceanWindow(MainWindow):
         self._progress = ProgressBar(self)
         self._progress.setModal(True)
         self._progress.force_quit.connect(self.close)
+        self._progress.cancel_requested.connect(self._shell.cancel_execution)
         
         # Set up the help dialog
         self._help = HelpWidget(self)
@@ -1896,6 +2442,35 @@ class DTOceanWindow(MainWindow):
         self.addDockWidget(QtCore.Qt.DockWidgetArea(8), self._system_dock)
 
         return
+    
+    def _init_profile_dock(self):
+        
+        # Profile dock, hidden until requested
+        self._profile_dock = ProfileDock(self)
+        self._profile_dock._showclose_filter._show.connect(
+                        lambda: self.actionShow_Profile.setEnabled(False))
+        self._profile_dock._showclose_filter._close.connect(
+                        lambda: self.actionShow_Profile.setEnabled(True))
+        self.addDockWidget(QtCore.Qt.DockWidgetArea(8), self._profile_dock)
+        
+        if self._system_dock is not None:
+            self.tabifyDockWidget(self._system_dock, self._profile_dock)
+        
+        self._profile_dock.hide()
+        
+        self._profile_dock.recordCheckBox.toggled.connect(
+                                                    self._shell.set_profiling)
+        self._profile_dock.clearButton.clicked.connect(self._clear_profile)
+        self._profile_dock.exportButton.clicked.connect(self._export_profile)
+        
+        # Refresh the table following execution
+        self._shell.project_activated.connect(self._update_profile)
+        self._shell.project_closed.connect(self._update_profile)
+        self._shell.module_executed.connect(self._update_profile)
+        self._shell.themes_executed.connect(self._update_profile)
+        self._shell.strategy_executed.connect(self._update_profile)
+        
+        return
         
     def _init_file_menu(self):
 
@@ -1940,6 +2515,9 @@ class DTOceanWindow(MainWindow):
         self.actionExport_mask.triggered.connect(self._export_data_mask)
         self.actionImport.triggered.connect(self._import_data)
         self.actionImport_skip.triggered.connect(self._import_data_skip)
+        
+        # Batch export of plots
+        self.actionExport_Plots.triggered.connect(self._export_plots)
     
         return
         
@@ -1960,6 +2538,10 @@ class DTOceanWindow(MainWindow):
             self.actionSystem_Log.triggered.connect(self._system_dock.show)
             self.actionSystem_Log.triggered.connect(
                             lambda: self.actionSystem_Log.setDisabled(True))
+        
+        self.actionShow_Profile.triggered.connect(self._profile_dock.show)
+        self.actionShow_Profile.triggered.connect(
+                            lambda: self.actionShow_Profile.setDisabled(True))
                             
         # Context Actions
         self.actionData.triggered.connect(
@@ -2108,6 +2690,7 @@ class DTOceanWindow(MainWindow):
         self.actionExport_mask.setEnabled(True)
         self.actionImport.setEnabled(True)
         self.actionImport_skip.setEnabled(True)
+        self.actionExport_Plots.setEnabled(True)
         
         # Activate the pipeline
         start_branch_map = [{"hub": SectionControl,
@@ -2133,6 +2716,8 @@ class DTOceanWindow(MainWindow):
         self._shell.project.sims_updated.connect(
             lambda: self._simulation_dock._update_simulations(
                                                   self._shell.project))
+        self._shell.project.sims_updated.connect(
+                                self._strategy_manager.clear_values_cache)
         self._simulation_dock._update_simulations(self._shell.project)
         
         # Set up details widget on the data context area
@@ -2220,6 +2805,7 @@ class DTOceanWindow(MainWindow):
         self.actionExport_mask.setDisabled(True)
         self.actionImport.setDisabled(True)
         self.actionImport_skip.setDisabled(True)
+        self.actionExport_Plots.setDisabled(True)
 
         # Enable actions
         self.actionNew.setEnabled(True)
@@ -2278,6 +2864,9 @@ class DTOceanWindow(MainWindow):
         # Remove main widget from comparison context
         if self._comp_context._bottom_contents is not None:
             self._clear_bottom_contents(self._comp_context)
+        
+        # Discard cached data widgets
+        self._widget_cache.clear()
 
         # Update the central widget
         self.stackedWidget.setCurrentIndex(0)
@@ -2286,6 +2875,7 @@ class DTOceanWindow(MainWindow):
         self._last_data_controller_status = None
         self._last_plot_id = None
         self._last_plot_name = "auto"
+        self._cancel_plot()
         
         # Trigger the tool menu switcher (not likely concurrent)
         self._tool_menu_ui_switch(self._shell)
@@ -2778,7 +3368,7 @@ class DTOceanWindow(MainWindow):
             
             if self._data_context._bottom_contents is not None:
                 
-                self._clear_bottom_contents(self._data_context)
+                self._detach_data_widget()
                 self._last_data_controller = None
             
             return
@@ -2797,34 +3387,79 @@ class DTOceanWindow(MainWindow):
             return
         
         if self._data_context._bottom_contents is not None:
-            self._clear_bottom_contents(self._data_context)
+            self._detach_data_widget()
         
         self._last_data_controller = controller
-                    
-        widget = controller._get_data_widget(self._shell)
-
-        if widget is None: return
-    
-        # Add the widget to the context
-        self._data_context._bottom_box.addWidget(widget)
-        self._data_context._bottom_contents = widget
         
-        # Connect the widgets read and nullify events
-        widget._get_read_event().connect(
-            lambda: self._read_raw(controller._variable, widget._get_result()))
+        cache_key = (self._shell.project.get_simulation(),
+                     controller._id,
+                     type(controller).__name__,
+                     controller._status,
+                     self._shell.core.get_status_version())
+        
+        widget = self._widget_cache.get(cache_key)
+        
+        if widget is None:
             
-        widget._get_nullify_event().connect(
-            lambda: self._read_raw(controller._variable, None))
+            widget = controller._get_data_widget(self._shell)
             
-        if "unavailable" in controller._status:
+            if widget is None: return
             
-            if "_disable" in dir(widget):
-                widget._disable()
-            else:
-                widget.setDisabled(True)
+            # Connect the widgets read and nullify events
+            variable = controller._variable
+            
+            widget._get_read_event().connect(
+                lambda: self._read_raw(variable, widget._get_result()))
+            
+            widget._get_nullify_event().connect(
+                lambda: self._read_raw(variable, None))
+            
+            if "unavailable" in controller._status:
+                
+                if "_disable" in dir(widget):
+                    widget._disable()
+                else:
+                    widget.setDisabled(True)
+            
+            self._widget_cache.put(cache_key, widget)
+        
+        # Add the widget to the context
+        self._data_context._bottom_box.addWidget(widget)
+        self._data_context._bottom_contents = widget
+        widget.show()
                 
         return
     
+    def _detach_data_widget(self):
+        
+        widget = self._data_context._bottom_contents
+        
+        # Keep cached widgets for reuse
+        if not self._widget_cache.has_widget(widget):
+            self._clear_bottom_contents(self._data_context)
+            return
+        
+        self._data_context._bottom_box.removeWidget(widget)
+        widget.setParent(None)
+        self._data_context._bottom_contents = None
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _purge_widget_cache(self):
+        
+        version = self._shell.core.get_status_version()
+        self._widget_cache.discard(lambda key: key[-1] != version)
+        
+        msg = ("Data widget cache holds {} widgets ({:.1f} MB, {} hits, {} "
+               "misses)").format(len(self._widget_cache),
+                                 self._widget_cache.size / 1024. ** 2,
+                                 self._widget_cache.hits,
+                                 self._widget_cache.misses)
+        module_logger.debug(msg)
+        
+        return
+    
     @QtCore.pyqtSlot(object, str)
     def _set_plot_widget(self, controller,
                                plot_name=None,
@@ -2832,6 +3467,8 @@ class DTOceanWindow(MainWindow):
         
         if controller is None:
             
+            self._cancel_plot()
+            
             if self._plot_context._bottom_contents is not None:
                 
                 self._clear_bottom_contents(self._plot_context)
@@ -2850,16 +3487,90 @@ class DTOceanWindow(MainWindow):
         
         if plot_name == "auto": plot_name = None
         
+        self._cancel_plot()
+        
         if self._plot_context._bottom_contents is not None:
             self._clear_bottom_contents(self._plot_context)
 
         self._last_plot_id = controller._id
         self._last_plot_name = plot_name
-
+        
+        interface = controller._get_plot_interface(self._shell, plot_name)
+        
+        if interface is None: return
+        
+        # Show a placeholder while the figure is made in a worker
+        self._add_plot_placeholder()
+        
+        self._plot_request_id += 1
+        self._plot_request = (self._plot_request_id, controller, plot_name)
+        
+        thread = ThreadPlot(self._shell.core,
+                            self._shell.project,
+                            interface,
+                            self._plot_request_id)
+        thread.plot_ready.connect(self._show_plot)
+        thread.plot_fallback.connect(self._show_plot_fallback)
+        
+        self._plot_thread = thread
+        self._start_plot_thread(thread)
+        
+        return
+    
+    @QtCore.pyqtSlot(object, object, object)
+    def _show_plot(self, request_id, status, data):
+        
+        controller = self._get_plot_request_controller(request_id)
+        if controller is None: return
+        
+        if status != PLOT_FIGURE:
+            self._add_plot_placeholder("No plot available")
+            return
+        
+        widget = MPLWidget(data, self)
+        
+        self._add_plot_widget(controller, widget)
+        
+        return
+    
+    @QtCore.pyqtSlot(object)
+    def _show_plot_fallback(self, request_id):
+        
+        if (self._plot_request is None or
+            self._plot_request[0] != request_id): return
+        
+        plot_name = self._plot_request[2]
+        controller = self._get_plot_request_controller(request_id)
+        
         widget = controller._get_plot_widget(self._shell, plot_name)
         
-        if widget is None: return
+        if widget is None:
+            self._add_plot_placeholder("No plot available")
+            return
+        
+        self._add_plot_widget(controller, widget)
+        
+        return
+    
+    def _get_plot_request_controller(self, request_id):
+        
+        """Complete the current plot request, removing its placeholder, and
+        return its controller. Returns None for stale requests."""
+        
+        if (self._plot_request is None or
+            self._plot_request[0] != request_id): return None
+        
+        controller = self._plot_request[1]
+        self._plot_request = None
+        self._plot_thread = None
+        
+        if self._plot_context._bottom_contents is not None:
+            self._clear_bottom_contents(self._plot_context)
+        
+        return controller
     
+    def _add_plot_widget(self, controller, widget):
+        
         # Add the widget to the context
         self._plot_context._bottom_box.addWidget(widget)
         self._plot_context._bottom_contents = widget
@@ -2867,17 +3578,70 @@ class DTOceanWindow(MainWindow):
         # Draw the widget
         widget.draw_idle()
         
-        if len(plt.get_fignums()) > 3:
-            
-            num_strs = ["{}".format(x) for x in plt.get_fignums()]
-            num_str = ", ".join(num_strs)
-            err_msg = ("Too many matplotlib figures detected. "
-                       "Numbers: {}").format(num_str)
-            
-            raise RuntimeError(err_msg)
+        figure_pool.check()
             
         if "unavailable" in controller._status: widget.setDisabled(True)
         
+        # Saving requires the current figure
+        self._plot_manager._set_ext_types()
+        
+        return
+    
+    def _add_plot_placeholder(self, text="Plotting..."):
+        
+        widget = PlotPlaceholder(self, text)
+        self._plot_context._bottom_box.addWidget(widget)
+        self._plot_context._bottom_contents = widget
+        
+        return
+    
+    def _start_plot_thread(self, thread):
+        
+        thread.error_detected.connect(self._display_error)
+        thread.finished.connect(lambda: self._release_plot_thread(thread))
+        
+        # Changes to the project wait until its data is loaded
+        self._plot_threads.append(thread)
+        self._shell._snapshot_threads.append(thread)
+        thread.start()
+        
+        return
+    
+    def _release_plot_thread(self, thread):
+        
+        if thread not in self._plot_threads: return
+        
+        thread.wait()
+        self._plot_threads.remove(thread)
+        self._shell._snapshot_threads.remove(thread)
+        
+        return
+    
+    def _cancel_plot(self):
+        
+        """Abandon any plot that is still being made for display"""
+        
+        self._plot_request = None
+        
+        if self._plot_thread is None: return
+        
+        self._plot_thread.cancel()
+        self._plot_thread = None
+        
+        return
+    
+    def _stop_plot_threads(self):
+        
+        self._cancel_plot()
+        
+        for thread in self._plot_threads:
+            thread.cancel()
+            thread.wait()
+            self._shell._snapshot_threads.remove(thread)
+        
+        self._plot_threads = []
+        close_render_pool()
+        
         return
     
     @QtCore.pyqtSlot(object, str, object, object)
@@ -2885,17 +3649,150 @@ class DTOceanWindow(MainWindow):
         
         if controller is None: return
         if plot_name == "auto": plot_name = None
-
-        controller._save_plot(self._shell, file_path, size, plot_name)
         
-        if len(plt.get_fignums()) > 3:
-            
-            num_strs = ["{}".format(x) for x in plt.get_fignums()]
-            num_str = ", ".join(num_strs)
-            err_msg = ("Too many matplotlib figures detected. "
-                       "Numbers: {}").format(num_str)
-            
-            raise RuntimeError(err_msg)
+        interface = controller._get_plot_interface(self._shell, plot_name)
+        
+        if interface is None: return
+        
+        # The figure is saved by a worker, unless its interface can not be
+        # sent to one
+        thread = ThreadPlot(self._shell.core,
+                            self._shell.project,
+                            interface,
+                            None,
+                            save_args=(str(file_path), size))
+        thread.plot_fallback.connect(
+                lambda *args: controller._save_plot(self._shell,
+                                                    file_path,
+                                                    size,
+                                                    plot_name))
+        
+        self._start_plot_thread(thread)
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _export_plots(self):
+        
+        # Using the action again cancels a running export
+        if self._plot_export_thread is not None:
+            self._plot_export_thread.cancel()
+            self.actionExport_Plots.setText("Cancelling Plot Export...")
+            return
+        
+        if self._shell.project is None: return
+        
+        # The project can not be copied while it is changed by another task
+        if self._shell._active_thread is not None:
+            QtGui.QMessageBox.information(self,
+                                          "Export Plots",
+                                          "Plots can not be exported until "
+                                          "the running task is complete")
+            return
+        
+        controls = self._pipeline_dock._get_plot_controls(self._shell)
+        
+        if not controls:
+            QtGui.QMessageBox.information(self,
+                                          "Export Plots",
+                                          "No variables with plots are "
+                                          "available")
+            return
+        
+        selected_var_id = None
+        
+        if self._last_tree_controller is not None:
+            selected_var_id = self._last_tree_controller._id
+        
+        dialog = PlotExport(self)
+        dialog.set_choices(self._shell.project.get_simulation_titles(),
+                           [(controller._id, controller._title)
+                                                for controller in controls],
+                           selected_var_id,
+                           get_max_workers())
+        
+        if not dialog.exec_(): return
+        
+        config = dialog.get_config()
+        variables = [(controller._variable, controller._title)
+                                    for controller in controls
+                                        if controller._id in config["var_ids"]]
+        
+        tasks = get_export_tasks(config["sim_titles"],
+                                 variables,
+                                 config["out_dir"],
+                                 config["size"],
+                                 config["dpi"],
+                                 config["ext"],
+                                 config["all_plots"])
+        
+        # A saved project is read by the workers from its file, otherwise
+        # the selected simulations are copied by the thread
+        project_path = None
+        
+        if (self._shell.project_path is not None and
+            not self._shell.project_unsaved):
+            project_path = str(self._shell.project_path)
+        
+        # The project must not change until it is copied
+        self._shell._wait_for_threads()
+        
+        thread = ThreadPlotExport(self._shell.project,
+                                  project_path,
+                                  config["sim_titles"],
+                                  tasks,
+                                  config["out_dir"],
+                                  config["n_workers"])
+        thread.progress_updated.connect(self._update_plot_export)
+        thread.export_complete.connect(self._finish_plot_export)
+        thread.error_detected.connect(self._display_error)
+        thread.finished.connect(self._release_plot_export)
+        
+        self._plot_export_thread = thread
+        self._shell._snapshot_threads.append(thread)
+        self._update_plot_export(0, len(tasks))
+        
+        thread.start()
+        
+        return
+    
+    @QtCore.pyqtSlot(object, object)
+    def _update_plot_export(self, done, total):
+        
+        if self._plot_export_thread is None: return
+        
+        text = "Cancel Plot Export ({} of {})...".format(done, total)
+        self.actionExport_Plots.setText(text)
+        
+        return
+    
+    @QtCore.pyqtSlot(object, object)
+    def _finish_plot_export(self, index_path, n_plots):
+        
+        msg = ("Exported {} plots. The index of the files is "
+               "{}").format(n_plots, index_path)
+        QtGui.QMessageBox.information(self, "Export Plots", msg)
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _release_plot_export(self):
+        
+        if self._plot_export_thread in self._shell._snapshot_threads:
+            self._shell._snapshot_threads.remove(self._plot_export_thread)
+        
+        self._plot_export_thread = None
+        self.actionExport_Plots.setText("Export Plots...")
+        
+        return
+    
+    def _stop_plot_export(self):
+        
+        if self._plot_export_thread is None: return
+        
+        self._plot_export_thread.cancel()
+        self._plot_export_thread.wait()
+        self._release_plot_export()
         
         return
     
@@ -2940,14 +3837,7 @@ class DTOceanWindow(MainWindow):
         # Draw the widget
         widget.draw_idle()
         
-        if len(plt.get_fignums()) > 3:
-            
-            num_strs = ["{}".format(x) for x in plt.get_fignums()]
-            num_str = ", ".join(num_strs)
-            err_msg = ("Too many matplotlib figures detected. "
-                       "Numbers: {}").format(num_str)
-            
-            raise RuntimeError(err_msg)
+        figure_pool.check()
         
         # Switch on save button
         self._sim_comparison.buttonBox.button(
@@ -3042,14 +3932,7 @@ class DTOceanWindow(MainWindow):
         # Draw the widget
         widget.draw_idle()
         
-        if len(plt.get_fignums()) > 3:
-            
-            num_strs = ["{}".format(x) for x in plt.get_fignums()]
-            num_str = ", ".join(num_strs)
-            err_msg = ("Too many matplotlib figures detected. "
-                       "Numbers: {}").format(num_str)
-            
-            raise RuntimeError(err_msg)
+        figure_pool.check()
         
         # Switch save buttons
         self._level_comparison.buttonBox.button(
@@ -3238,6 +4121,16 @@ class DTOceanWindow(MainWindow):
         
         return
         
+    @QtCore.pyqtSlot()
+    def _recover_project_finalize(self):
+        
+        if self._shell.project is None: return
+        
+        # The recovered changes have not been saved
+        self._set_project_unsaved()
+        
+        return
+        
     @QtCore.pyqtSlot()
     def _save_project(self):
         
@@ -3311,6 +4204,47 @@ class DTOceanWindow(MainWindow):
             self._shell.export_data(file_path)
         
         return
+    
+    @QtCore.pyqtSlot()
+    def _update_profile(self):
+        
+        if self._shell.project is None:
+            self._profile_dock._update_profile(None)
+        else:
+            self._profile_dock._update_profile(
+                                        self._shell.project.get_profile())
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _clear_profile(self):
+        
+        if self._shell.project is None: return
+        
+        self._shell.project.clear_profile()
+        self._update_profile()
+        self._set_project_unsaved()
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _export_profile(self):
+        
+        if self._shell.project is None: return
+        
+        msg = "Export Execution Profile"
+        valid_exts = "CSV Files (*.csv)"
+        
+        file_path = QtGui.QFileDialog.getSaveFileName(self,
+                                                      msg,
+                                                      HOME,
+                                                      valid_exts)
+        
+        if file_path:
+            write_profile_csv(self._shell.project.get_profile(),
+                              str(file_path))
+        
+        return
         
     @QtCore.pyqtSlot()
     def _export_data_mask(self):
@@ -3700,9 +4634,12 @@ class DTOceanWindow(MainWindow):
         
         self._progress.allow_close = False
         self._progress.set_pulsing()
+        self._progress.set_cancellable(True)
         
         self._shell.execute_current()
         
+        self._shell._active_thread.progress_updated.connect(
+                                                self._progress.set_status)
         self._shell._active_thread.error_detected.connect(self._display_error)
         self._shell._active_thread.finished.connect(self._close_progress)
         
@@ -3715,9 +4652,12 @@ class DTOceanWindow(MainWindow):
         
         self._progress.allow_close = False
         self._progress.set_pulsing()
+        self._progress.set_cancellable(True)
         
         self._shell.execute_themes()
         
+        self._shell._active_thread.progress_updated.connect(
+                                                self._progress.set_status)
         self._shell._active_thread.error_detected.connect(self._display_error)
         self._shell._active_thread.finished.connect(self._close_progress)
         
@@ -3733,9 +4673,12 @@ class DTOceanWindow(MainWindow):
         
         self._progress.allow_close = False
         self._progress.set_pulsing()
+        self._progress.set_cancellable(True)
         
         self._shell.execute_strategy()
         
+        self._shell._active_thread.progress_updated.connect(
+                                                self._progress.set_status)
         self._shell._active_thread.error_detected.connect(self._display_error)
         self._shell._active_thread.finished.connect(self._close_progress)
         
@@ -3854,6 +4797,52 @@ class DTOceanWindow(MainWindow):
         
         return reply
 
+    def start_autosave(self):
+        
+        """Offer to recover the newest readable snapshot left in the
+        autosave journal by a crash, and then start autosaving"""
+        
+        autosave_options = get_autosave_options()
+        
+        if not autosave_options["enabled"]: return
+        
+        autosave_dir = get_autosave_dir()
+        journal = AutosaveJournal(autosave_dir.get_path(),
+                                  autosave_options["snapshots"])
+        recoverable = journal.find_recoverable()
+        
+        if recoverable is not None:
+            
+            snapshot_path, info = recoverable
+            snapshot_time = time.ctime(os.path.getmtime(snapshot_path))
+            
+            qstr = ("DTOcean did not close correctly. Recover project '{}' "
+                    "from the autosave taken at {}?").format(info["title"],
+                                                             snapshot_time)
+            
+            reply = QtGui.QMessageBox.question(self,
+                                               'Recover Project',
+                                               qstr,
+                                               QtGui.QMessageBox.Yes,
+                                               QtGui.QMessageBox.No)
+            
+            if reply == QtGui.QMessageBox.Yes:
+                
+                if self._shell.project is not None:
+                    self._shell.close_project()
+                
+                self._waitcursor_open(snapshot_path)
+                self._shell._active_thread.finished.connect(
+                                            self._recover_project_finalize)
+            
+            else:
+                
+                journal.clear()
+        
+        self._shell.start_autosave(journal, autosave_options["interval"])
+        
+        return
+
     def closeEvent(self, event):
         
         # Check for active thread
@@ -3871,6 +4860,7 @@ class DTOceanWindow(MainWindow):
                             QtGui.QMessageBox.No | QtGui.QMessageBox.Default)
             
             if reply == QtGui.QMessageBox.Yes:
+                self._shell.cancel_execution()
                 sys.excepthook = sys.__excepthook__
                 event.accept()
             elif reply == QtGui.QMessageBox.No:
@@ -3886,6 +4876,9 @@ class DTOceanWindow(MainWindow):
         if reply == QtGui.QMessageBox.Cancel:
             event.ignore()
         else:
+            self._shell.stop_autosave(clear=True)
+            self._stop_plot_threads()
+            self._stop_plot_export()
             event.accept()
         
         return
@@ -3898,14 +4891,7 @@ class DTOceanWindow(MainWindow):
         
         if isinstance(context._bottom_contents, MPLWidget):
             
-            fignum = context._bottom_contents.figure.number
-            n_figs = len(plt.get_fignums())
-            
-            log_msg = "Closing figure {} ({} open)".format(fignum, n_figs)
-            module_logger.debug(log_msg)
-            
-            sip.delete(context._bottom_contents)
-            plt.close(fignum)
+            figure_pool.release(context._bottom_contents)
             
         else:
             
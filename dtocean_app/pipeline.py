@@ -23,17 +23,19 @@ Created on Thu Apr 23 12:51:14 2015
 
 
 import os
+import re
 import runpy
+import logging
 from collections import OrderedDict
 
 import pandas as pd
 import matplotlib.pyplot as plt
 from PyQt4 import QtGui, QtCore
-from  PIL import Image
 
 from dtocean_core.pipeline import Tree, _get_connector
 
 from .widgets.docks import PipeLineDock
+from .plotting import save_figure
 from .widgets.display import MPLWidget
 from .widgets.dialogs import TestDataPicker
 from .widgets.input import CancelWidget
@@ -42,6 +44,151 @@ from .utils.icons import (make_redicon_pixmap,
                           make_blueicon_pixmap,
                           make_buttoncancel_pixmap)
 
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+# Matching modes of the pipeline filter, in the order of the mode selector
+FILTER_MODES = ["substring", "fuzzy", "regex"]
+
+# Milliseconds to wait after typing stops before filtering the tree
+FILTER_DELAY = 250
+
+
+class PipelineSearchIndex(object):
+    
+    """Searchable text of the items of the pipeline tree, being the title
+    and any variable identifier of each controller, with the address of its
+    parent.
+    
+    If the item model is given, the items of controllers whose children are
+    deferred are indexed from the metadata of their variables, without
+    making the items.
+    """
+    
+    def __init__(self, root_controls, model=None):
+        
+        self._texts = []
+        self._parents = {}
+        self._deferred = {}
+        self._model = model
+        
+        self._add_controls(root_controls)
+        
+        return
+    
+    def _add_controls(self, controls, parent_address=None):
+        
+        for controller in controls:
+            
+            self._add_texts(controller._address,
+                            controller._title,
+                            controller._id,
+                            parent_address)
+            
+            deferred_items = None
+            
+            if self._model is not None:
+                deferred_items = self._model.get_deferred_items(controller)
+            
+            if deferred_items is None:
+                self._add_controls(controller._controls, controller._address)
+                continue
+            
+            for address, title, var_id in deferred_items:
+                self._add_texts(address, title, var_id, controller._address)
+                self._deferred[address] = controller
+        
+        return
+    
+    def _add_texts(self, address, title, var_id, parent_address):
+        
+        texts = [title.lower()]
+        if var_id is not None: texts.append(str(var_id).lower())
+        
+        self._texts.append((address, texts))
+        self._parents[address] = parent_address
+        
+        return
+    
+    def get_deferred(self, addresses):
+        
+        """Return the controllers whose deferred children include any of the
+        given addresses"""
+        
+        controllers = []
+        
+        for address in addresses:
+            
+            controller = self._deferred.get(address)
+            
+            if controller is None or controller in controllers: continue
+            controllers.append(controller)
+        
+        return controllers
+    
+    def search(self, pattern, mode="substring"):
+        
+        """Find the items matching the pattern, using the given mode from
+        FILTER_MODES.
+        
+        Returns:
+            tuple: sets of the addresses of the matching items and of their
+                ancestors
+        
+        """
+        
+        matcher = _get_matcher(pattern, mode)
+        matches = set()
+        
+        for address, texts in self._texts:
+            if any([matcher(text) for text in texts]): matches.add(address)
+        
+        ancestors = set()
+        
+        for address in matches:
+            
+            parent = self._parents[address]
+            
+            while parent is not None and parent not in ancestors:
+                ancestors.add(parent)
+                parent = self._parents[parent]
+        
+        return matches, ancestors
+
+
+def _get_matcher(pattern, mode):
+    
+    if mode not in FILTER_MODES:
+        
+        errStr = ("Argument mode must be one of {}. Given value is "
+                  "'{}'").format(", ".join(FILTER_MODES), mode)
+        raise ValueError(errStr)
+    
+    if mode == "substring":
+        pattern = pattern.lower()
+        return lambda text: pattern in text
+    
+    if mode == "fuzzy":
+        
+        letters = "".join(pattern.lower().split())
+        
+        def fuzzy_matcher(text):
+            
+            # The letters of the pattern must appear in order
+            remaining = iter(text)
+            
+            return all([letter in remaining for letter in letters])
+        
+        return fuzzy_matcher
+    
+    try:
+        regex = re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        module_logger.debug("Invalid filter expression: {}".format(pattern))
+        return lambda text: False
+    
+    return lambda text: regex.search(text) is not None
+
 
 class PipelineFilterProxyModel(QtGui.QSortFilterProxyModel):
     ''' Class to override the following behaviour:
@@ -54,7 +201,30 @@ class PipelineFilterProxyModel(QtGui.QSortFilterProxyModel):
     Source:
         https://gaganpreet.in/blog/2013/07/04/
         qtreeview-and-custom-filter-models/
+    
+    If a search has been set, using set_search, rows are matched using its
+    precomputed results rather than the filter regular expression.
     '''
+    
+    def __init__(self, *args, **kwargs):
+        
+        super(PipelineFilterProxyModel, self).__init__(*args, **kwargs)
+        self._matches = None
+        self._ancestors = None
+        
+        return
+    
+    def set_search(self, matches=None, ancestors=None):
+        
+        """Filter using sets of the addresses of the matching items and of
+        their ancestors, as returned by PipelineSearchIndex.search, or stop
+        filtering if matches is None"""
+        
+        self._matches = matches
+        self._ancestors = ancestors
+        self.invalidateFilter()
+        
+        return
  
     def filterAcceptsRow(self, row_num, source_parent):
  
@@ -79,6 +249,9 @@ class PipelineFilterProxyModel(QtGui.QSortFilterProxyModel):
         # If the row is not visible then disallow
         if not source_user_dict["visible"]: return False
         
+        if self._matches is not None:
+            return source_user_dict["address"] in self._matches
+        
         return super(PipelineFilterProxyModel, self).filterAcceptsRow(row_num,
                                                                       parent)
 
@@ -88,6 +261,15 @@ class PipelineFilterProxyModel(QtGui.QSortFilterProxyModel):
         '''
         model = self.sourceModel()
         source_index = model.index(row_num, 0, parent)
+        
+        # Only the ancestors of matching items can have accepted children
+        if self._ancestors is not None:
+            
+            source_user_data = model.data(source_index, 33)
+            source_user_dict = source_user_data.toPyObject()[0]
+            
+            if source_user_dict["address"] not in self._ancestors:
+                return False
  
         children_count =  model.rowCount(source_index)
         for i in xrange(children_count):
@@ -96,6 +278,197 @@ class PipelineFilterProxyModel(QtGui.QSortFilterProxyModel):
         return False
 
 
+class ControlIndex(object):
+    
+    """Index of the controllers of the pipeline tree by address and by
+    title, so that they can be found without walking the tree"""
+    
+    def __init__(self):
+        
+        self._addresses = {}
+        self._titles = {}
+        self.version = 0
+        
+        return
+    
+    def add(self, controller):
+        
+        self._addresses[controller._address] = controller
+        self._titles.setdefault(controller._title, []).append(controller)
+        self.version += 1
+        
+        return
+    
+    def remove(self, controller):
+        
+        """Remove a controller and all of its descendants"""
+        
+        for child in controller._controls:
+            self.remove(child)
+        
+        if self._addresses.get(controller._address) is controller:
+            del self._addresses[controller._address]
+        
+        title_controllers = self._titles.get(controller._title, [])
+        
+        for i, title_controller in enumerate(title_controllers):
+            if title_controller is controller:
+                del title_controllers[i]
+                break
+        
+        if not title_controllers: self._titles.pop(controller._title, None)
+        
+        self.version += 1
+        
+        return
+    
+    def clear(self):
+        
+        self._addresses = {}
+        self._titles = {}
+        self.version += 1
+        
+        return
+    
+    def find_address(self, address, controller_class=None):
+        
+        controller = self._addresses.get(address)
+        
+        if (controller is None or controller_class is None or
+            isinstance(controller, controller_class)): return controller
+        
+        return None
+    
+    def find_title(self, title, controller_class=None):
+        
+        """Return the first controller added with the given title and,
+        optionally, class"""
+        
+        for controller in self._titles.get(title, []):
+            if (controller_class is None or
+                isinstance(controller, controller_class)): return controller
+        
+        return None
+
+
+class PipelineItemModel(QtGui.QStandardItemModel):
+    
+    """Item model for the pipeline tree, holding the index of the
+    controllers of its items.
+    
+    The child items of a controller can be deferred, using defer_fetch, in
+    which case they are only made when the item is first expanded in a view
+    (through canFetchMore and fetchMore) or when fetched explicitly.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        
+        super(PipelineItemModel, self).__init__(*args, **kwargs)
+        self.control_index = ControlIndex()
+        self.fetch_version = 0
+        self._pending = {}
+        
+        return
+    
+    def defer_fetch(self, controller, shell):
+        
+        """Make the child items of the controller when its item is first
+        expanded"""
+        
+        self._pending[controller._address] = (controller, shell)
+        self.fetch_version += 1
+        
+        return
+    
+    def cancel_fetch(self, controller):
+        
+        if self.is_fetch_pending(controller):
+            del self._pending[controller._address]
+            self.fetch_version += 1
+        
+        return
+    
+    def clear_fetches(self):
+        
+        self._pending = {}
+        self.fetch_version += 1
+        
+        return
+    
+    def is_fetch_pending(self, controller):
+        
+        pending = self._pending.get(controller._address)
+        
+        return pending is not None and pending[0] is controller
+    
+    def fetch(self, controller, item=None):
+        
+        """Make the child items of the controller now, if deferred"""
+        
+        if not self.is_fetch_pending(controller): return
+        
+        _, shell = self._pending.pop(controller._address)
+        self.fetch_version += 1
+        controller._fetch_children(shell, item)
+        
+        return
+    
+    def fetch_all(self):
+        
+        """Make the child items of every deferred controller"""
+        
+        while self._pending:
+            
+            address = next(iter(self._pending))
+            controller, shell = self._pending.pop(address)
+            self.fetch_version += 1
+            controller._fetch_children(shell)
+        
+        return
+    
+    def get_deferred_items(self, controller):
+        
+        """Return the address, title and variable identifier of each child
+        item of the controller, if deferred, without making the items.
+        Otherwise, return None."""
+        
+        if not self.is_fetch_pending(controller): return None
+        
+        _, shell = self._pending[controller._address]
+        
+        return controller._get_child_metadata(shell)
+    
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        
+        if self._get_pending_controller(parent) is not None: return True
+        
+        return super(PipelineItemModel, self).hasChildren(parent)
+    
+    def canFetchMore(self, parent):
+        
+        return self._get_pending_controller(parent) is not None
+    
+    def fetchMore(self, parent):
+        
+        controller = self._get_pending_controller(parent)
+        if controller is None: return
+        
+        self.fetch(controller, self.itemFromIndex(parent))
+        
+        return
+    
+    def _get_pending_controller(self, parent):
+        
+        if not self._pending or not parent.isValid(): return None
+        
+        address = str(self.data(parent, QtCore.Qt.UserRole).toString())
+        pending = self._pending.get(address)
+        
+        if pending is None: return None
+        
+        return pending[0]
+
+
 class PipeLine(PipeLineDock):
     
     error_detected =  QtCore.pyqtSignal(object, object, object)
@@ -111,6 +484,11 @@ class PipeLine(PipeLineDock):
         self._branch_map = None
         self._controls = []
         
+        # Filter search
+        self._filter_timer = None
+        self._search_index = None
+        self._search_version = None
+        
         # Test data picker
         self._test_data_picker = TestDataPicker(self)
         self._test_data_picker.setModal(True)
@@ -122,16 +500,27 @@ class PipeLine(PipeLineDock):
     
     def _init_model(self):
         
-        self._model = QtGui.QStandardItemModel()
+        self._model = PipelineItemModel()
         self._model.setColumnCount(1)
         self._proxy = PipelineFilterProxyModel()
         self._proxy.setSourceModel(self._model)
         self._proxy.setDynamicSortFilter(True)
         self.treeView.setModel(self._proxy)
         
+        # Filter once typing pauses
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        
         self.filterLineEdit.textChanged.connect(self._update_filter)
+        self.filterModeComboBox.currentIndexChanged.connect(
+                                                        self._apply_filter)
         self.clearButton.clicked.connect(self._clear_filter)
         
+        # Items added to the tree must also be filtered
+        self._model.rowsInserted.connect(self._schedule_filter)
+        
         return
     
     def _init_title(self):
@@ -192,6 +581,7 @@ class PipeLine(PipeLineDock):
                                  self._proxy,
                                  *args)
             new_control._init_ui(name_item)
+            self._model.control_index.add(new_control)
             new_control._activate(shell, name_item)
             
             self._controls.append(new_control)
@@ -218,6 +608,8 @@ class PipeLine(PipeLineDock):
         root.removeRows(0, root.rowCount())
         
         self._controls = []
+        self._model.control_index.clear()
+        self._model.clear_fetches()
 
         return
         
@@ -232,15 +624,25 @@ class PipeLine(PipeLineDock):
                        "precedence")
             raise ValueError(err_str)
         
-        if root is None: root = self
-        
         if proxy_index is not None:
             match = self._proxy.data(proxy_index, QtCore.Qt.UserRole)
             search_attr = "_address"
         else:
             match = controller_title
             search_attr = "_title"
-
+        
+        # Search the whole tree using the index
+        if root is None:
+            
+            control_index = self._model.control_index
+            
+            if proxy_index is not None:
+                return control_index.find_address(str(match.toString()),
+                                                  controller_class)
+            
+            return control_index.find_title(controller_title,
+                                            controller_class)
+        
         for controller in root._controls:
             
             if getattr(controller, search_attr) == match:
@@ -342,26 +744,47 @@ class PipeLine(PipeLineDock):
     @QtCore.pyqtSlot(str)
     def _update_filter(self, text):
         
-        search = QtCore.QRegExp(text,
-                                QtCore.Qt.CaseInsensitive,
-                                QtCore.QRegExp.RegExp
-                                )
-
-        self._proxy.setFilterRegExp(search)
+        # Restart the delay
+        self._filter_timer.start()
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _schedule_filter(self):
+        
+        if not self.filterLineEdit.text(): return
+        
+        self._filter_timer.start()
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _apply_filter(self):
+        
+        self._filter_timer.stop()
+        
+        text = unicode(self.filterLineEdit.text())
+        
+        if not text:
+            self._proxy.set_search()
+            return
+        
+        mode = FILTER_MODES[self.filterModeComboBox.currentIndex()]
+        search_index = self._get_search_index()
+        matches, ancestors = search_index.search(text, mode)
+        
+        # Only the deferred branches with matching items are made
+        for controller in search_index.get_deferred(matches):
+            self._model.fetch(controller)
+        
+        self._proxy.set_search(matches, ancestors)
         
         return
     
     @QtCore.pyqtSlot(str)
     def _repeat_filter(self):
         
-        text = self.filterLineEdit.text()
-        
-        search = QtCore.QRegExp(text,
-                                QtCore.Qt.CaseInsensitive,
-                                QtCore.QRegExp.RegExp
-                                )
-
-        self._proxy.setFilterRegExp(search)
+        self._apply_filter()
         
         return
     
@@ -369,7 +792,57 @@ class PipeLine(PipeLineDock):
     def _clear_filter(self):
         
         self.filterLineEdit.clear()
-        self._update_filter("")
+        self._apply_filter()
+        
+        return
+    
+    def _get_search_index(self):
+        
+        # Rebuild the index only if the controllers have changed
+        version = (self._model.control_index.version,
+                   self._model.fetch_version)
+        
+        if self._search_index is None or self._search_version != version:
+            self._search_index = PipelineSearchIndex(self._controls,
+                                                     self._model)
+            self._search_version = version
+        
+        return self._search_index
+    
+    def _get_plot_controls(self, shell):
+        
+        """Return the controllers of the satisfied variables which can be
+        plotted, once per variable, in the order of the tree"""
+        
+        # Items not yet expanded must be made to be found
+        self._model.fetch_all()
+        
+        controls = []
+        var_ids = set()
+        
+        self._add_plot_controls(shell, self._controls, controls, var_ids)
+        
+        return controls
+    
+    def _add_plot_controls(self, shell, controls, plot_controls, var_ids):
+        
+        for controller in controls:
+            
+            if (isinstance(controller, VarControl) and
+                controller._id not in var_ids and
+                controller._status == "satisfied" and
+                controller._variable._get_receivers(shell.core,
+                                                    shell.project,
+                                                    "PlotInterface",
+                                                    "AutoPlot")):
+                
+                plot_controls.append(controller)
+                var_ids.add(controller._id)
+            
+            self._add_plot_controls(shell,
+                                    controller._controls,
+                                    plot_controls,
+                                    var_ids)
         
         return
     
@@ -434,6 +907,14 @@ class BaseControl(object):
     def _activate(self, shell, parent):
             
         return
+    
+    def _fetch_children(self, shell, item=None):
+        
+        return
+    
+    def _get_child_metadata(self, shell):
+        
+        return []
         
     def _expand(self, shell):
         
@@ -454,6 +935,10 @@ class BaseControl(object):
         
         item.removeRows(0, item.rowCount())
         
+        for controller in self._controls:
+            self._model.control_index.remove(controller)
+            self._model.cancel_fetch(controller)
+        
         self._controls = []
 
         return
@@ -478,6 +963,10 @@ class BaseControl(object):
         
         return None
         
+    def _get_plot_interface(self, shell, plot_name=None):
+        
+        return None
+    
     def _get_plot_widget(self, shell, plot_name):
         
         return None
@@ -584,6 +1073,7 @@ class HubControl(BaseControl):
                                           branch)
             
             new_control._init_ui(name_item)
+            self._model.control_index.add(new_control)
             
             if self._active:
                 new_control._activate(shell, name_item)
@@ -625,17 +1115,48 @@ class InputBranchControl(BaseControl):
         # Update status on variable updated events
         shell.update_pipeline.connect(self._update_status)
         
-        # Initiate items
-        self._make_input_items(shell)
+        # Make the items when first expanded
+        self._model.defer_fetch(self, shell)
         
         return
     
+    def _fetch_children(self, shell, item=None):
+        
+        self._make_input_items(shell, item)
+        
+        return
+    
+    def _get_child_metadata(self, shell):
+        
+        if self._branch is None: return []
+        
+        if self._sort:
+            variable_ids = self._branch.get_inputs(shell.core, shell.project)
+        else:
+            variable_ids = shell.core.get_branch_status(shell.project,
+                                                        self._branch).keys()
+        
+        child_metadata = []
+        
+        for variable_id in variable_ids:
+            
+            if self._ignore_str in variable_id: continue
+            
+            metadata = shell.core.get_metadata(variable_id)
+            address = self._address + "." + metadata.identifier
+            
+            child_metadata.append((address,
+                                   metadata.title,
+                                   metadata.identifier))
+        
+        return child_metadata
+    
     def _expand(self, shell):
         
         if self._branch is None: return
             
-        input_status = self._branch.get_input_status(shell.core,
-                                                     shell.project)
+        input_status = shell.core.get_branch_status(shell.project,
+                                                    self._branch)
                                                      
         if not set(input_status.values()) == set(["unavailable"]):
             index = self._get_index_from_address()
@@ -648,8 +1169,8 @@ class InputBranchControl(BaseControl):
                                 parent_item=None,
                                 previous_item_address=None):
         
-        input_status = self._branch.get_input_status(shell.core,
-                                                     shell.project)
+        input_status = shell.core.get_branch_status(shell.project,
+                                                    self._branch)
         
         if parent_item is None:
             index = self._get_index_from_address()
@@ -700,6 +1221,7 @@ class InputBranchControl(BaseControl):
             new_control._init_ui(name_item)
             new_control._update_status(status, name_item, user_dict)
             
+            self._model.control_index.add(new_control)
             self._controls.append(new_control)
             
         if previous_item_address is not None:
@@ -713,9 +1235,12 @@ class InputBranchControl(BaseControl):
         return
         
     def _get_required_address(self, shell):
-                                      
-        status = self._branch.get_input_status(shell.core,
-                                               shell.project)
+        
+        # The items are needed to find their titles
+        self._model.fetch(self)
+        
+        status = shell.core.get_branch_status(shell.project,
+                                              self._branch)
 
         required = [k for (k,v) in status.items() if v == "required"]
         required = set(required)
@@ -744,10 +1269,22 @@ class InputBranchControl(BaseControl):
     @QtCore.pyqtSlot(object)
     def _update_status(self, shell):
         
+        # Items not yet made will use the latest status, but the variables
+        # of the branch may have changed
+        if self._model.is_fetch_pending(self):
+            self._model.defer_fetch(self, shell)
+            return
+        
         # Get this item
         index = self._get_index_from_address()
         item = self._model.itemFromIndex(index)
         
+        input_status = shell.core.get_branch_status(shell.project,
+                                                    self._branch)
+        
+        # Only update the items whose status has changed, if possible
+        if self._update_changed_items(item, input_status): return
+        
         # Store last selected item if in this branch and then remake the inputs
         current_item_address = None
         
@@ -764,6 +1301,36 @@ class InputBranchControl(BaseControl):
         self._make_input_items(shell, item, current_item_address)
         
         return
+    
+    def _update_changed_items(self, item, input_status):
+        
+        """Update the status of the existing variable items from the
+        given input status, touching only the items which have changed.
+        Returns False, without updating, if the variables of the branch
+        differ from the existing items."""
+        
+        if item.rowCount() != len(self._controls): return False
+        
+        control_map = {}
+        
+        for row, control in enumerate(self._controls):
+            control_map[control._id] = (row, control)
+        
+        variable_ids = [variable_id for variable_id in input_status
+                                    if self._ignore_str not in variable_id]
+        
+        if set(variable_ids) != set(control_map): return False
+        
+        for variable_id in variable_ids:
+            
+            status = input_status[variable_id]
+            row, control = control_map[variable_id]
+            
+            if control._status == status: continue
+            
+            control._update_status(status, item.child(row))
+        
+        return True
 
     @QtCore.pyqtSlot(object, str, bool)
     def _read_test_data(self, shell, test_data_path, overwrite=True):
@@ -823,13 +1390,49 @@ class OutputBranchControl(BaseControl):
         
         return
         
-    def _activate(self, shell, parent, sort=True):
+    def _activate(self, shell, parent):
         
         # Update status on variable updated events
         shell.update_pipeline.connect(self._update_status)
         
-        output_status = self._branch.get_output_status(shell.core,
-                                                       shell.project)
+        # Make the items when first expanded
+        self._model.defer_fetch(self, shell)
+        
+        return
+    
+    def _fetch_children(self, shell, item=None):
+        
+        self._make_output_items(shell, item)
+        
+        return
+    
+    def _get_child_metadata(self, shell):
+        
+        variable_ids = self._branch.get_outputs(shell.core, shell.project)
+        child_metadata = []
+        
+        for variable_id in variable_ids:
+            
+            if self._ignore_str in variable_id: continue
+            
+            metadata = shell.core.get_metadata(variable_id)
+            address = self._address + "." + metadata.identifier
+            
+            child_metadata.append((address,
+                                   metadata.title,
+                                   metadata.identifier))
+        
+        return child_metadata
+    
+    def _make_output_items(self, shell, parent_item=None, sort=True):
+        
+        if parent_item is None:
+            index = self._get_index_from_address()
+            parent_item = self._model.itemFromIndex(index)
+        
+        output_status = shell.core.get_branch_status(shell.project,
+                                                     self._branch,
+                                                     outputs=True)
         
         if sort: 
             
@@ -863,7 +1466,7 @@ class OutputBranchControl(BaseControl):
             name_item = QtGui.QStandardItem(metadata.title)
             name_item.setData(address, QtCore.Qt.UserRole)
             name_item.setData((user_dict,), 33)
-            parent.appendRow(name_item)
+            parent_item.appendRow(name_item)
             
             # Controller
             new_control = OutputVarControl(address,
@@ -876,14 +1479,16 @@ class OutputBranchControl(BaseControl):
             new_control._init_ui(name_item)
             new_control._update_status(status, name_item, user_dict)
             
+            self._model.control_index.add(new_control)
             self._controls.append(new_control)
             
         return
         
     def _expand(self, shell):
             
-        output_status = self._branch.get_output_status(shell.core,
-                                                       shell.project)
+        output_status = shell.core.get_branch_status(shell.project,
+                                                     self._branch,
+                                                     outputs=True)
                                                      
         if not set(output_status.values()) == set(["unavailable"]):
             index = self._get_index_from_address()
@@ -895,8 +1500,9 @@ class OutputBranchControl(BaseControl):
     @QtCore.pyqtSlot(object)
     def _update_status(self, shell):
 
-        output_status = self._branch.get_output_status(shell.core,
-                                                       shell.project)
+        output_status = shell.core.get_branch_status(shell.project,
+                                                     self._branch,
+                                                     outputs=True)
         
         for controller in self._controls:
             status = output_status[controller._variable._id]
@@ -1036,7 +1642,10 @@ class VarControl(BaseControl):
 
         return widget
                     
-    def _get_plot_widget(self, shell, plot_name=None):
+    def _get_plot_interface(self, shell, plot_name=None):
+        
+        """Return the plot interface for the variable, without its data, if
+        it can be loaded"""
         
         # Check that the plot name is valid
         if plot_name is not None:
@@ -1056,6 +1665,13 @@ class VarControl(BaseControl):
             not shell.core.can_load_interface(shell.project,
                                               interface)): return None
         
+        return interface
+                    
+    def _get_plot_widget(self, shell, plot_name=None):
+        
+        interface = self._get_plot_interface(shell, plot_name)
+        if interface is None: return None
+        
         self._variable._write_interface(shell.core, 
                                         shell.project,
                                         interface)
@@ -1068,23 +1684,8 @@ class VarControl(BaseControl):
     
     def _save_plot(self, shell, file_path, size, plot_name=None, dpi=220):
         
-        # Check that the plot name is valid
-        if plot_name is not None:
-            if plot_name not in self._variable.get_available_plots(
-                                                            shell.core, 
-                                                            shell.project,
-                                                            include_auto=True):
-                plot_name = None
-        
-        interface = self._variable._get_receiving_interface(shell.core, 
-                                                            shell.project,
-                                                            "PlotInterface",
-                                                            "AutoPlot",
-                                                            plot_name)
-
-        if (interface is None or
-            not shell.core.can_load_interface(shell.project,
-                                              interface)): return None
+        interface = self._get_plot_interface(shell, plot_name)
+        if interface is None: return None
         
         self._variable._write_interface(shell.core, 
                                         shell.project,
@@ -1092,24 +1693,9 @@ class VarControl(BaseControl):
         
         if interface.fig_handle is None: return None
         
-        interface.fig_handle.set_size_inches(*size)
-                        
-        with plt.rc_context(rc={'font.size': 8,
-                                'font.sans-serif': 'Verdana'}):
-        
-            interface.fig_handle.savefig(str(file_path),
-                                         dpi=dpi,
-                                         bbox_inches='tight')
-            
+        save_figure(interface.fig_handle, file_path, size, dpi)
         plt.close(interface.fig_handle)
         
-        # Ensure DPI is saved
-        try:
-            im = Image.open(str(file_path))
-            im.save(str(file_path), dpi=[dpi, dpi])
-        except IOError:
-            pass
-        
         return
 
 
@@ -0,0 +1,552 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Construction of plots in worker processes.
+
+Plot interfaces, with their data loaded, are sent to a pool of worker
+processes which use the non-interactive Agg backend. The workers connect
+the interfaces and either save the figures to file or return them pickled,
+so that they can be displayed by the GUI once they are complete. Figures
+that can not be pickled must be made by the caller instead.
+
+The plots of many variables, for many simulations, can also be exported in
+a batch. Each export worker reads the saved project file, loading only the
+simulations it plots, or otherwise loads a pickled copy of the selected
+simulations. It then saves the plots of one variable for one simulation per
+task, in a directory per simulation. An index of the saved files is written
+once all tasks are complete.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import os
+import re
+import io
+import errno
+import logging
+import multiprocessing
+import cPickle as pickle
+from cStringIO import StringIO
+
+import pandas as pd
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from .progress import ExecutionCancelled
+from .storage import read_project_file
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+# Number of worker processes used to make plots
+RENDER_WORKERS = 2
+
+# Results of a plot request
+PLOT_FIGURE = "figure"
+PLOT_SAVED = "saved"
+PLOT_NONE = "none"
+PLOT_UNPICKLABLE = "unpicklable"
+
+# Raster formats written using PIL, so that their resolution is recorded
+PIL_FORMATS = {"jpg": "jpeg",
+               "jpeg": "jpeg",
+               "tif": "tiff",
+               "tiff": "tiff"}
+
+# File formats offered for exporting plots
+EXPORT_FORMATS = ["png", "jpg", "tif", "pdf", "svg"]
+
+# File name of the index of exported plots
+EXPORT_INDEX_NAME = "index.csv"
+
+# Seconds between checks for cancellation while waiting for workers
+POLL_INTERVAL = 1.
+
+# Pool of workers, started when first needed
+_render_pool = None
+
+# Core and project used by each export worker process
+_export_core = None
+_export_project = None
+
+
+def get_render_pool():
+
+    """Return the pool of plotting worker processes, starting it if
+    required. Should be called from the GUI thread."""
+
+    global _render_pool
+
+    if _render_pool is None:
+
+        msg = "Starting {} plotting workers".format(RENDER_WORKERS)
+        module_logger.debug(msg)
+
+        _render_pool = multiprocessing.Pool(RENDER_WORKERS, _init_worker)
+
+    return _render_pool
+
+
+def close_render_pool():
+
+    global _render_pool
+
+    if _render_pool is None: return
+
+    _render_pool.terminate()
+    _render_pool.join()
+    _render_pool = None
+
+    return
+
+
+def save_figure(fig_handle, file_path, size, dpi=220):
+
+    """Save a figure to file at the given size, in inches, and dpi. The dpi
+    is recorded in raster files as they are written."""
+
+    file_path = str(file_path)
+    ext = os.path.splitext(file_path)[1][1:].lower()
+    pil_format = PIL_FORMATS.get(ext)
+
+    fig_handle.set_size_inches(*size)
+
+    with plt.rc_context(rc={'font.size': 8,
+                            'font.sans-serif': 'Verdana'}):
+
+        # The Agg backend records the dpi of PNG files itself
+        if pil_format is None:
+            fig_handle.savefig(file_path,
+                               dpi=dpi,
+                               bbox_inches='tight')
+            return
+
+        buf = io.BytesIO()
+        fig_handle.savefig(buf,
+                           format="png",
+                           dpi=dpi,
+                           bbox_inches='tight')
+
+    buf.seek(0)
+    image = Image.open(buf)
+    options = {}
+
+    if pil_format == "jpeg":
+        image = image.convert("RGB")
+        options["quality"] = plt.rcParams.get("savefig.jpeg_quality", 95)
+
+    image.save(file_path, format=pil_format, dpi=(dpi, dpi), **options)
+
+    return
+
+
+def render_plot(task):
+
+    """Connect a pickled plot interface and either save its figure, if
+    given a file path, size and dpi, or return the figure pickled.
+
+    Returns:
+        tuple: one of the PLOT_* results and the file path or pickled figure
+
+    """
+
+    interface_data, save_args = task
+
+    interface = pickle.loads(interface_data)
+    interface.connect()
+
+    fig_handle = interface.fig_handle
+
+    if fig_handle is None: return (PLOT_NONE, None)
+
+    try:
+
+        if save_args is not None:
+            save_figure(fig_handle, *save_args)
+            return (PLOT_SAVED, save_args[0])
+
+    finally:
+
+        plt.close(fig_handle)
+
+    # The figure is closed first, so that it is not restored to pyplot when
+    # unpickled by the caller
+    try:
+        fig_data = pickle.dumps(fig_handle, pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError):
+        return (PLOT_UNPICKLABLE, None)
+
+    return (PLOT_FIGURE, fig_data)
+
+
+def _init_worker():
+
+    # Figures are never shown by the workers
+    plt.switch_backend("agg")
+
+    return
+
+
+def get_export_tasks(sim_titles,
+                     variables,
+                     out_dir,
+                     size,
+                     dpi=220,
+                     ext="png",
+                     all_plots=False):
+
+    """Return the tasks for exporting the plots of the given variables for
+    each of the given simulations, one task per simulation and variable.
+
+    Args:
+        sim_titles (list): titles of the simulations
+        variables (list): tuples of the pipeline variable and its title
+        out_dir (str): directory in which to save the plots
+        size (tuple): the width and height of the plots, in inches
+        dpi (int, optional): resolution of the plots
+        ext (str, optional): the file extension, which sets the file format
+        all_plots (bool, optional): save every available plot of each
+            variable, rather than the default plot only
+
+    """
+
+    var_data = [(pickle.dumps(variable, pickle.HIGHEST_PROTOCOL), title)
+                                            for variable, title in variables]
+
+    tasks = []
+
+    for sim_title in sim_titles:
+        for data, title in var_data:
+            tasks.append((len(tasks),
+                          sim_title,
+                          data,
+                          title,
+                          str(out_dir),
+                          size,
+                          dpi,
+                          ext,
+                          all_plots))
+
+    return tasks
+
+
+def export_plot_tasks(project_data,
+                      tasks,
+                      n_workers,
+                      progress=None,
+                      cancel_token=None,
+                      project_path=None):
+
+    """Execute plot export tasks using a pool of worker processes, each of
+    which loads the given pickled project or, if project_path is given,
+    reads the saved project file instead. Progress is reported by calling
+    progress with the number of completed and total tasks. If cancel_token
+    is cancelled, the unfinished tasks are abandoned and ExecutionCancelled
+    is raised.
+
+    Returns:
+        tuple: the simulation, variable id, variable title, plot name and
+            file path of each saved plot, in the order of the tasks, and a
+            list of messages describing the plots which could not be saved
+
+    """
+
+    total = len(tasks)
+    done = 0
+
+    msg = "Exporting plots for {} tasks using {} workers".format(total,
+                                                                 n_workers)
+    module_logger.info(msg)
+
+    if progress is not None: progress(done, total)
+
+    results = [None] * total
+    errors = []
+    cancelled = False
+    pool = multiprocessing.Pool(max(1, min(n_workers, total)),
+                                _init_export_worker,
+                                (project_data, project_path))
+
+    try:
+
+        task_results = pool.imap_unordered(export_plots, tasks)
+
+        for _ in range(total):
+
+            # Wait for the next task, checking for cancellation
+            while True:
+
+                if cancel_token is not None:
+                    cancelled = cancel_token.is_cancelled()
+
+                if cancelled: break
+
+                try:
+                    i, records, task_errors = task_results.next(
+                                                        timeout=POLL_INTERVAL)
+                    break
+                except multiprocessing.TimeoutError:
+                    pass
+
+            if cancelled: break
+
+            results[i] = records
+            errors.extend(task_errors)
+            done += 1
+
+            if progress is not None: progress(done, total)
+
+        pool.close()
+
+    finally:
+
+        pool.terminate()
+        pool.join()
+
+    if cancelled:
+
+        msg = ("Plot export cancelled with {} of {} tasks "
+               "complete").format(done, total)
+        module_logger.info(msg)
+
+        errStr = "Plot export was cancelled"
+        raise ExecutionCancelled(errStr)
+
+    records = [record for task_records in results
+                                        for record in task_records]
+
+    return records, errors
+
+
+def export_plots(task):
+
+    """Save the plots of a pickled pipeline variable for one simulation of
+    the project loaded by the worker.
+
+    Returns:
+        tuple: the task index, the records of the saved plots and messages
+            describing any plots which could not be saved
+
+    """
+
+    (task_index,
+     sim_title,
+     var_data,
+     var_title,
+     out_dir,
+     size,
+     dpi,
+     ext,
+     all_plots) = task
+
+    core = _export_core
+    project = _export_project
+    variable = pickle.loads(var_data)
+
+    project.set_active_index(title=sim_title)
+
+    plot_names = ["auto"]
+
+    if all_plots:
+
+        plot_list = variable.get_available_plots(core, project)
+        if plot_list is None: plot_list = []
+
+        all_interfaces = variable._get_receivers(core,
+                                                 project,
+                                                 "PlotInterface",
+                                                 "AutoPlot")
+
+        if not set(all_interfaces) - set(plot_list): plot_names = []
+        plot_names.extend(plot_list)
+
+    records = []
+    errors = []
+
+    for plot_name in plot_names:
+
+        try:
+            file_path = _export_plot(core,
+                                     project,
+                                     variable,
+                                     plot_name,
+                                     out_dir,
+                                     sim_title,
+                                     size,
+                                     dpi,
+                                     ext)
+        except Exception as e: # pylint: disable=broad-except
+            error = u"{} / {} / {}: {}".format(sim_title,
+                                              variable._id,
+                                              plot_name,
+                                              e)
+            errors.append(error)
+            continue
+
+        if file_path is None: continue
+
+        records.append((sim_title,
+                        variable._id,
+                        var_title,
+                        plot_name,
+                        file_path))
+
+    return task_index, records, errors
+
+
+def get_export_path(out_dir, sim_title, var_id, plot_name="auto", ext="png"):
+
+    """Return the path of an exported plot, in a directory for each
+    simulation. Named plots are saved with their name appended to the
+    variable identifier."""
+
+    file_name = _get_safe_name(var_id)
+
+    if plot_name is not None and plot_name != "auto":
+        file_name += "_" + _get_safe_name(plot_name)
+
+    file_name = "{}.{}".format(file_name, ext)
+
+    return os.path.join(out_dir, _get_safe_name(sim_title), file_name)
+
+
+def write_plot_index(records, out_dir):
+
+    """Write a CSV index of exported plots to the given directory, with the
+    path of each file relative to it.
+
+    Returns:
+        str: the path of the index
+
+    """
+
+    rows = [(sim_title,
+             var_id,
+             var_title,
+             plot_name,
+             os.path.relpath(file_path, out_dir))
+                for sim_title,
+                    var_id,
+                    var_title,
+                    plot_name,
+                    file_path in records]
+
+    table = pd.DataFrame(rows,
+                         columns=["Simulation",
+                                  "Variable",
+                                  "Title",
+                                  "Plot",
+                                  "File"])
+
+    index_path = os.path.join(out_dir, EXPORT_INDEX_NAME)
+    table.to_csv(index_path, index=False, encoding="utf-8")
+
+    return index_path
+
+
+def _export_plot(core,
+                 project,
+                 variable,
+                 plot_name,
+                 out_dir,
+                 sim_title,
+                 size,
+                 dpi,
+                 ext):
+
+    if plot_name == "auto":
+        interface_name = None
+    else:
+        interface_name = plot_name
+
+    interface = variable._get_receiving_interface(core,
+                                                  project,
+                                                  "PlotInterface",
+                                                  "AutoPlot",
+                                                  interface_name)
+
+    if (interface is None or
+        not core.can_load_interface(project, interface)): return None
+
+    variable._write_interface(core, project, interface)
+
+    fig_handle = interface.fig_handle
+    if fig_handle is None: return None
+
+    file_path = get_export_path(out_dir,
+                                sim_title,
+                                variable._id,
+                                plot_name,
+                                ext)
+
+    try:
+        _make_dir(os.path.dirname(file_path))
+        save_figure(fig_handle, file_path, size, dpi)
+    finally:
+        plt.close(fig_handle)
+
+    return file_path
+
+
+def _make_dir(dir_path):
+
+    # Workers may make the same directory at the same time
+    try:
+        os.makedirs(dir_path)
+    except OSError as e:
+        if e.errno != errno.EEXIST: raise
+
+    return
+
+
+def _get_safe_name(name):
+
+    safe_name = re.sub(r'[^\w\-. ]+', '_', unicode(name), flags=re.UNICODE)
+    safe_name = safe_name.strip(" .")
+
+    if not safe_name: safe_name = "_"
+
+    return safe_name
+
+
+def _init_export_worker(project_data, project_path=None):
+
+    global _export_core, _export_project
+
+    # Imported here, to avoid a circular import
+    from .batch import get_core
+
+    _init_worker()
+
+    core = get_core()
+    core._init_plots()
+
+    # Simulations of a project file are read only when first plotted
+    if project_path is None:
+        project = core.load_project_stream(StringIO(project_data))
+    else:
+        project = read_project_file(core, project_path)["project"]
+
+    # Block signals, as when plotting in the GUI
+    core.blockSignals(True)
+    project.blockSignals(True)
+
+    _export_core = core
+    _export_project = project
+
+    return
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Profiling of the execution of modules, themes and strategies.
+
+Each execution is a stage, for which the wall time, CPU time and peak
+resident memory of the process are recorded. The resident memory is sampled
+by a background thread while the stage runs, using psutil if it is
+installed, or /proc otherwise. If neither is available, the peak memory is
+not recorded.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import os
+import time
+import logging
+import datetime
+import threading
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+# Columns of the profile table, in order
+PROFILE_COLUMNS = ["Simulation",
+                   "Stage",
+                   "Start",
+                   "Wall Time [s]",
+                   "CPU Time [s]",
+                   "Peak Memory [MB]"]
+
+# Seconds between samples of the resident memory
+SAMPLE_INTERVAL = 0.1
+
+
+def get_cpu_time():
+
+    """Return the user and system CPU time used by the process, in
+    seconds"""
+
+    times = os.times()
+
+    return times[0] + times[1]
+
+
+def get_rss():
+
+    """Return the resident memory of the process, in bytes, or None if it
+    can not be measured"""
+
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss
+
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (IOError, IndexError, ValueError):
+        return None
+
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class _MemorySampler(threading.Thread):
+
+    """Record the peak resident memory of the process until stopped"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+
+        super(_MemorySampler, self).__init__()
+        self.daemon = True
+        self.peak = get_rss()
+
+        self._interval = interval
+        self._stop_event = threading.Event()
+
+        return
+
+    def run(self):
+
+        while not self._stop_event.wait(self._interval):
+            self._sample()
+
+        return
+
+    def stop(self):
+
+        """Stop sampling and return the peak resident memory, in bytes"""
+
+        self._stop_event.set()
+        self.join()
+        self._sample()
+
+        return self.peak
+
+    def _sample(self):
+
+        rss = get_rss()
+
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+        return
+
+
+class ExecutionProfiler(object):
+
+    """Record the resources used by each stage of execution. Stages may be
+    nested, for instance the modules executed by a strategy.
+
+    Args:
+        sample_interval (float, optional): seconds between samples of the
+            resident memory
+
+    """
+
+    def __init__(self, sample_interval=SAMPLE_INTERVAL):
+
+        self._sample_interval = sample_interval
+        self._stages = []
+
+        return
+
+    def start_stage(self, name, simulation=None):
+
+        """Start recording a stage, for the simulation with the given
+        title"""
+
+        sampler = _MemorySampler(self._sample_interval)
+        sampler.start()
+
+        stage = {"name": name,
+                 "simulation": simulation,
+                 "start": time.time(),
+                 "cpu_start": get_cpu_time(),
+                 "sampler": sampler}
+
+        self._stages.append(stage)
+
+        return
+
+    def finish_stage(self):
+
+        """Stop recording the most recently started stage.
+
+        Returns:
+            dict: the record of the stage, with keys "simulation", "stage",
+                "start" (an ISO 8601 time), "wall_time" and "cpu_time" (in
+                seconds) and "peak_rss" (in bytes, or None if unknown)
+
+        """
+
+        if not self._stages:
+            errStr = "No stage has been started"
+            raise RuntimeError(errStr)
+
+        stage = self._stages.pop()
+
+        wall_time = time.time() - stage["start"]
+        cpu_time = get_cpu_time() - stage["cpu_start"]
+        peak_rss = stage["sampler"].stop()
+
+        start = datetime.datetime.fromtimestamp(stage["start"])
+
+        record = {"simulation": stage["simulation"],
+                  "stage": stage["name"],
+                  "start": start.isoformat(),
+                  "wall_time": wall_time,
+                  "cpu_time": cpu_time,
+                  "peak_rss": peak_rss}
+
+        msg = ("Stage '{}' took {:.2f}s wall time and {:.2f}s CPU "
+               "time").format(stage["name"], wall_time, cpu_time)
+        module_logger.debug(msg)
+
+        return record
+
+
+def get_profile_table(records):
+
+    """Convert stage records, as returned by
+    ExecutionProfiler.finish_stage, into a table with PROFILE_COLUMNS"""
+
+    rows = []
+
+    for record in records:
+
+        peak_rss = record["peak_rss"]
+        if peak_rss is not None: peak_rss = peak_rss / 1024. ** 2
+
+        rows.append([record["simulation"],
+                     record["stage"],
+                     record["start"],
+                     record["wall_time"],
+                     record["cpu_time"],
+                     peak_rss])
+
+    return pd.DataFrame(rows, columns=PROFILE_COLUMNS)
+
+
+def write_profile_csv(records, file_path):
+
+    """Write stage records to a CSV file"""
+
+    table = get_profile_table(records)
+    table.to_csv(file_path, index=False)
+
+    return
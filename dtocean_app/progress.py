@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Progress of the execution of modules and themes, with estimates of the time
+remaining.
+
+Each execution of a module, or of the themes, is a stage. The simulation
+being executed is noted at the start of each stage, so that simulations are
+counted as they are completed, and the time remaining is estimated from the
+mean observed duration of each stage.
+
+Execution can also be cancelled, between stages, using a CancelToken.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import time
+import datetime
+import threading
+
+
+class ExecutionCancelled(Exception):
+
+    """Raised when execution is stopped using a CancelToken"""
+
+    pass
+
+
+class CancelToken(object):
+
+    """Flag, shared between threads, requesting that execution stops at the
+    next point where the project is in a consistent state"""
+
+    def __init__(self):
+
+        self._event = threading.Event()
+
+        return
+
+    def cancel(self):
+
+        self._event.set()
+
+        return
+
+    def reset(self):
+
+        self._event.clear()
+
+        return
+
+    def is_cancelled(self):
+
+        return self._event.is_set()
+
+    def check(self):
+
+        """Raise ExecutionCancelled if cancellation has been requested"""
+
+        if self._event.is_set():
+            errStr = "Execution was cancelled"
+            raise ExecutionCancelled(errStr)
+
+        return
+
+
+class ExecutionProgress(object):
+
+    """Record the progress of the execution of the stages of a number of
+    simulations.
+
+    Args:
+        n_simulations (int, optional): the number of simulations to execute,
+            if known
+        n_stages (int, optional): the number of stages expected for each
+            simulation, if known
+        callback (callable, optional): called with the status, as returned
+            by get_status, whenever the progress changes
+
+    """
+
+    def __init__(self, n_simulations=None, n_stages=None, callback=None):
+
+        self.n_simulations = n_simulations
+        self.n_stages = n_stages
+        self._callback = callback
+
+        self._start = time.time()
+        self._durations = {}
+        self._stage_order = []
+        self._completed = 0
+        self._simulation = None
+        self._sim_stages = []
+        self._stage = None
+        self._stage_start = None
+
+        return
+
+    def start_stage(self, name, simulation=None):
+
+        """Record the start of a stage of the given simulation. Stages
+        started while another is running are not recorded.
+
+        Returns:
+            bool: True if the stage was recorded
+
+        """
+
+        if self._stage is not None: return False
+
+        sim_id = None if simulation is None else id(simulation)
+
+        if self._simulation is not None and sim_id != self._simulation:
+            self._complete_simulation()
+
+        self._simulation = sim_id
+        self._stage = name
+        self._stage_start = time.time()
+
+        self._update()
+
+        return True
+
+    def finish_stage(self):
+
+        """Record the end of the running stage"""
+
+        if self._stage is None: return
+
+        duration = time.time() - self._stage_start
+
+        self._durations.setdefault(self._stage, []).append(duration)
+        self._sim_stages.append(self._stage)
+        self._stage = None
+        self._stage_start = None
+
+        self._update()
+
+        return
+
+    def set_completed(self, completed, n_simulations=None):
+
+        """Set the number of completed simulations directly, for executions
+        whose stages can not be observed"""
+
+        self._completed = completed
+        if n_simulations is not None: self.n_simulations = n_simulations
+
+        self._update()
+
+        return
+
+    def finish(self):
+
+        """Record the end of the execution"""
+
+        self.finish_stage()
+
+        if self._simulation is not None: self._complete_simulation()
+
+        self._update()
+
+        return
+
+    def get_status(self):
+
+        """Return the current progress.
+
+        Returns:
+            dict: with keys "completed" and "total" (the number of completed
+                and total simulations, where the total may be None),
+                "stage" (the running stage, if any), "start" and
+                "stage_start" (the start times of the execution and the
+                running stage), "elapsed" (in seconds), "remaining" (the
+                estimated seconds remaining, or None if unknown) and
+                "finish" (the estimated finish time, or None)
+
+        """
+
+        now = time.time()
+
+        total = self.n_simulations
+        running = 1 if self._simulation is not None else 0
+
+        if total is not None:
+            total = max(total, self._completed + running)
+
+        remaining = self._get_remaining(now, total)
+
+        if remaining is None:
+            finish = None
+        else:
+            finish = now + remaining
+
+        status = {"completed": self._completed,
+                  "total": total,
+                  "stage": self._stage,
+                  "start": self._start,
+                  "stage_start": self._stage_start,
+                  "elapsed": now - self._start,
+                  "remaining": remaining,
+                  "finish": finish}
+
+        return status
+
+    def _update(self):
+
+        if self._callback is not None: self._callback(self.get_status())
+
+        return
+
+    def _complete_simulation(self):
+
+        # Keep the longest sequence of stages seen for a simulation
+        if len(self._sim_stages) > len(self._stage_order):
+            self._stage_order = self._sim_stages
+
+        self._completed += 1
+        self._simulation = None
+        self._sim_stages = []
+
+        return
+
+    def _get_remaining(self, now, total):
+
+        if total is None: return None
+
+        running = self._simulation is not None
+        n_waiting = total - self._completed - (1 if running else 0)
+
+        # Without observed stages, scale by the completed simulations
+        if not self._durations:
+
+            if self._completed == 0: return None
+
+            elapsed = now - self._start
+            n_left = total - self._completed
+
+            return elapsed / self._completed * n_left
+
+        all_durations = [x for durations in self._durations.values()
+                                                       for x in durations]
+        overall_mean = sum(all_durations) / len(all_durations)
+
+        def get_stage_time(name):
+
+            if name not in self._durations: return overall_mean
+
+            durations = self._durations[name]
+
+            return sum(durations) / len(durations)
+
+        done = list(self._sim_stages)
+        if self._stage is not None: done.append(self._stage)
+
+        if self._stage_order:
+
+            sim_time = sum([get_stage_time(x) for x in self._stage_order])
+            current_left = [get_stage_time(x) for x in self._stage_order
+                                                            if x not in done]
+            remaining = sum(current_left)
+
+        else:
+
+            n_stages = self.n_stages
+            if n_stages is None: n_stages = len(done)
+
+            sim_time = n_stages * overall_mean
+            remaining = max(0, n_stages - len(done)) * overall_mean
+
+        if not running: remaining = 0.
+
+        if self._stage is not None:
+            stage_left = get_stage_time(self._stage) - (now -
+                                                        self._stage_start)
+            remaining += max(0., stage_left)
+
+        remaining += max(0, n_waiting) * sim_time
+
+        return remaining
+
+
+def format_duration(seconds):
+
+    """Format a number of seconds as hours, minutes and seconds"""
+
+    return str(datetime.timedelta(seconds=int(round(seconds))))
+
+
+def get_status_text(status, now=None):
+
+    """Describe the status returned by ExecutionProgress.get_status, with
+    times relative to now"""
+
+    if now is None: now = time.time()
+
+    if status["total"] is None:
+        lines = ["Completed {} simulations".format(status["completed"])]
+    else:
+        lines = ["Completed {} of {} simulations".format(status["completed"],
+                                                         status["total"])]
+
+    if status["stage"] is not None:
+        stage_time = format_duration(now - status["stage_start"])
+        lines.append("Executing {} for {}".format(status["stage"],
+                                                  stage_time))
+
+    time_line = "Elapsed time {}".format(format_duration(now -
+                                                         status["start"]))
+
+    if status["finish"] is not None:
+
+        finish = datetime.datetime.fromtimestamp(status["finish"])
+
+        if finish.date() == datetime.date.today():
+            finish_str = finish.strftime("%H:%M")
+        else:
+            finish_str = finish.strftime("%a %d %b %H:%M")
+
+        remaining = format_duration(max(0., status["finish"] - now))
+        time_line += ", estimated finish {} ({} remaining)".format(finish_str,
+                                                                   remaining)
+
+    lines.append(time_line)
+
+    return "\n".join(lines)
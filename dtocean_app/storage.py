@@ -0,0 +1,1374 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Storage of projects in .dto archives, with one member per simulation.
+
+A project is split into a small skeleton (the project with its simulations
+and data pool contents removed), one member per simulation and members
+holding the data pool entries first used by each simulation. When opened,
+only the skeleton and the active simulation are read, while the remaining
+simulations are represented by LazySimulation objects which read themselves
+from the archive when first used.
+
+Saves can also append only the changed simulations and new data pool
+entries to the existing archive, followed by a new manifest. Readers use the
+latest complete manifest, so superseded members are simply ignored until the
+archive is next rewritten. The other members saved with a project, such as
+its output scope, are also listed in the manifest.
+
+Large arrays and pandas objects within data pool entries are stored in their
+own members, named by the digest of their pickle, so that identical values
+shared between simulations (such as those made by cloning) are written only
+once. When read, entries with identical values share a single copy.
+
+The project file functions at the end of this module read and write complete
+.dto and .prj files, along with the output scope, activated interfaces and
+strategy, without requiring a user interface.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import os
+import copy
+import json
+import uuid
+import tempfile
+import weakref
+import hashlib
+import logging
+import threading
+import cPickle as pickle
+from cStringIO import StringIO
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .utils.archive import ArchiveReader, ArchiveWriter, replace_file
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 4
+MANIFEST_NAME = "manifest.json"
+SKELETON_NAME = "skeleton.pkl"
+AUTOSAVE_NAME = "autosave.json"
+
+# Values of at least this size, in bytes, are stored once per unique content
+VALUE_SIZE_LIMIT = 65536
+
+# Fraction of superseded data in an archive that forces a full save
+GARBAGE_LIMIT = 0.5
+
+# Types which may be used as data pool indexes
+_KEY_TYPES = (basestring, int, long)
+
+
+def get_pool_store(pool):
+
+    """Find the dictionary in which a data pool keeps its data objects,
+    keyed by data index. Returns None if there is not exactly one candidate,
+    in which case the pool must be stored whole."""
+
+    try:
+        attributes = vars(pool)
+    except TypeError:
+        return None
+
+    candidates = []
+
+    for value in attributes.values():
+
+        if not isinstance(value, dict): continue
+
+        # Ignore dictionaries of counters, such as link counts
+        if value and all([isinstance(x, (int, long, float))
+                                                  for x in value.values()]):
+            continue
+
+        candidates.append(value)
+
+    if len(candidates) != 1: return None
+
+    return candidates[0]
+
+
+def is_lazy(simulation):
+
+    """Test if simulation is a LazySimulation which has not been loaded"""
+
+    return (type(simulation) is LazySimulation and
+            not simulation._lazy_is_loaded())
+
+
+class LazySimulation(object):
+
+    """Stand-in for a simulation which has not yet been read from its
+    archive. The simulation is read the first time anything other than its
+    title is requested, after which it replaces this object in the project's
+    list of simulations."""
+
+    def __init__(self, project_archive, record):
+
+        object.__setattr__(self, "_lazy_archive", project_archive)
+        object.__setattr__(self, "_lazy_record", record)
+        object.__setattr__(self, "_lazy_simulation", None)
+
+        return
+
+    def _lazy_is_loaded(self):
+
+        return self._lazy_simulation is not None
+
+    def _lazy_load(self):
+
+        if self._lazy_simulation is None:
+            self._lazy_archive.load_simulation(self)
+
+        return self._lazy_simulation
+
+    def _lazy_set(self, simulation):
+
+        object.__setattr__(self, "_lazy_simulation", simulation)
+
+        return
+
+    def _lazy_set_archive(self, project_archive):
+
+        object.__setattr__(self, "_lazy_archive", project_archive)
+
+        return
+
+    def get_title(self):
+
+        if self._lazy_simulation is None:
+            return self._lazy_record["title"]
+
+        return self._lazy_simulation.get_title()
+
+    @property
+    def __class__(self):
+        return self._lazy_load().__class__
+
+    def __getattr__(self, name):
+        return getattr(self._lazy_load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._lazy_load(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._lazy_load(), name)
+
+    def __reduce_ex__(self, protocol):
+        return self._lazy_load().__reduce_ex__(protocol)
+
+    def __eq__(self, other):
+        return other is self or other is self._lazy_load()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._lazy_load())
+
+    def __repr__(self):
+
+        if self._lazy_simulation is None:
+            return "<LazySimulation '{}'>".format(self._lazy_record["title"])
+
+        return repr(self._lazy_simulation)
+
+
+class ProjectArchive(object):
+
+    """Link between a project in memory and the .dto archive it was read
+    from, or last saved to, used to read its simulations on demand and to
+    find which parts of the project are already stored in the archive.
+
+    Args:
+        path (str): path to the .dto archive
+        store (dict): the project's data pool store, or None
+        simulations (list): the project's list of simulations
+
+    """
+
+    def __init__(self, path, store, simulations):
+
+        self.path = path
+        self._store = store
+        self._simulations = simulations
+        self._loaded_pools = set()
+        self._key_sources = {}
+        self._records = {}
+        self._shared_pools = []
+        self._member_values = {}
+        self._value_set = set()
+        self._values = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+
+        return
+
+    def get_key_source(self, key):
+
+        """Return the name of the archive member holding the data pool entry
+        for key, if it was read from or saved to the archive"""
+
+        return self._key_sources.get(key)
+
+    def get_record(self, simulation):
+
+        """Return the manifest record of a loaded simulation, if it was read
+        from or saved to the archive"""
+
+        if simulation is None: return None
+
+        entry = self._records.get(id(simulation))
+
+        if entry is None or entry[0] is not simulation: return None
+
+        return entry[1]
+
+    def get_shared_pools(self):
+
+        return self._shared_pools[:]
+
+    def get_member_values(self, member):
+
+        """Return the digests of the values referenced by an archive member"""
+
+        return self._member_values.get(member, [])
+
+    def get_all_member_values(self):
+
+        return dict(self._member_values)
+
+    def set_member_values(self, member_values):
+
+        self._member_values = dict(member_values)
+        self._value_set = set()
+
+        for digests in self._member_values.values():
+            self._value_set.update(digests)
+
+        return
+
+    def has_value(self, digest):
+
+        """Test if the value with the given digest is in the archive"""
+
+        return digest in self._value_set
+
+    def set_saved(self, saved):
+
+        """Record the result of saving the project to the archive"""
+
+        with self._lock:
+
+            self._key_sources.update(saved["key_sources"])
+            self._loaded_pools.update(saved["key_sources"].values())
+            self._shared_pools = saved["pools"]
+            self._records = dict((id(sim), (sim, record))
+                                    for sim, record in saved["records"]
+                                                        if sim is not None)
+            self.set_member_values(saved["values"])
+
+        return
+
+    def load_pools(self, archive, members):
+
+        if self._store is None: return
+
+        with self._lock:
+
+            for member in members:
+
+                if member in self._loaded_pools: continue
+
+                with archive.open_member(member) as pool_file:
+                    unpickler = pickle.Unpickler(pool_file)
+                    unpickler.persistent_load = \
+                                    self._get_persistent_load(archive)
+                    pool_data = unpickler.load()
+
+                # Do not replace entries already in memory
+                for key, value in pool_data.iteritems():
+                    self._store.setdefault(key, value)
+                    self._key_sources.setdefault(key, member)
+
+                self._loaded_pools.add(member)
+
+        return
+
+    def load_simulation(self, lazy_simulation, archive=None):
+
+        with self._lock:
+
+            if lazy_simulation._lazy_is_loaded(): return
+
+            if archive is None:
+                with ArchiveReader(self.path, MANIFEST_NAME) as archive:
+                    simulation = self._read_simulation(lazy_simulation,
+                                                       archive)
+            else:
+                simulation = self._read_simulation(lazy_simulation, archive)
+
+            lazy_simulation._lazy_set(simulation)
+
+            record = lazy_simulation._lazy_record
+            self._records[id(simulation)] = (simulation, record)
+
+            # Replace the stand-in within the project
+            for i, sim in enumerate(self._simulations):
+                if sim is lazy_simulation: self._simulations[i] = simulation
+
+        return
+
+    def _get_persistent_load(self, archive):
+
+        def persistent_load(pid):
+
+            if pid[0] == "value": return self._load_value(archive, pid[1])
+
+            errStr = "Unrecognised persistent id '{}'".format(pid)
+            raise pickle.UnpicklingError(errStr)
+
+        return persistent_load
+
+    def _load_value(self, archive, digest):
+
+        # Values with the same content are shared
+        value = self._values.get(digest)
+        if value is not None: return value
+
+        data = archive.read_bytes(_get_value_member(digest))
+        value = pickle.loads(data)
+
+        self._values[digest] = value
+
+        return value
+
+    def _read_simulation(self, lazy_simulation, archive):
+
+        record = lazy_simulation._lazy_record
+
+        msg = "Loading simulation '{}' from {}".format(record["title"],
+                                                       self.path)
+        module_logger.debug(msg)
+
+        self.load_pools(archive, record["pools"])
+
+        with archive.open_member(record["member"]) as sim_file:
+            simulation = pickle.load(sim_file)
+
+        # Renamed simulations are only renamed in the manifest
+        if simulation.get_title() != record["title"]:
+            simulation.set_title(record["title"])
+
+        return simulation
+
+
+class _ValueWriter(object):
+
+    """Pickles data pool entries into an archive, storing any arrays or
+    pandas objects of at least VALUE_SIZE_LIMIT bytes in separate members
+    named by the digest of their pickle, so that each unique value is
+    written once. Values already in the source archive are copied, or left
+    in place when updating.
+
+    Args:
+        archive (ArchiveWriter): the open archive
+        source (ProjectArchive): the project's current archive, if any
+        update (bool): the archive is being appended to the source archive
+        get_reader (function): returns an open ArchiveReader for a
+            ProjectArchive
+
+    """
+
+    def __init__(self, archive, source, update, get_reader):
+
+        self.member_values = {}
+        self._archive = archive
+        self._source = source
+        self._update = update
+        self._get_reader = get_reader
+        self._written = set()
+        self._seen = {}
+        self._unique = {}
+        self._references = 0
+        self._referenced_size = 0
+
+        return
+
+    def dump(self, member, obj):
+
+        """Pickle obj into the given archive member"""
+
+        digests = set()
+
+        def persistent_id(value):
+
+            digest = self._add_value(value)
+            if digest is None: return None
+
+            digests.add(digest)
+
+            return ("value", digest)
+
+        # Pickle in memory first, as values are written as they are found
+        member_file = StringIO()
+        pickler = pickle.Pickler(member_file, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = persistent_id
+        pickler.dump(obj)
+
+        self._archive.write_bytes(member, member_file.getvalue())
+
+        if digests: self.member_values[member] = sorted(digests)
+
+        return
+
+    def copy_values(self, project_archive, member):
+
+        """Copy the values referenced by a member of another archive"""
+
+        digests = project_archive.get_member_values(member)
+        if not digests: return
+
+        for digest in digests:
+            if digest in self._written: continue
+            self._archive.copy_member(self._get_reader(project_archive),
+                                      _get_value_member(digest))
+            self._written.add(digest)
+
+        self.member_values[member] = digests
+
+        return
+
+    def get_report(self):
+
+        """Return the number and size, in bytes, of the values referenced by
+        the members pickled so far, along with the number of unique values
+        and the space saved by storing them once"""
+
+        unique_size = sum(self._unique.values())
+
+        report = {"references": self._references,
+                  "size": self._referenced_size,
+                  "unique": len(self._unique),
+                  "saved": self._referenced_size - unique_size}
+
+        return report
+
+    def _add_value(self, value):
+
+        size = _get_value_size(value)
+        if size is None or size < VALUE_SIZE_LIMIT: return None
+
+        data = None
+
+        # Values are hashed on every save, as they may have been changed in
+        # place since they were read or last saved
+        if id(value) in self._seen:
+            _, digest, size = self._seen[id(value)]
+        else:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            digest = hashlib.sha1(data).hexdigest()
+            size = len(data)
+            self._seen[id(value)] = (value, digest, size)
+
+        self._references += 1
+        self._referenced_size += size
+        self._unique[digest] = size
+
+        if digest in self._written: return digest
+
+        if self._source is not None and self._source.has_value(digest):
+
+            if not self._update:
+                self._archive.copy_member(self._get_reader(self._source),
+                                          _get_value_member(digest))
+
+            self._written.add(digest)
+
+            return digest
+
+        if data is None: data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        self._archive.write_bytes(_get_value_member(digest), data)
+        self._written.add(digest)
+
+        return digest
+
+
+def unwrap(simulation):
+
+    """Return the simulation behind a loaded LazySimulation"""
+
+    if type(simulation) is LazySimulation and simulation._lazy_is_loaded():
+        return simulation._lazy_simulation
+
+    return simulation
+
+
+def select_simulations(project, sim_titles):
+
+    """Return a pure Project holding only the simulations of a GUIProject
+    with the given titles, and the data pool entries that they use, suitable
+    for pickling. The other simulations are not loaded or copied.
+
+    Args:
+        project (GUIProject): the project
+        sim_titles (list): titles of the simulations to select
+
+    Returns:
+        Project: a project sharing the selected simulations and data pool
+            entries with the given project
+
+    """
+
+    titles = set(sim_titles)
+    simulations = [simulation for simulation in project._simulations
+                                        if simulation.get_title() in titles]
+
+    selected = project._dump()
+    selected._simulations = simulations
+    selected._active_index = 0 if simulations else None
+
+    store = get_pool_store(project._pool)
+
+    # Unrecognised pools must be kept whole
+    if store is None: return selected
+
+    keys = frozenset(store)
+    refs = set()
+
+    for simulation in simulations:
+        _, sim_refs = _pickle_simulation(simulation, keys)
+        refs.update(sim_refs)
+
+    pool = copy.copy(project._pool)
+
+    for name, value in vars(pool).items():
+        if value is store:
+            setattr(pool, name, dict((key, store[key]) for key in refs))
+
+    selected._pool = pool
+
+    return selected
+
+
+def can_update(project_archive, path):
+
+    """Test if the project linked to project_archive can be saved to path by
+    appending its changes. This is not possible if path is a different file
+    or if more than GARBAGE_LIMIT of the archive holds superseded data, in
+    which case the archive should be rewritten (compacted)."""
+
+    if project_archive is None or project_archive._store is None:
+        return False
+
+    path = os.path.abspath(path)
+
+    if os.path.normcase(path) != os.path.normcase(project_archive.path):
+        return False
+
+    if not os.path.isfile(path): return False
+
+    with ArchiveReader(path, MANIFEST_NAME) as archive:
+
+        manifest = read_manifest(archive)
+        live_size = 0
+
+        for name in get_manifest_members(manifest):
+            live_size += archive.get_member_size(name)
+
+    total_size = os.path.getsize(path)
+
+    if live_size < total_size * (1 - GARBAGE_LIMIT):
+
+        msg = ("Compacting project archive {}, which is {:.0%} superseded "
+               "data").format(path, 1 - float(live_size) / total_size)
+        module_logger.info(msg)
+
+        return False
+
+    return True
+
+
+def dump_project(project,
+                 archive,
+                 source=None,
+                 changed=None,
+                 update=False,
+                 extras=None):
+
+    """Write a core Project into an open ArchiveWriter.
+
+    Simulations which have not been loaded, or which have not changed since
+    they were read from or saved to the source archive, are copied without
+    being pickled. If update is True, the archive is being appended to the
+    source archive, so only changed simulations and new data pool entries
+    are written.
+
+    Any extra members, such as the output scope, are written before the
+    manifest and listed in it, so that they are only read along with the
+    project they were saved with.
+
+    Args:
+        project: the core Project to write
+        archive (ArchiveWriter): the open archive
+        source (ProjectArchive): the project's current archive, if any
+        changed (set): ids of simulations changed since the last save, or
+            None if any simulation may have changed
+        update (bool): append changes to the source archive
+        extras (dict): the contents of any extra members, by name
+
+    Returns:
+        dict: the save result, for ProjectArchive.set_saved
+
+    """
+
+    store = get_pool_store(project._pool)
+
+    if update and (source is None or store is None):
+
+        errStr = ("Only projects linked to an archive, with a recognised "
+                  "data pool, can be saved incrementally")
+        raise ValueError(errStr)
+
+    if store is None:
+        keys = frozenset()
+    else:
+        keys = frozenset(store)
+
+    written = set()
+    records = []
+    new_refs = []
+    readers = {}
+
+    def get_reader(project_archive):
+
+        if project_archive.path not in readers:
+            readers[project_archive.path] = ArchiveReader(project_archive.path,
+                                                          MANIFEST_NAME)
+
+        return readers[project_archive.path]
+
+    values = _ValueWriter(archive, source, update, get_reader)
+
+    def reuse_members(project_archive, members):
+
+        # Members are already in the archive when updating
+        if update: return
+
+        reader = get_reader(project_archive)
+
+        for member in members:
+            if member in written: continue
+            values.copy_values(project_archive, member)
+            archive.copy_member(reader, member)
+            written.add(member)
+
+        return
+
+    try:
+
+        for simulation in project._simulations:
+
+            # Reuse simulations that have not been loaded
+            if is_lazy(simulation):
+
+                record = simulation._lazy_record
+                reuse_members(simulation._lazy_archive,
+                              [record["member"]] + record["pools"])
+                records.append((None, record))
+
+                continue
+
+            simulation = unwrap(simulation)
+
+            if source is None:
+                saved = None
+            else:
+                saved = source.get_record(simulation)
+
+            is_changed = changed is None or id(simulation) in changed
+
+            if saved is not None:
+                saved = _get_titled_record(saved, simulation)
+
+            if saved is not None and not is_changed:
+                reuse_members(source, [saved["member"]] + saved["pools"])
+                records.append((simulation, saved))
+                continue
+
+            data, refs = _pickle_simulation(simulation, keys)
+            digest = hashlib.sha1(data).hexdigest()
+
+            # Unchanged simulations are left in place when updating, but
+            # rewritten otherwise, so that superseded data is dropped
+            if (update and
+                saved is not None and
+                saved.get("digest") == digest):
+                records.append((simulation, saved))
+                continue
+
+            uid = uuid.uuid4().hex
+            record = {"title": simulation.get_title(),
+                      "member": "simulations/{}.pkl".format(uid),
+                      "pools": [],
+                      "digest": digest}
+
+            archive.write_bytes(record["member"], data)
+            written.add(record["member"])
+
+            records.append((simulation, record))
+            new_refs.append((record, refs))
+
+        key_sources, shared_pools = _dump_pools(archive,
+                                                store,
+                                                keys,
+                                                new_refs,
+                                                values,
+                                                written,
+                                                source,
+                                                update)
+
+    finally:
+
+        for reader in readers.values(): reader.close()
+
+    # Write the project with the simulations and pool store removed
+    simulations = project._simulations
+    sim_ids = dict((id(sim), i) for i, sim in enumerate(simulations))
+    sim_ids.update((id(unwrap(sim)), i) for i, sim in enumerate(simulations))
+
+    def persistent_id(obj):
+
+        if id(obj) in sim_ids: return ("simulation", sim_ids[id(obj)])
+        if store is not None and obj is store: return ("pool_store",)
+
+        return None
+
+    skeleton_member = "skeletons/{}.pkl".format(uuid.uuid4().hex)
+
+    with archive.open_member(skeleton_member) as skeleton_file:
+        pickler = pickle.Pickler(skeleton_file, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = persistent_id
+        pickler.dump(project)
+
+    extra_members = {}
+
+    for name, data in sorted((extras or {}).items()):
+        member = "extras/{}/{}".format(uuid.uuid4().hex, name)
+        archive.write_bytes(member, data)
+        extra_members[name] = member
+
+    # The manifest is written last, so an interrupted update leaves the
+    # previous manifest as the latest complete one
+    manifest = {"format": FORMAT_VERSION,
+                "skeleton": skeleton_member,
+                "simulations": [sim_record for _, sim_record in records],
+                "pools": shared_pools,
+                "extras": extra_members}
+
+    member_values = {}
+    if update: member_values.update(source.get_all_member_values())
+    member_values.update(values.member_values)
+
+    live_members = get_manifest_members(manifest)
+    manifest["values"] = dict((member, digests)
+                                for member, digests in member_values.items()
+                                                if member in live_members)
+
+    archive.write_json(MANIFEST_NAME, manifest)
+
+    report = values.get_report()
+
+    if report["references"]:
+
+        msg = ("Stored {} large values as {} unique values, saving "
+               "{:.1f} MB").format(report["references"],
+                                   report["unique"],
+                                   report["saved"] / 1e6)
+        module_logger.info(msg)
+
+    saved = {"records": records,
+             "key_sources": key_sources,
+             "pools": shared_pools,
+             "values": manifest["values"],
+             "report": report}
+
+    return saved
+
+
+def _dump_pools(archive, store, keys, new_refs, values, written, source,
+                update):
+
+    """Write the data pool entries that are not already in the archive,
+    assigning each to the member of the first new simulation using it, or to
+    a shared member otherwise.
+
+    Returns:
+        tuple: the archive member of each data pool entry and the list of
+            shared members
+
+    """
+
+    key_sources = {}
+    shared_pools = []
+
+    if update:
+        shared_pools.extend(source.get_shared_pools())
+
+    def get_key_source(key):
+
+        if key in key_sources: return key_sources[key]
+        if source is None: return None
+
+        member = source.get_key_source(key)
+
+        if member is None: return None
+        if update or member in written: return member
+
+        return None
+
+    # Assign new data pool entries to the first simulation using them
+    for record, refs in new_refs:
+
+        pool_member = record["member"].replace("simulations/", "pools/")
+        owned = {}
+        required = set()
+
+        for key in refs:
+
+            member = get_key_source(key)
+
+            if member is None:
+                owned[key] = store[key]
+                member = pool_member
+                key_sources[key] = member
+
+            required.add(member)
+
+        if owned:
+            values.dump(pool_member, owned)
+
+        record["pools"] = sorted(required)
+
+    # Store any remaining new entries together
+    shared = {}
+
+    for key in keys:
+
+        member = get_key_source(key)
+
+        if member is None:
+            shared[key] = store[key]
+        else:
+            key_sources[key] = member
+
+    if shared:
+
+        shared_member = "pools/{}.pkl".format(uuid.uuid4().hex)
+
+        values.dump(shared_member, shared)
+
+        for key in shared: key_sources[key] = shared_member
+        shared_pools.append(shared_member)
+
+    return key_sources, shared_pools
+
+
+def link_project(project, path, saved, source=None, update=False):
+
+    """Link a core Project to the archive it has just been saved to, so
+    that its unloaded simulations are read from the new archive.
+
+    Returns:
+        ProjectArchive: the new link
+
+    """
+
+    if update:
+        source.set_saved(saved)
+        return source
+
+    project_archive = ProjectArchive(os.path.abspath(path),
+                                     get_pool_store(project._pool),
+                                     project._simulations)
+    project_archive.set_saved(saved)
+
+    for simulation in project._simulations:
+        if is_lazy(simulation): simulation._lazy_set_archive(project_archive)
+
+    return project_archive
+
+
+def read_manifest(archive):
+
+    """Read the latest complete manifest of an archive"""
+
+    count = archive.get_version_count(MANIFEST_NAME)
+
+    if count == 0:
+
+        errStr = "Archive {} has no project manifest".format(archive.path)
+        raise KeyError(errStr)
+
+    # Skip any manifest left incomplete by an interrupted update
+    for version in range(-1, -count - 1, -1):
+
+        with archive.open_member_version(MANIFEST_NAME, version) as mfile:
+            data = mfile.read()
+
+        try:
+            manifest = json.loads(data)
+        except ValueError:
+            continue
+
+        if manifest["format"] > FORMAT_VERSION:
+
+            errStr = ("Project archive format version {} is newer than the "
+                      "latest supported version, "
+                      "{}").format(manifest["format"], FORMAT_VERSION)
+            raise ValueError(errStr)
+
+        return manifest
+
+    errStr = "Archive {} has no complete project manifest".format(archive.path)
+    raise ValueError(errStr)
+
+
+def get_manifest_members(manifest):
+
+    """Return the names of all the members used by a manifest"""
+
+    members = set([manifest.get("skeleton", SKELETON_NAME)])
+    members.update(manifest["pools"])
+    members.update(manifest.get("extras", {}).values())
+
+    for record in manifest["simulations"]:
+        members.add(record["member"])
+        members.update(record["pools"])
+
+    for digests in manifest.get("values", {}).values():
+        members.update(_get_value_member(digest) for digest in digests)
+
+    return members
+
+
+def get_extra_member(archive, manifest, name):
+
+    """Return the archive member holding the extra member called name, or
+    None if it was not saved with the project. Archives saved before extra
+    members were listed in the manifest store them under their own names.
+
+    Args:
+        archive (ArchiveReader): the open archive
+        manifest (dict): the archive's manifest, or None for archives
+            without one
+        name (str): the name of the extra member
+
+    """
+
+    if manifest is not None and "extras" in manifest:
+        return manifest["extras"].get(name)
+
+    if archive.has_member(name): return name
+
+    return None
+
+
+def _get_titled_record(record, simulation):
+
+    """Return the record of a saved simulation, with the simulation's
+    current title"""
+
+    title = simulation.get_title()
+    if record["title"] == title: return record
+
+    record = dict(record)
+    record["title"] = title
+
+    return record
+
+
+def _get_value_member(digest):
+
+    return "values/{}.pkl".format(digest)
+
+
+def _get_value_size(value):
+
+    """Estimate the size in memory, in bytes, of an array or pandas object,
+    returning None for other types"""
+
+    if isinstance(value, np.ndarray): return value.nbytes
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(index=True)))
+
+    return None
+
+
+def _pickle_simulation(simulation, keys):
+
+    """Pickle a simulation, returning the pickle and the data pool indexes
+    found within it"""
+
+    refs = set()
+
+    def persistent_id(obj):
+
+        if isinstance(obj, _KEY_TYPES) and obj in keys: refs.add(obj)
+
+        return None
+
+    sim_file = StringIO()
+    pickler = pickle.Pickler(sim_file, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = persistent_id
+    pickler.dump(simulation)
+
+    return sim_file.getvalue(), refs
+
+
+def load_project(archive):
+
+    """Read a core Project from an open ArchiveReader, loading only the
+    active simulation.
+
+    Returns:
+        tuple: the project and its ProjectArchive
+
+    """
+
+    manifest = read_manifest(archive)
+    records = manifest["simulations"]
+    project_archive = ProjectArchive(archive.path, None, None)
+    store = {}
+
+    def persistent_load(pid):
+
+        if pid[0] == "pool_store": return store
+
+        if pid[0] == "simulation":
+            return LazySimulation(project_archive, records[pid[1]])
+
+        errStr = "Unrecognised persistent id '{}'".format(pid)
+        raise pickle.UnpicklingError(errStr)
+
+    skeleton_member = manifest.get("skeleton", SKELETON_NAME)
+
+    with archive.open_member(skeleton_member) as skeleton_file:
+        unpickler = pickle.Unpickler(skeleton_file)
+        unpickler.persistent_load = persistent_load
+        project = unpickler.load()
+
+    project_archive._store = get_pool_store(project._pool)
+    project_archive._simulations = project._simulations
+    project_archive._shared_pools = manifest["pools"]
+    project_archive.set_member_values(manifest.get("values", {}))
+    project_archive.load_pools(archive, manifest["pools"])
+
+    # Read the active simulation up front
+    if project._active_index is not None:
+
+        active_sim = project._simulations[project._active_index]
+
+        if type(active_sim) is LazySimulation:
+            project_archive.load_simulation(active_sim, archive)
+
+    return project, project_archive
+
+
+def read_project_file(core, file_path):
+
+    """Read a .dto or .prj project file, as saved by the GUI.
+
+    Args:
+        core (GUICore): the core
+        file_path (str): path to the project file
+
+    Returns:
+        dict: the project, and the "scope", "interfaces" and "strategy"
+            saved with it, plus the "project_path" that it should be saved
+            to, which differs from file_path for autosave snapshots
+
+    """
+
+    ext = os.path.splitext(file_path)[1]
+
+    if ext == ".dto":
+
+        with ArchiveReader(file_path, MANIFEST_NAME) as archive:
+            project_file = _read_archive(core, archive, file_path)
+
+    elif ext == ".prj":
+
+        project_file = {"project": core.load_project(file_path),
+                        "project_path": file_path,
+                        "scope": "global",
+                        "interfaces": {},
+                        "strategy": None}
+
+    else:
+
+        errStr = ("The file path must be a file with either .dto or "
+                  ".prj extension")
+        raise ValueError(errStr)
+
+    return project_file
+
+
+def write_project_file(core,
+                       file_path,
+                       project,
+                       scope,
+                       interfaces,
+                       strategy,
+                       compression="gzip",
+                       level=6,
+                       incremental=False):
+
+    """Save a project to a .dto or .prj file. Projects are only saved
+    incrementally to the .dto archive they are linked to, if allowed by
+    can_update.
+
+    Args:
+        core (GUICore): the core
+        file_path (str): path to the project file
+        project (GUIProject): the project to save
+        scope (str): the output scope
+        interfaces (dict): the activated interfaces
+        strategy (GUIStrategy): the strategy, or None
+        compression (str, optional): codec for archive members
+        level (int, optional): compression level
+        incremental (bool, optional): append changes when possible
+
+    """
+
+    if file_path is None:
+
+        errStr = ("A file path must be provided in order to save a "
+                  "project")
+        raise ValueError(errStr)
+
+    ext = os.path.splitext(file_path)[1]
+
+    # Check the extension
+    if ext not in [".dto", ".prj"]:
+
+        errStr = ("The file path must be a file with either .dto or "
+                  ".prj extension")
+        raise ValueError(errStr)
+
+    # If saving a project file only
+    if ext == ".prj":
+
+        # Dump next to the destination, so the move can not fail part way
+        save_dir, save_name = os.path.split(os.path.abspath(file_path))
+        fd, prj_file_path = tempfile.mkstemp(prefix=".{}.".format(save_name),
+                                             suffix=".part",
+                                             dir=save_dir)
+        os.close(fd)
+
+        try:
+            core.dump_project(project, prj_file_path)
+            replace_file(prj_file_path, file_path)
+        except:
+            if os.path.isfile(prj_file_path): os.remove(prj_file_path)
+            raise
+
+        return
+
+    update = incremental and core.can_update_project_archive(project,
+                                                             file_path)
+
+    with ArchiveWriter(file_path,
+                       compression,
+                       level,
+                       append=update) as archive:
+
+        saved = write_project_members(core,
+                                      archive,
+                                      project,
+                                      scope,
+                                      interfaces,
+                                      strategy,
+                                      update)
+
+    # Read unloaded simulations from the new archive from now on
+    core.link_project_archive(project, archive.path, saved, update)
+
+    return
+
+
+def write_project_members(core,
+                          archive,
+                          project,
+                          scope,
+                          interfaces,
+                          strategy,
+                          update=False,
+                          extras=None):
+
+    """Write a project, its output scope, activated interfaces and strategy
+    into an open ArchiveWriter, without linking the project to the archive.
+
+    Args:
+        extras (dict, optional): the contents of any further members to
+            save with the project, by name
+
+    Returns:
+        dict: the save result, for GUICore.link_project_archive
+
+    """
+
+    extras = dict(extras or {})
+
+    extras["scope.json"] = json.dumps(scope)
+    extras["interfaces.json"] = json.dumps(interfaces or {})
+    extras["profile.json"] = json.dumps(project.get_profile())
+
+    # Dump the strategy (if there is one). The strategy manager can only
+    # write to a path, but strategy files are small.
+    if strategy is not None:
+
+        strategy_manager = _get_strategy_manager()
+        fd, stg_file_path = tempfile.mkstemp(suffix=".pkl")
+        os.close(fd)
+
+        try:
+            strategy_manager.dump_strategy(strategy, stg_file_path)
+            with open(stg_file_path, "rb") as stg_file:
+                extras["strategy.pkl"] = stg_file.read()
+        finally:
+            os.remove(stg_file_path)
+
+    # Stream the project (or its changes) into the archive, followed by the
+    # other members and the manifest listing them
+    saved = core.dump_project_archive(project, archive, update, extras)
+
+    return saved
+
+
+def _read_archive(core, archive, file_path):
+
+    # Load up the project, streaming it directly from the archive unless
+    # it was saved in an older format
+    if archive.has_member(MANIFEST_NAME):
+
+        project = core.load_project_archive(archive)
+
+    elif archive.has_member("project.pkl"):
+
+        with archive.open_member("project.pkl") as prj_file:
+            project = core.load_project_stream(prj_file)
+
+    else:
+
+        with _archive_temp_file(archive, "project.prj") as prj_file_path:
+            project = core.load_project(prj_file_path)
+
+    # Other members are listed in the manifest, or stored under their own
+    # names in older archives
+    if archive.has_member(MANIFEST_NAME):
+        manifest = read_manifest(archive)
+    else:
+        manifest = None
+
+    def get_member(name):
+        return get_extra_member(archive, manifest, name)
+
+    # Load up the scope if one was found
+    scope_member = get_member("scope.json")
+
+    if scope_member is not None:
+        scope = archive.read_json(scope_member)
+    else:
+        scope = "global"
+
+    # Load up the activated interfaces if found
+    interfaces_member = get_member("interfaces.json")
+
+    if interfaces_member is not None:
+        interfaces = archive.read_json(interfaces_member)
+    else:
+        interfaces = {}
+
+    # Load up the execution profile if found
+    profile_member = get_member("profile.json")
+
+    if profile_member is not None:
+        project.add_profile_records(archive.read_json(profile_member))
+
+    # Load up the strategy if one was found
+    strategy_member = get_member("strategy.pkl")
+
+    if (strategy_member is not None and
+        archive.get_member_size(strategy_member) > 0):
+
+        strategy_manager = _get_strategy_manager()
+
+        with _archive_temp_file(archive, strategy_member) as stg_file_path:
+            strategy = strategy_manager.load_strategy(stg_file_path, project)
+
+    else:
+
+        strategy = None
+
+    # Autosave snapshots are saved to the path they were taken from
+    autosave_member = get_member(AUTOSAVE_NAME)
+
+    if autosave_member is not None:
+        project_path = archive.read_json(autosave_member)["project_path"]
+    else:
+        project_path = file_path
+
+    project_file = {"project": project,
+                    "project_path": project_path,
+                    "scope": scope,
+                    "interfaces": interfaces,
+                    "strategy": strategy}
+
+    return project_file
+
+
+@contextmanager
+def _archive_temp_file(archive, name):
+
+    """Decompress a single archive member to a temporary file, for readers
+    which require a path, and remove it afterwards"""
+
+    fd, file_path = tempfile.mkstemp(suffix=os.path.splitext(name)[1])
+    os.close(fd)
+
+    try:
+        archive.extract_member(name, file_path)
+        yield file_path
+    finally:
+        os.remove(file_path)
+
+
+def _get_strategy_manager():
+
+    # Imported here, as discovering the strategies imports their widgets
+    from dtocean_core.extensions import StrategyManager
+    from . import strategies
+
+    return StrategyManager(strategies, "GUIStrategy")
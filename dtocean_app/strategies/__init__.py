@@ -53,6 +53,13 @@ class GUIStrategy(object):
         '''
 
         return
+    
+    def get_simulation_count(self):
+        
+        """The number of simulations the strategy will execute, or None if
+        not known in advance. Used for reporting progress."""
+        
+        return None
 
 
 class StrategyWidget(object):
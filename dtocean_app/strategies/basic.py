@@ -48,6 +48,9 @@ class GUIBasicStrategy(GUIStrategy, BasicStrategy):
 
         return 1
     
+    def get_simulation_count(self):
+        return 1
+    
     def get_widget(self, parent, shell):
         
         widget = BasicWidget(parent, "No Configuration Required")
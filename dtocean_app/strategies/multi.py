@@ -23,6 +23,7 @@ from dtocean_core.pipeline import Tree
 from dtocean_core.strategies.multi import MultiSensitivity
 
 from . import GUIStrategy, StrategyWidget, PyQtABCMeta
+from .parallel import ParallelStrategy, get_max_workers, split_values
 from ..utils.display import is_high_dpi
 from ..widgets.extendedcombobox import ExtendedComboBox
 
@@ -35,7 +36,7 @@ else:
     from ..designer.low.multisensitivity import Ui_MultiSensitivityWidget
 
 
-class GUIMultiSensitivity(GUIStrategy, MultiSensitivity):
+class GUIMultiSensitivity(ParallelStrategy, GUIStrategy, MultiSensitivity):
     
     """A multi-variable sensitivity study over a given range of
     values, adjusted before execution of a chosen module."""
@@ -62,6 +63,67 @@ class GUIMultiSensitivity(GUIStrategy, MultiSensitivity):
 
         return 3
     
+    def configure(self, inputs_df, subspacing_ratio=1., n_workers=1):
+        
+        super(GUIMultiSensitivity, self).configure(inputs_df,
+                                                   subspacing_ratio)
+        self.set_workers(n_workers)
+        
+        return
+    
+    def get_chunks(self, n_chunks):
+        
+        config = self.get_config()
+        
+        # Subsets are selected from the whole search space
+        if config["subsp_ratio"] < 1: return None
+        
+        inputs_df = config["inputs_df"]
+        
+        # Split the values of the first variables, assuming that the
+        # simulations are ordered by the rows of the table
+        chunk_values = [[list(x) for x in inputs_df["Values"]]]
+        
+        for row in range(len(inputs_df)):
+            
+            if len(chunk_values) >= n_chunks: break
+            
+            n_parts = n_chunks // len(chunk_values)
+            new_chunk_values = []
+            
+            for values in chunk_values:
+                for part in split_values(values[row], n_parts):
+                    new_values = list(values)
+                    new_values[row] = part
+                    new_chunk_values.append(new_values)
+            
+            chunk_values = new_chunk_values
+        
+        chunks = []
+        
+        for values in chunk_values:
+            
+            chunk_df = inputs_df.copy()
+            chunk_df["Values"] = pd.Series(values,
+                                           index=inputs_df.index,
+                                           dtype=object)
+            
+            chunk_config = dict(config)
+            chunk_config["inputs_df"] = chunk_df
+            
+            n_sims = MultiSensitivity.count_selections(chunk_df, 1.)
+            chunks.append((chunk_config, n_sims))
+        
+        return chunks
+    
+    def get_simulation_count(self):
+        
+        config = self.get_config()
+        n_sims = MultiSensitivity.count_selections(config["inputs_df"],
+                                                   config["subsp_ratio"])
+        
+        return n_sims
+    
     def get_widget(self, parent, shell):
         
         widget = MultiSensitivityWidget(parent)
@@ -115,6 +177,9 @@ class MultiSensitivityWidget(QtGui.QWidget,
         self.removeButton.setDisabled(True)
         self.infoLabel.clear()
         
+        # Limit workers to the available processors
+        self.nWorkerSpinBox.setMaximum(get_max_workers())
+        
         # Set up table model
         tablemodel = SimTableModel(parent=self)
         self.tableView.setModel(tablemodel)
@@ -331,7 +396,8 @@ class MultiSensitivityWidget(QtGui.QWidget,
         subsp_ratio = self.subsetSpinBox.value() / 100.
                         
         conf_dict = {"inputs_df": df,
-                     "subspacing_ratio": subsp_ratio
+                     "subspacing_ratio": subsp_ratio,
+                     "n_workers": self.nWorkerSpinBox.value()
                      }
                      
         nsims = MultiSensitivity.count_selections(df, subsp_ratio)
@@ -354,6 +420,7 @@ class MultiSensitivityWidget(QtGui.QWidget,
         
         self.tableView.model().array_df = df
         self.subsetSpinBox.setValue(subsp_ratio * 100.)
+        self.nWorkerSpinBox.setValue(config_dict.get("n_workers", 1))
         
         info_str = self._sim_info_str.format(nsims)
         self.infoLabel.setText(info_str)
@@ -0,0 +1,553 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Execution of strategies in a pool of worker processes.
+
+The configuration of the strategy is split into chunks, each of which is
+executed by a worker, as an ordinary serial strategy, on its own copy of the
+project. Only the active simulation, from which the strategy starts, and
+the data pool entries that it uses are sent to the workers, so that other
+simulations need not be loaded. The simulations made by each chunk are then merged, in order, into
+the project, along with the data pool entries that they use, and any
+execution profile that the workers recorded. If execution is cancelled, the
+chunks finished so far are kept.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+# pylint: disable=protected-access
+
+import re
+import uuid
+import logging
+import multiprocessing
+import cPickle as pickle
+from cStringIO import StringIO
+
+from ..profiling import ExecutionProfiler
+from ..progress import ExecutionCancelled
+from ..storage import get_pool_store, select_simulations, unwrap
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+# Types which may be used as data pool indexes
+_KEY_TYPES = (basestring, int, long)
+
+# Seconds between checks for cancellation while waiting for workers
+POLL_INTERVAL = 1.
+
+# Core and pickled project used by each worker process
+_worker_core = None
+_worker_project_data = None
+
+
+def get_max_workers():
+
+    """Return the largest useful number of worker processes"""
+
+    return multiprocessing.cpu_count()
+
+
+def split_values(values, n_chunks):
+
+    """Split a list into at most n_chunks contiguous, non-empty chunks of
+    similar length"""
+
+    n_chunks = max(1, min(n_chunks, len(values)))
+    size, extra = divmod(len(values), n_chunks)
+
+    chunks = []
+    start = 0
+
+    for i in range(n_chunks):
+        stop = start + size + (1 if i < extra else 0)
+        chunks.append(values[start:stop])
+        start = stop
+
+    return chunks
+
+
+class ParallelStrategy(object):
+
+    """Mixin for strategies whose simulations are independent, so that they
+    may be executed by a pool of worker processes. The number of workers is
+    stored in the strategy configuration as "n_workers". Mix in before the
+    core strategy class."""
+
+    def get_workers(self):
+
+        config = self.get_config()
+
+        if config is None: return 1
+
+        return config.get("n_workers", 1)
+
+    def set_workers(self, n_workers):
+
+        if n_workers < 1:
+
+            errStr = ("At least one worker is required. Given number is "
+                      "{}").format(n_workers)
+            raise ValueError(errStr)
+
+        config = self.get_config()
+        config["n_workers"] = n_workers
+        self.set_config(config)
+
+        return
+
+    def get_chunks(self, n_chunks):
+
+        """Split the configuration into at most n_chunks configurations,
+        which together make the same simulations as the whole.
+
+        Returns:
+            list: tuples of the configuration and number of simulations of
+                each chunk, in the order of their simulations, or None if the
+                configuration can not be split
+
+        """
+
+        return None
+
+    def execute(self, core, project, progress=None, cancel_token=None):
+
+        """Execute the strategy, in parallel if more than one worker is
+        configured. Progress is reported by calling progress with the
+        number of completed and total simulations. If cancel_token is
+        cancelled, the unfinished chunks are abandoned, the finished chunks
+        are merged and ExecutionCancelled is raised."""
+
+        n_workers = self.get_workers()
+        chunks = None
+
+        if n_workers > 1: chunks = self.get_chunks(n_workers)
+
+        if chunks is None or len(chunks) < 2:
+            super(ParallelStrategy, self).execute(core, project)
+            return
+
+        self._execute_parallel(core,
+                               project,
+                               chunks,
+                               n_workers,
+                               progress,
+                               cancel_token)
+
+        return
+
+    def _execute_parallel(self, core,
+                                project,
+                                chunks,
+                                n_workers,
+                                progress,
+                                cancel_token):
+
+        total = sum([n_sims for _, n_sims in chunks])
+        done = 0
+
+        msg = ("Executing {} simulations in {} chunks using {} "
+               "workers").format(total, len(chunks), n_workers)
+        module_logger.info(msg)
+
+        if progress is not None: progress(done, total)
+
+        # The workers only need the simulation that the strategy starts from
+        sim_title = project.get_simulation_title()
+        sim_titles = [] if sim_title is None else [sim_title]
+        project_data = pickle.dumps(select_simulations(project, sim_titles),
+                                    pickle.HIGHEST_PROTOCOL)
+        strategy_cls = type(self)
+        profile = core.is_profiling()
+        tasks = []
+
+        for i, (config, _) in enumerate(chunks):
+            config["n_workers"] = 1
+            tasks.append((i, strategy_cls, config, profile))
+
+        results = [None] * len(chunks)
+        cancelled = False
+        pool = multiprocessing.Pool(min(n_workers, len(chunks)),
+                                    _init_worker,
+                                    (project_data,))
+
+        try:
+
+            chunk_results = pool.imap_unordered(_execute_chunk, tasks)
+
+            for _ in range(len(chunks)):
+
+                # Wait for the next chunk, checking for cancellation
+                while True:
+
+                    if cancel_token is not None:
+                        cancelled = cancel_token.is_cancelled()
+
+                    if cancelled: break
+
+                    try:
+                        (i,
+                         result_data,
+                         record,
+                         profile_records) = chunk_results.next(
+                                                        timeout=POLL_INTERVAL)
+                        break
+                    except multiprocessing.TimeoutError:
+                        pass
+
+                if cancelled: break
+
+                results[i] = (pickle.loads(result_data),
+                              record,
+                              profile_records)
+                done += chunks[i][1]
+
+                msg = "Chunk {} of {} complete".format(i + 1, len(chunks))
+                module_logger.debug(msg)
+
+                if progress is not None: progress(done, total)
+
+            pool.close()
+
+        finally:
+
+            pool.terminate()
+            pool.join()
+
+        results = [result for result in results if result is not None]
+
+        if results:
+            self._merge_results(project, project_data, results)
+
+        if cancelled:
+
+            msg = ("Execution cancelled with {} of {} simulations "
+                   "complete").format(done, total)
+            module_logger.info(msg)
+
+            errStr = "Execution was cancelled"
+            raise ExecutionCancelled(errStr)
+
+        return
+
+    def get_chunk_titles(self, chunk_titles):
+
+        """Return the titles that the simulations of each chunk would have
+        been given by executing the whole configuration, given the lists of
+        titles made by each chunk, in order"""
+
+        return renumber_titles(chunk_titles)
+
+    def _merge_results(self, project, project_data, results):
+
+        # Append the simulations of each chunk to the project, in order,
+        # with the titles that they would have been given serially
+        original = pickle.loads(project_data)
+        chunk_titles = [[other._simulations[i].get_title() for i in record]
+                                            for other, record, _ in results]
+        serial_titles = self.get_chunk_titles(chunk_titles)
+        sim_record = []
+        profile_records = []
+
+        for (other,
+             other_record,
+             other_profile), old_titles, new_titles in zip(results,
+                                                           chunk_titles,
+                                                           serial_titles):
+
+            for i, title in zip(other_record, new_titles):
+                other._simulations[i].set_title(title)
+
+            merged_indexes = merge_simulations(project,
+                                               other,
+                                               other_record,
+                                               original)
+            merged_titles = [project._simulations[i].get_title()
+                                                    for i in merged_indexes]
+
+            # Profile records refer to the simulations by title
+            titles = dict(zip(old_titles, merged_titles))
+
+            for profile_record in other_profile:
+                profile_record = dict(profile_record)
+                profile_record["simulation"] = titles.get(
+                                                profile_record["simulation"],
+                                                profile_record["simulation"])
+                profile_records.append(profile_record)
+
+            sim_record.extend(merged_indexes)
+
+        # Only the new simulations need to be saved
+        for sim_index in sim_record:
+            project._set_simulation_changed(project._simulations[sim_index])
+
+        if sim_record: project._set_active_index(sim_record[-1])
+
+        project.add_profile_records(profile_records)
+
+        for sim_index in sim_record: self.add_simulation_index(sim_index)
+
+        return
+
+
+def renumber_titles(chunk_titles):
+
+    """Continue the numbering of simulation titles from one chunk to the
+    next. Titles are only renumbered if every chunk numbered its
+    simulations consecutively, from the same number and with the same
+    prefix, as a serial execution would have numbered them all. Otherwise,
+    as for titles made from the values of variables, the titles are
+    returned unchanged."""
+
+    numbered = [[re.match(r"(.*?)(\d+)$", title) for title in titles]
+                                                    for titles in chunk_titles]
+    matches = [match for chunk in numbered for match in chunk]
+
+    if len(numbered) < 2 or not matches or not all(matches):
+        return chunk_titles
+
+    prefixes = set(match.group(1) for match in matches)
+    if len(prefixes) != 1: return chunk_titles
+
+    start = int(matches[0].group(2))
+
+    for chunk in numbered:
+        numbers = [int(match.group(2)) for match in chunk]
+        if numbers != range(start, start + len(numbers)):
+            return chunk_titles
+
+    prefix = prefixes.pop()
+    number = start
+    new_chunk_titles = []
+
+    for titles in chunk_titles:
+        new_chunk_titles.append(["{}{}".format(prefix, number + i)
+                                                for i in range(len(titles))])
+        number += len(titles)
+
+    return new_chunk_titles
+
+
+def merge_simulations(project, other, sim_indexes, original):
+
+    """Append simulations of another project to a project, where both were
+    made from copies of the original project. Data pool entries used by the
+    simulations are copied, and those created separately in each project
+    under the same index are given a new index.
+
+    Returns:
+        list: the indexes of the appended simulations in project
+
+    """
+
+    store = get_pool_store(project._pool)
+    other_store = get_pool_store(other._pool)
+    original_store = get_pool_store(original._pool)
+
+    if store is None or other_store is None or original_store is None:
+        errStr = "Simulations can only be merged with a recognised data pool"
+        raise ValueError(errStr)
+
+    links = _get_pool_links(project._pool, store)
+    other_links = _get_pool_links(other._pool, other_store)
+    original_links = _get_pool_links(original._pool, original_store)
+
+    simulations = [unwrap(other._simulations[i]) for i in sim_indexes]
+    index_maps = _get_index_maps(simulations)
+    refs = set(key for index_map in index_maps
+                        for key in index_map.values()
+                            if isinstance(key, _KEY_TYPES) and
+                               key in other_store)
+    renames = {}
+
+    for key in refs:
+
+        if key in store and key not in original_store:
+            renames[key] = _get_new_key(key, store, other_store)
+
+        new_key = renames.get(key, key)
+
+        if new_key in store:
+            count = other_links.get(key, 0) - original_links.get(key, 0)
+        else:
+            store[new_key] = other_store[key]
+            count = other_links.get(key, 0)
+
+        if links is not None and count > 0:
+            links[new_key] = links.get(new_key, 0) + count
+
+    # Only the data indexes of the data states are changed
+    for index_map in index_maps:
+        for var_id, key in index_map.items():
+            if isinstance(key, _KEY_TYPES) and key in renames:
+                index_map[var_id] = renames[key]
+
+    titles = set(sim.get_title() for sim in project._simulations)
+    merged_indexes = []
+
+    for simulation in simulations:
+
+        title = simulation.get_title()
+
+        if title in titles:
+
+            i = 2
+            while "{} ({})".format(title, i) in titles: i += 1
+            new_title = "{} ({})".format(title, i)
+
+            msg = ("Renaming merged simulation '{}' to '{}'").format(title,
+                                                                    new_title)
+            module_logger.warning(msg)
+
+            simulation.set_title(new_title)
+            title = new_title
+
+        project.add_simulation(simulation)
+        titles.add(title)
+        merged_indexes.append(len(project._simulations) - 1)
+
+    return merged_indexes
+
+
+def _init_worker(project_data):
+
+    global _worker_core, _worker_project_data
+
+    # Imported here, to avoid a circular import
+    from ..batch import get_core
+
+    _worker_core = get_core()
+
+    # The project is sent once per worker, and copied for each task
+    _worker_project_data = project_data
+
+    return
+
+
+def _execute_chunk(task):
+
+    chunk_index, strategy_cls, config, profile = task
+
+    project = _worker_core.load_project_stream(
+                                            StringIO(_worker_project_data))
+
+    if profile:
+        _worker_core.set_profiler(ExecutionProfiler())
+    else:
+        _worker_core.set_profiler(None)
+
+    strategy = strategy_cls()
+    strategy.set_config(config)
+
+    # Block signals, as when executing in the GUI's threads
+    _worker_core.blockSignals(True)
+    project.blockSignals(True)
+
+    try:
+        strategy.execute(_worker_core, project)
+    finally:
+        _worker_core.blockSignals(False)
+        project.blockSignals(False)
+
+    result_data = pickle.dumps(project._dump(), pickle.HIGHEST_PROTOCOL)
+
+    return (chunk_index,
+            result_data,
+            strategy.get_simulation_record(),
+            project.get_profile())
+
+
+def _get_pool_links(pool, store):
+
+    """Find the dictionary in which a data pool counts the links to each
+    data index, if any"""
+
+    for value in vars(pool).values():
+
+        if value is store or not isinstance(value, dict): continue
+
+        if all([isinstance(x, (int, long)) for x in value.values()]):
+            return value
+
+    return None
+
+
+def _get_index_maps(obj):
+
+    """Find the dictionaries of the data states within an object, which map
+    variable identifiers to data pool indexes. Data states are recognised
+    by their mirror_map method."""
+
+    index_maps = []
+    seen = set()
+    stack = [obj]
+
+    while stack:
+
+        value = stack.pop()
+
+        if id(value) in seen: continue
+        seen.add(id(value))
+
+        if isinstance(value, dict):
+            stack.extend(value.values())
+            continue
+
+        if isinstance(value, (list, tuple, set, frozenset)):
+            stack.extend(value)
+            continue
+
+        try:
+            attributes = vars(value)
+        except TypeError:
+            continue
+
+        index_map = attributes.get("_data")
+
+        if (callable(getattr(value, "mirror_map", None)) and
+            isinstance(index_map, dict)):
+            index_maps.append(index_map)
+            continue
+
+        stack.extend(attributes.values())
+
+    return index_maps
+
+
+def _get_new_key(key, *stores):
+
+    """Make a data pool index of the same kind as key, which is not used in
+    any of the stores"""
+
+    if isinstance(key, (int, long)) or key.isdigit():
+
+        used = [int(x) for store in stores for x in store
+                            if isinstance(x, (int, long)) or
+                               (isinstance(x, basestring) and x.isdigit())]
+        new_key = max(used) + 1
+
+        if isinstance(key, basestring): new_key = type(key)(new_key)
+
+        return new_key
+
+    while True:
+        new_key = type(key)(uuid.uuid4().hex)
+        if not any([new_key in store for store in stores]): break
+
+    return new_key
@@ -26,13 +26,10 @@ import threading
 import traceback
 import multiprocessing
 from copy import deepcopy
-from functools import partial
 
-import sip
 import numpy as np
 import matplotlib as mpl
 import matplotlib.pyplot as plt
-from PIL import Image
 from PyQt4 import QtCore, QtGui
 
 from aneris.utilities.misc import OrderedSet
@@ -43,10 +40,13 @@ from dtocean_core.strategies.position_optimiser import (dump_config,
 from dtocean_qt.models.DataFrameModel import DataFrameModel
 
 from . import GUIStrategy, StrategyWidget, PyQtABCMeta
+from ..plotting import save_figure
 from ..utils.display import is_high_dpi
 from ..widgets.datatable import DataTableWidget
 from ..widgets.dialogs import ProgressBar
 from ..widgets.display import (MPLWidget,
+                               decimate_points,
+                               figure_pool,
                                get_current_figure_size,
                                get_current_filetypes)
 from ..widgets.extendedcombobox import ExtendedComboBox
@@ -236,6 +236,7 @@ class AdvancedPositionWidget(QtGui.QWidget,
         self._default_max_resamples = 2
         
         self.plotWidget = None
+        self._plot_artists = None
         self._init_ui(parent)
         
         return
@@ -554,8 +555,6 @@ class AdvancedPositionWidget(QtGui.QWidget,
         
         self._shell.project.sims_updated.connect(self._update_status)
         self._shell.strategy_selected.connect(self._update_status)
-        self.destroyed.connect(partial(AdvancedPositionWidget._on_destroyed,
-                                       self.plotWidget))
         
         self._update_status(init=True)
         
@@ -1494,27 +1493,10 @@ class AdvancedPositionWidget(QtGui.QWidget,
         
         if not (x_axis_str and y_axis_str): return
         
-        x_axis_data = self._results_df[x_axis_str]
-        y_axis_data = self._results_df[y_axis_str]
+        data_filter = self._get_plot_filter()
         
-        data_filter = np.array([True] * len(self._results_df))
-        filter_str = str(self.filterVarBox.currentText())
-        
-        if filter_str:
-            
-            filter_data = self._results_df[filter_str]
-            
-            if self.filterVarMinBox.checkState() == QtCore.Qt.Checked:
-                filter_val = float(self.filterVarMinSpinBox.value())
-                data_filter = data_filter & (filter_data >= filter_val)
-            
-            if self.filterVarMaxBox.checkState() == QtCore.Qt.Checked:
-                filter_val = float(self.filterVarMaxSpinBox.value())
-                data_filter = data_filter & (filter_data <= filter_val)
-        
-        if not data_filter.all():
-            x_axis_data = x_axis_data[data_filter]
-            y_axis_data = y_axis_data[data_filter]
+        x_axis_data = self._results_df[x_axis_str].values[data_filter]
+        y_axis_data = self._results_df[y_axis_str].values[data_filter]
         
         color_axis_data = None
         cmap = plt.cm.brg
@@ -1546,30 +1528,28 @@ class AdvancedPositionWidget(QtGui.QWidget,
         
         if color_axis_str:
             
-            color_axis_data = self._results_df[color_axis_str]
+            color_axis_data = \
+                        self._results_df[color_axis_str].values[data_filter]
             
-            if not data_filter.all():
-                color_axis_data = color_axis_data[data_filter]
-            
-            if len(set(color_axis_data)) < 2:
+            if len(np.unique(color_axis_data)) < 2:
                 color_axis_data = None
         
         if (color_axis_data is not None and
             color_axis_data.dtype == np.int64): 
             
-            cb_vals = list(set(color_axis_data))
+            cb_vals = np.unique(color_axis_data)
             
             if vmin is None:
                 color_axis_min = color_axis_data.min()
             else:
                 color_axis_min = int(vmin)
-                cb_vals = [x for x in cb_vals if x >= vmin]
+                cb_vals = cb_vals[cb_vals >= vmin]
             
             if vmax is None:
                 color_axis_max = color_axis_data.max()
             else:
                 color_axis_max = int(vmax)
-                cb_vals = [x for x in cb_vals if x <= vmax]
+                cb_vals = cb_vals[cb_vals <= vmax]
             
             if len(cb_vals) < 2:
                 
@@ -1586,6 +1566,59 @@ class AdvancedPositionWidget(QtGui.QWidget,
                 
                 norm = mpl.colors.BoundaryNorm(bounds, cmap.N)
         
+        # Only draw a representative subset of large sets of points on
+        # screen. Exported plots contain every point.
+        if set_widget:
+            
+            keep = decimate_points(x_axis_data, y_axis_data)
+            
+            if len(keep) < len(x_axis_data):
+                
+                log_str = "Plotting {} of {} points".format(
+                                                        len(keep),
+                                                        len(x_axis_data))
+                module_logger.debug(log_str)
+                
+                x_axis_data = x_axis_data[keep]
+                y_axis_data = y_axis_data[keep]
+                
+                if color_axis_data is not None:
+                    color_axis_data = color_axis_data[keep]
+        
+        extend = 'neither'
+        
+        if vmin is not None and vmax is not None:
+            extend = 'both'
+        elif vmin is not None:
+            extend = 'min'
+        elif vmax is not None:
+            extend = 'max'
+        
+        # Plots with the same variables and colour scale can be redrawn by
+        # updating the data of the existing figure
+        if color_axis_data is None:
+            plot_key = (x_axis_str, y_axis_str, None, None)
+        elif norm is not None:
+            plot_key = None
+        else:
+            plot_key = (x_axis_str, y_axis_str, color_axis_str, extend)
+        
+        if (set_widget and
+            plot_key is not None and
+            self._plot_artists is not None and
+            self._plot_artists["key"] == plot_key):
+            
+            self._update_plot_artists(x_axis_data,
+                                      y_axis_data,
+                                      color_axis_data,
+                                      vmin,
+                                      vmax,
+                                      (xmin, xmax),
+                                      (ymin, ymax))
+            self.plotWidget.draw_idle()
+            
+            return
+        
         fig, ax = plt.subplots()
         
         im = ax.scatter(x_axis_data,
@@ -1602,18 +1635,11 @@ class AdvancedPositionWidget(QtGui.QWidget,
         ax.set(xlabel=x_axis_str,
                ylabel=y_axis_str)
         
+        cb = None
+        
         # Add a colorbar
         if color_axis_data is not None:
             
-            extend = 'neither'
-            
-            if vmin is not None and vmax is not None:
-                extend = 'both'
-            elif vmin is not None:
-                extend = 'min'
-            elif vmax is not None:
-                extend = 'max'
-            
             cb = fig.colorbar(im, ax=ax, extend=extend)
             cb.set_label(color_axis_str)
             
@@ -1643,19 +1669,78 @@ class AdvancedPositionWidget(QtGui.QWidget,
         self.plotWidget = widget
         self.plotLayout.addWidget(widget)
         
+        self._plot_artists = {"key": plot_key,
+                              "axes": ax,
+                              "scatter": im,
+                              "colorbar": cb}
+        
         # Draw the widget
         widget.draw_idle()
         
-        if len(plt.get_fignums()) > 3:
+        figure_pool.check()
+        
+        self._update_status_plots()
+        
+        return
+    
+    def _get_plot_filter(self):
+        
+        data_filter = np.ones(len(self._results_df), dtype=bool)
+        filter_str = str(self.filterVarBox.currentText())
+        
+        if not filter_str: return data_filter
+        
+        filter_data = self._results_df[filter_str].values
+        
+        # Missing values are excluded by either limit
+        with np.errstate(invalid='ignore'):
             
-            num_strs = ["{}".format(x) for x in plt.get_fignums()]
-            num_str = ", ".join(num_strs)
-            err_msg = ("Too many matplotlib figures detected. "
-                       "Numbers: {}").format(num_str)
+            if self.filterVarMinBox.checkState() == QtCore.Qt.Checked:
+                filter_val = float(self.filterVarMinSpinBox.value())
+                data_filter &= filter_data >= filter_val
             
-            raise RuntimeError(err_msg)
+            if self.filterVarMaxBox.checkState() == QtCore.Qt.Checked:
+                filter_val = float(self.filterVarMaxSpinBox.value())
+                data_filter &= filter_data <= filter_val
         
-        self._update_status_plots()
+        return data_filter
+    
+    def _update_plot_artists(self, x_axis_data,
+                                   y_axis_data,
+                                   color_axis_data,
+                                   vmin,
+                                   vmax,
+                                   xlim,
+                                   ylim):
+        
+        ax = self._plot_artists["axes"]
+        im = self._plot_artists["scatter"]
+        cb = self._plot_artists["colorbar"]
+        
+        offsets = np.column_stack([x_axis_data, y_axis_data])
+        im.set_offsets(offsets)
+        
+        if color_axis_data is not None:
+            
+            im.set_array(color_axis_data)
+            
+            if vmin is None: vmin = color_axis_data.min()
+            if vmax is None: vmax = color_axis_data.max()
+            
+            im.set_clim(vmin, vmax)
+            cb.update_normal(im)
+        
+        # Rescale to the new data, before applying any fixed limits
+        finite = np.isfinite(offsets).all(axis=1)
+        ax.ignore_existing_data_limits = True
+        
+        if finite.any(): ax.update_datalim(offsets[finite])
+        
+        ax.set_autoscale_on(True)
+        ax.autoscale_view()
+        
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
         
         return
     
@@ -1666,10 +1751,10 @@ class AdvancedPositionWidget(QtGui.QWidget,
         self.plotLayout.removeWidget(self.plotWidget)
         self.plotWidget.setParent(None)
         
-        _close_plot(self.plotWidget)
-        sip.delete(self.plotWidget)
+        figure_pool.release(self.plotWidget)
         
         self.plotWidget = None
+        self._plot_artists = None
         
         return
     
@@ -1709,24 +1794,9 @@ class AdvancedPositionWidget(QtGui.QWidget,
         self._set_plot(set_widget=False)
         fig_handle = plt.gcf()
         
-        fig_handle.set_size_inches(*size)
-        
-        with plt.rc_context(rc={'font.size': 8,
-                                'font.sans-serif': 'Verdana'}):
-            
-            fig_handle.savefig(str(file_path),
-                               dpi=dpi,
-                               bbox_inches='tight')
-        
+        save_figure(fig_handle, file_path, size, dpi)
         plt.close(fig_handle)
         
-        # Ensure DPI is saved
-        try:
-            im = Image.open(str(file_path))
-            im.save(str(file_path), dpi=[dpi, dpi])
-        except IOError:
-            pass
-        
         return
     
     @QtCore.pyqtSlot()
@@ -1770,10 +1840,6 @@ class AdvancedPositionWidget(QtGui.QWidget,
         
         return
     
-    @staticmethod
-    def _on_destroyed(widget):
-        _close_plot(widget)
-    
     def get_configuration(self):
         
         '''A method for getting the dictionary to configure the strategy.
@@ -2275,18 +2341,3 @@ def _get_range_config(var_box_values, name_map):
     range_config_dict[max_key] = var_box_values["range.box.max"]
     
     return range_config_dict
-
-
-def _close_plot(plot_widget):
-    
-    if plot_widget is None: return
-    
-    fignum = plot_widget.figure.number
-    n_figs = len(plt.get_fignums())
-    
-    log_msg = "Closing figure {} ({} open)".format(fignum, n_figs)
-    module_logger.debug(log_msg)
-    
-    plt.close(fignum)
-    
-    return
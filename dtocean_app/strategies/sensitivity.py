@@ -22,6 +22,7 @@ from dtocean_core.pipeline import Tree
 from dtocean_core.strategies.sensitivity import UnitSensitivity
 
 from . import GUIStrategy, StrategyWidget, PyQtABCMeta
+from .parallel import ParallelStrategy, get_max_workers, split_values
 from ..utils.display import is_high_dpi
 from ..widgets.extendedcombobox import ExtendedComboBox
 
@@ -34,7 +35,7 @@ else:
     from ..designer.low.unitsensitivity import Ui_UnitSensitivityWidget
 
 
-class GUIUnitSensitivity(GUIStrategy, UnitSensitivity):
+class GUIUnitSensitivity(ParallelStrategy, GUIStrategy, UnitSensitivity):
     
     """A sensitivity study on a single unit variables over a given range of
     values, adjusted before execution of a chosen module."""
@@ -61,6 +62,34 @@ class GUIUnitSensitivity(GUIStrategy, UnitSensitivity):
 
         return 2
     
+    def configure(self, module_name,
+                        variable_name,
+                        variable_values,
+                        n_workers=1):
+        
+        super(GUIUnitSensitivity, self).configure(module_name,
+                                                  variable_name,
+                                                  variable_values)
+        self.set_workers(n_workers)
+        
+        return
+    
+    def get_chunks(self, n_chunks):
+        
+        config = self.get_config()
+        chunks = []
+        
+        for var_values in split_values(config["var_values"], n_chunks):
+            
+            chunk_config = dict(config)
+            chunk_config["var_values"] = var_values
+            chunks.append((chunk_config, len(var_values)))
+        
+        return chunks
+    
+    def get_simulation_count(self):
+        return len(self.get_config()["var_values"])
+    
     def get_widget(self, parent, shell):
         
         widget = UnitSensitivityWidget(parent)
@@ -99,6 +128,9 @@ class UnitSensitivityWidget(QtGui.QWidget,
         # Disble line edit
         self.lineEdit.setDisabled(True)
         
+        # Limit workers to the available processors
+        self.nWorkerSpinBox.setMaximum(get_max_workers())
+        
         # Custom boxes
         self.modBox = ExtendedComboBox(self)
         self.modBox.setObjectName("modBox")
@@ -229,7 +261,8 @@ class UnitSensitivityWidget(QtGui.QWidget,
                 
         conf_dict = {"module_name": mod_name,
                      "variable_name": var_id,
-                     "variable_values": var_values
+                     "variable_values": var_values,
+                     "n_workers": self.nWorkerSpinBox.value()
                      }
                 
         return conf_dict
@@ -268,5 +301,6 @@ class UnitSensitivityWidget(QtGui.QWidget,
             raise ValueError(errStr)
             
         self.lineEdit.setText(var_values_str)
+        self.nWorkerSpinBox.setValue(config_dict.get("n_workers", 1))
         
         return
@@ -0,0 +1,644 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Streaming tar archives with individually compressed members.
+
+The outer archive is a plain tar file, so that members can be located and
+read independently, while the contents of each member are compressed as
+they are written. Archives are built in a temporary file next to the
+destination and moved into place once they are complete.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import os
+import bz2
+import sys
+import json
+import time
+import zlib
+import shutil
+import logging
+import tarfile
+import tempfile
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class _Codec(object):
+
+    """Compression codec for archive members"""
+
+    def __init__(self, name, suffix, compressor, decompressor):
+
+        self.name = name
+        self.suffix = suffix
+        self._compressor = compressor
+        self._decompressor = decompressor
+
+        return
+
+    def compressor(self, level):
+
+        if self._compressor is None: return None
+
+        return self._compressor(level)
+
+    def decompressor(self):
+
+        if self._decompressor is None: return None
+
+        return self._decompressor()
+
+
+def _xz_compressor(level):
+
+    return lzma.LZMACompressor(preset=level)
+
+
+def _xz_decompressor():
+
+    return lzma.LZMADecompressor()
+
+
+CODECS = {"none": _Codec("none", "", None, None),
+          "gzip": _Codec("gzip",
+                         ".gz",
+                         lambda level: zlib.compressobj(level,
+                                                        zlib.DEFLATED,
+                                                        31),
+                         lambda: zlib.decompressobj(31)),
+          "bz2": _Codec("bz2",
+                        ".bz2",
+                        bz2.BZ2Compressor,
+                        bz2.BZ2Decompressor)}
+
+if lzma is not None:
+    CODECS["xz"] = _Codec("xz", ".xz", _xz_compressor, _xz_decompressor)
+
+
+def get_codec(name):
+
+    if name not in CODECS:
+
+        errStr = ("Compression codec '{}' is not available. Valid codecs "
+                  "are: {}").format(name, ", ".join(sorted(CODECS)))
+        raise ValueError(errStr)
+
+    return CODECS[name]
+
+
+def _split_member_name(member_name):
+
+    for codec in CODECS.values():
+
+        if not codec.suffix: continue
+
+        if member_name.endswith(codec.suffix):
+            return member_name[:-len(codec.suffix)], codec
+
+    return member_name, CODECS["none"]
+
+
+def replace_file(src_path, dst_path):
+
+    """Move src_path over dst_path, replacing any existing file in a single
+    operation where the platform allows it."""
+
+    if sys.platform == "win32": # pragma: no cover
+
+        import win32api
+        import win32con
+
+        flags = (win32con.MOVEFILE_REPLACE_EXISTING |
+                 win32con.MOVEFILE_WRITE_THROUGH)
+        win32api.MoveFileEx(src_path, dst_path, flags)
+
+        return
+
+    os.rename(src_path, dst_path)
+
+    return
+
+
+class MemberWriter(object):
+
+    """File-like object which streams (and compresses) data into a single
+    archive member. The member header is rewritten with the final size when
+    the member is closed."""
+
+    def __init__(self, fileobj, name, codec, level, raw=False):
+
+        self.name = name
+        self._fileobj = fileobj
+        self._compressor = None if raw else codec.compressor(level)
+        self._info = tarfile.TarInfo(name + codec.suffix)
+        self._info.mtime = int(time.time())
+        self._info.mode = 0o644
+        self._header_offset = fileobj.tell()
+        self._closed = False
+
+        fileobj.write(self._info.tobuf(tarfile.GNU_FORMAT))
+        self._data_offset = fileobj.tell()
+
+        return
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def write(self, data):
+
+        if self._closed:
+            raise ValueError("I/O operation on closed archive member")
+
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+
+        if data: self._fileobj.write(data)
+
+        return
+
+    def close(self):
+
+        if self._closed: return
+
+        if self._compressor is not None:
+            self._fileobj.write(self._compressor.flush())
+
+        end_offset = self._fileobj.tell()
+        self._info.size = end_offset - self._data_offset
+
+        # Pad the data to a complete block
+        remainder = self._info.size % tarfile.BLOCKSIZE
+
+        if remainder:
+            self._fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+
+        archive_end = self._fileobj.tell()
+
+        # Rewrite the header with the true size
+        self._fileobj.seek(self._header_offset)
+        self._fileobj.write(self._info.tobuf(tarfile.GNU_FORMAT))
+        self._fileobj.seek(archive_end)
+
+        self._closed = True
+
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArchiveWriter(object):
+
+    """Write a tar archive, member by member, without staging the member
+    files on disk. The archive is only moved to path once close is called.
+
+    If append is True, members are instead added to the end of the existing
+    archive at path. Members replace any earlier members with the same name
+    when read. Should the append fail, the archive is truncated back to its
+    original contents.
+
+    Args:
+        path (str): the destination path of the archive
+        compression (str): name of the codec used for the members
+        level (int): compression level, from 1 (fastest) to 9 (smallest)
+        append (bool): add to the existing archive at path
+
+    """
+
+    def __init__(self, path, compression="gzip", level=6, append=False):
+
+        self.path = os.path.abspath(path)
+        self._codec = get_codec(compression)
+        self._level = level
+        self._member = None
+        self._temp_path = None
+        self._append_offset = None
+
+        if append:
+
+            with ArchiveReader(self.path) as reader:
+                self._append_offset = reader.end_offset
+
+            self._fileobj = open(self.path, "r+b")
+            self._fileobj.seek(self._append_offset)
+            self._fileobj.truncate()
+
+            return
+
+        dir_path, file_name = os.path.split(self.path)
+
+        fd, temp_path = tempfile.mkstemp(prefix=".{}.".format(file_name),
+                                         suffix=".part",
+                                         dir=dir_path)
+
+        self._temp_path = temp_path
+        self._fileobj = os.fdopen(fd, "w+b")
+
+        return
+
+    def open_member(self, name, compress=True):
+
+        """Return a file-like object for writing the member called name.
+        The previous member must be closed before opening another."""
+
+        self._check_member_closed()
+
+        if compress:
+            codec = self._codec
+        else:
+            codec = CODECS["none"]
+
+        self._member = MemberWriter(self._fileobj,
+                                    name,
+                                    codec,
+                                    self._level)
+
+        return self._member
+
+    def write_bytes(self, name, data, compress=True):
+
+        with self.open_member(name, compress) as member:
+            member.write(data)
+
+        return
+
+    def copy_member(self, reader, name):
+
+        """Copy a member from an ArchiveReader without decompressing and
+        recompressing its contents"""
+
+        self._check_member_closed()
+
+        _, codec = reader.get_member_info(name)
+        src = reader.open_raw_member(name)
+
+        self._member = MemberWriter(self._fileobj,
+                                    name,
+                                    codec,
+                                    self._level,
+                                    raw=True)
+
+        with src, self._member as member:
+
+            while True:
+
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk: break
+
+                member.write(chunk)
+
+        return
+
+    def write_json(self, name, obj):
+
+        self.write_bytes(name, json.dumps(obj), compress=False)
+
+        return
+
+    def write_file(self, name, file_path, compress=True):
+
+        with open(file_path, "rb") as src, \
+                                self.open_member(name, compress) as member:
+
+            while True:
+
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk: break
+
+                member.write(chunk)
+
+        return
+
+    def _check_member_closed(self):
+
+        if self._member is not None and not self._member.closed:
+
+            errStr = ("Member '{}' must be closed before opening "
+                      "another").format(self._member.name)
+            raise RuntimeError(errStr)
+
+        return
+
+    def close(self):
+
+        """Finish the archive and move it to its destination"""
+
+        if self._fileobj is None: return
+
+        if self._member is not None: self._member.close()
+
+        self._finish()
+
+        if self._temp_path is not None:
+            replace_file(self._temp_path, self.path)
+
+        return
+
+    def abort(self):
+
+        """Discard the partially written archive, or the appended members"""
+
+        if self._fileobj is None: return
+
+        if self._append_offset is not None:
+            self._fileobj.seek(self._append_offset)
+            self._fileobj.truncate()
+            self._finish()
+            return
+
+        self._fileobj.close()
+        self._fileobj = None
+
+        try:
+            os.remove(self._temp_path)
+        except OSError: # pragma: no cover
+            module_logger.warning("Failed to remove temporary archive "
+                                  "{}".format(self._temp_path))
+
+        return
+
+    def _finish(self):
+
+        # End of archive marker, padded to a full record
+        self._fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE * 2))
+        remainder = self._fileobj.tell() % tarfile.RECORDSIZE
+
+        if remainder:
+            self._fileobj.write(tarfile.NUL * (tarfile.RECORDSIZE - remainder))
+
+        self._fileobj.flush()
+        os.fsync(self._fileobj.fileno())
+        self._fileobj.close()
+        self._fileobj = None
+
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class MemberReader(object):
+
+    """File-like object which decompresses an archive member as it is
+    read. Provides the read and readline methods needed for unpickling."""
+
+    def __init__(self, fileobj, codec):
+
+        self._fileobj = fileobj
+        self._decompressor = codec.decompressor()
+        self._buffer = b""
+        self._pos = 0
+        self._eof = False
+
+        return
+
+    def _fill(self, size):
+
+        while (not self._eof and
+               (size < 0 or len(self._buffer) - self._pos < size)):
+
+            chunk = self._fileobj.read(CHUNK_SIZE)
+
+            if not chunk:
+
+                if (self._decompressor is not None and
+                    hasattr(self._decompressor, "flush")):
+                    chunk = self._decompressor.flush()
+
+                self._eof = True
+
+            elif self._decompressor is not None:
+
+                chunk = self._decompressor.decompress(chunk)
+
+            # Drop consumed data when extending the buffer
+            self._buffer = self._buffer[self._pos:] + chunk
+            self._pos = 0
+
+        return
+
+    def read(self, size=-1):
+
+        self._fill(size)
+
+        if size < 0:
+            end = len(self._buffer)
+        else:
+            end = min(self._pos + size, len(self._buffer))
+
+        data = self._buffer[self._pos:end]
+        self._pos = end
+
+        return data
+
+    def readline(self, size=-1):
+
+        while True:
+
+            newline = self._buffer.find(b"\n", self._pos)
+
+            if newline >= 0 or self._eof: break
+
+            self._fill(len(self._buffer) - self._pos + CHUNK_SIZE)
+
+        if newline >= 0:
+            end = newline + 1
+        else:
+            end = len(self._buffer)
+
+        if size >= 0: end = min(end, self._pos + size)
+
+        data = self._buffer[self._pos:end]
+        self._pos = end
+
+        return data
+
+    def close(self):
+
+        self._fileobj.close()
+        self._buffer = b""
+
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArchiveReader(object):
+
+    """Read members from a tar archive written by ArchiveWriter (or a plain
+    tar archive) without extracting it. Members are addressed by the name
+    they were written with, regardless of their compression.
+
+    If commit_name is given, any members written after the last member
+    called commit_name are ignored, as they were left by an interrupted
+    append. Archives without a commit_name member are read in full.
+
+    Args:
+        path (str): path to the archive
+        commit_name (str, optional): name of the member which completes
+            each write of the archive
+
+    """
+
+    def __init__(self, path, commit_name=None):
+
+        self.path = os.path.abspath(path)
+        self._tar = tarfile.open(self.path, "r")
+        self._members = {}
+        self._versions = {}
+
+        entries = []
+        committed = None
+
+        for info in self._tar:
+
+            if not info.isfile(): continue
+
+            name, codec = _split_member_name(info.name)
+            entries.append((name, info, codec))
+
+            if name == commit_name: committed = len(entries)
+
+        if committed is not None: entries = entries[:committed]
+
+        # Later members replace earlier ones with the same name
+        for name, info, codec in entries:
+            self._members[name] = (info, codec)
+            self._versions.setdefault(name, []).append((info, codec))
+
+        # Reading stops at the end of archive marker, or at an incomplete
+        # member left by an interrupted append
+        self.end_offset = self._tar.offset
+
+        return
+
+    def getnames(self):
+
+        return self._members.keys()
+
+    def get_member_size(self, name):
+
+        """Return the stored (compressed) size of the named member"""
+
+        info, _ = self.get_member_info(name)
+
+        return info.size
+
+    def get_version_count(self, name):
+
+        """Return the number of members stored under name"""
+
+        return len(self._versions.get(name, []))
+
+    def open_member_version(self, name, version):
+
+        """Open an earlier member stored under name, where version counts
+        back from -1 for the latest member"""
+
+        info, codec = self._versions[name][version]
+
+        return MemberReader(self._tar.extractfile(info), codec)
+
+    def has_member(self, name):
+
+        return name in self._members
+
+    def get_member_info(self, name):
+
+        """Return the tar header and codec of the named member"""
+
+        if name not in self._members:
+
+            errStr = "Archive {} has no member '{}'".format(self.path, name)
+            raise KeyError(errStr)
+
+        return self._members[name]
+
+    def open_member(self, name):
+
+        info, codec = self.get_member_info(name)
+
+        return MemberReader(self._tar.extractfile(info), codec)
+
+    def open_raw_member(self, name):
+
+        """Open the named member without decompressing it"""
+
+        info, _ = self.get_member_info(name)
+
+        return MemberReader(self._tar.extractfile(info), CODECS["none"])
+
+    def read_bytes(self, name):
+
+        with self.open_member(name) as member:
+            data = member.read()
+
+        return data
+
+    def read_json(self, name):
+
+        return json.loads(self.read_bytes(name))
+
+    def extract_member(self, name, file_path):
+
+        """Decompress a single member to file_path"""
+
+        with self.open_member(name) as member, open(file_path, "wb") as dst:
+            shutil.copyfileobj(member, dst, CHUNK_SIZE)
+
+        return
+
+    def close(self):
+
+        self._tar.close()
+
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
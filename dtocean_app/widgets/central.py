@@ -462,6 +462,19 @@ class PlotManagerWidget(QtGui.QWidget, Ui_PlotManagerWidget):
         self.setEnabled(True)
         
         self._controller = controller
+        
+        self._set_plot_list(plot_list, plot_auto)
+        self._set_ext_types()
+        
+        return
+    
+    def _set_ext_types(self):
+        
+        """Set the file types available for saving from the current
+        figure"""
+        
+        if self._controller is None: return
+        
         self._ext_types = get_current_filetypes()
         
         if not self._ext_types:
@@ -474,7 +487,6 @@ class PlotManagerWidget(QtGui.QWidget, Ui_PlotManagerWidget):
             self.saveButton.setEnabled(True)
             self.pathEdit.setEnabled(True)
         
-        self._set_plot_list(plot_list, plot_auto)
         self._set_save()
         
         return
@@ -30,9 +30,7 @@ https://opensource.org/licenses/MIT
 .. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
 """
 
-import io
-import csv
-
+import numpy as np
 from dtocean_qt.compat import QtCore, QtGui, Slot
 
 from dtocean_qt.models.DataFrameModel import DataFrameModel
@@ -42,6 +40,8 @@ from dtocean_qt.views.EditDialogs import (AddAttributesDialog,
                                           RemoveAttributesDialog)
 from dtocean_qt.views._ui import icons_rc
 
+from .tablemodel import VirtualDataFrameModel
+
 try:
     _fromUtf8 = QtCore.QString.fromUtf8
 except AttributeError:
@@ -207,6 +207,18 @@ class DataTableWidget(QtGui.QWidget):
         self.tableView.setSizePolicy(sizePolicy)
         self.tableView.installEventFilter(self)
         
+        # Copy actions
+        self.copyAction = QtGui.QAction(self.tr(u'Copy'), self.tableView)
+        self.copyAction.triggered.connect(lambda: self.copySelection())
+        
+        self.copyTableAction = QtGui.QAction(self.tr(u'Copy whole table'),
+                                             self.tableView)
+        self.copyTableAction.triggered.connect(lambda: self.copyTable())
+        
+        self.tableView.addAction(self.copyAction)
+        self.tableView.addAction(self.copyTableAction)
+        self.tableView.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
+        
         self.gridLayout.addWidget(self.tableView, tab_layout_idx, 0, 1, 1)
         
         return
@@ -223,11 +235,11 @@ class DataTableWidget(QtGui.QWidget):
         """Sets the model for the enclosed TableView in this widget.
 
         Args:
-            model (DataFrameModel): The model to be displayed by
-                the Table View.
+            model (DataFrameModel or VirtualDataFrameModel): The model to be
+                displayed by the Table View.
 
         """
-        if isinstance(model, DataFrameModel):
+        if isinstance(model, (DataFrameModel, VirtualDataFrameModel)):
             
             self.enableEditing(False)
             self.uncheckButton()
@@ -305,28 +317,81 @@ class DataTableWidget(QtGui.QWidget):
         
         return super(DataTableWidget, self).eventFilter(source, event)
         
-    def copySelection(self):
+    def copySelection(self, sep=","):
+        """Copy the selected cells to the clipboard as delimited text.
         
-        selection = self.tableView.selectedIndexes()
+        The selection is resolved to ranges of rows and columns which are
+        sliced from the DataFrame of the model in one pass. Cells within the
+        bounding box of the selection which are not selected are left empty.
         
-        if selection:
+        Args:
+            sep (str, optional): the column delimiter. Defaults to ",".
+        
+        """
+        
+        model = self.tableView.model()
+        if model is None: return
+        
+        selection = self.tableView.selectionModel().selection()
+        ranges = [selection[i] for i in xrange(len(selection))]
+        
+        if not ranges: return
+        
+        top = min([selection_range.top() for selection_range in ranges])
+        bottom = max([selection_range.bottom() for selection_range in ranges])
+        left = min([selection_range.left() for selection_range in ranges])
+        right = max([selection_range.right() for selection_range in ranges])
+        
+        rows = np.arange(top, bottom + 1)
+        if hasattr(model, "dataFrameRows"): rows = model.dataFrameRows(rows)
+        
+        data = model.dataFrame().iloc[rows, left:right + 1]
+        
+        if len(ranges) > 1:
             
-            rows = sorted(index.row() for index in selection)
-            columns = sorted(index.column() for index in selection)
-            rowcount = rows[-1] - rows[0] + 1
-            colcount = columns[-1] - columns[0] + 1
-            table = [[''] * colcount for _ in range(rowcount)]
+            mask = np.zeros(data.shape, dtype=bool)
             
-            for index in selection:
-                
-                row = index.row() - rows[0]
-                column = index.column() - columns[0]
-                table[row][column] = index.data().toPyObject()
-                
-            stream = io.BytesIO()
-            csv.writer(stream).writerows(table)
-            QtGui.qApp.clipboard().setText(stream.getvalue())
+            for selection_range in ranges:
+                mask[selection_range.top() - top:
+                         selection_range.bottom() - top + 1,
+                     selection_range.left() - left:
+                         selection_range.right() - left + 1] = True
+            
+            data = data.astype(object).where(mask, "")
+        
+        text = data.to_csv(sep=sep, header=False, index=False)
+        QtGui.qApp.clipboard().setText(text)
+        
+        return
+    
+    def copyTable(self, sep=","):
+        """Copy every row of the table, with the column headers, to the
+        clipboard as delimited text.
+        
+        Args:
+            sep (str, optional): the column delimiter. Defaults to ",".
+        
+        """
+        
+        model = self.tableView.model()
+        if model is None: return
+        
+        data = model.dataFrame()
+        
+        # Only reorder the rows if the model is sorted
+        if hasattr(model, "dataFrameRows"):
             
+            rows = np.arange(len(data))
+            data_rows = model.dataFrameRows(rows)
+            
+            if (data_rows != rows).any(): data = data.iloc[data_rows]
+        
+        labels = [unicode(model.headerData(i, QtCore.Qt.Horizontal).toString())
+                                            for i in xrange(data.shape[1])]
+        
+        text = data.to_csv(sep=sep, header=labels, index=False)
+        QtGui.qApp.clipboard().setText(text)
+        
         return
         
         
@@ -33,6 +33,8 @@ import yaml
 import pandas as pd
 from PyQt4 import QtGui, QtCore
 
+from ..plotting import EXPORT_FORMATS
+from ..progress import get_status_text
 from ..utils.config import get_software_version # pylint: disable=no-name-in-module
 from ..utils.display import is_high_dpi
 
@@ -53,6 +55,7 @@ if is_high_dpi():
     from ..designer.high.progress import Ui_ProgressBar
     from ..designer.high.listframeeditor import  Ui_ListFrameEditor
     from ..designer.high.about import  Ui_AboutDialog
+    from ..designer.high.plotexport import Ui_PlotExportDialog
     
 else:
     
@@ -65,6 +68,7 @@ else:
     from ..designer.low.progress import Ui_ProgressBar
     from ..designer.low.listframeeditor import  Ui_ListFrameEditor
     from ..designer.low.about import  Ui_AboutDialog
+    from ..designer.low.plotexport import Ui_PlotExportDialog
 
 HOME = os.path.expanduser("~")
 DIR_PATH = os.path.dirname(__file__)
@@ -554,9 +558,157 @@ class ListFrameEditor(QtGui.QDialog, Ui_ListFrameEditor):
         return
 
 
+class PlotExport(QtGui.QDialog, Ui_PlotExportDialog):
+    
+    """Dialog for choosing the variables and simulations whose plots are
+    exported, and where and how they are saved."""
+    
+    def __init__(self, parent=None):
+        
+        super(PlotExport, self).__init__(parent)
+        
+        self._init_ui()
+        
+        return
+    
+    def _init_ui(self):
+        
+        self.setupUi(self)
+        
+        self.formatComboBox.addItems(EXPORT_FORMATS)
+        
+        self.simAllButton.clicked.connect(
+                    lambda: self._set_all_checked(self.simListWidget, True))
+        self.simNoneButton.clicked.connect(
+                    lambda: self._set_all_checked(self.simListWidget, False))
+        self.varAllButton.clicked.connect(
+                    lambda: self._set_all_checked(self.varListWidget, True))
+        self.varNoneButton.clicked.connect(
+                    lambda: self._set_all_checked(self.varListWidget, False))
+        self.browseButton.clicked.connect(self._set_path)
+        
+        self.simListWidget.itemChanged.connect(self._update_ok)
+        self.varListWidget.itemChanged.connect(self._update_ok)
+        self.pathLineEdit.textChanged.connect(self._update_ok)
+        
+        self._update_ok()
+        
+        return
+    
+    def set_choices(self, sim_titles,
+                          variables,
+                          selected_var_id=None,
+                          max_workers=1):
+        
+        """Set the simulations, which are all checked, and the variables,
+        given as tuples of their identifier and title, of which only the
+        selected variable is checked."""
+        
+        self.simListWidget.clear()
+        self.varListWidget.clear()
+        
+        for sim_title in sim_titles:
+            self._add_item(self.simListWidget, sim_title, sim_title, True)
+        
+        for var_id, var_title in variables:
+            
+            text = "{} ({})".format(var_title, var_id)
+            self._add_item(self.varListWidget,
+                           text,
+                           var_id,
+                           var_id == selected_var_id)
+        
+        self.workersSpinBox.setMaximum(max(1, max_workers))
+        self.workersSpinBox.setValue(max(1, max_workers))
+        
+        self._update_ok()
+        
+        return
+    
+    def get_config(self):
+        
+        """Return the chosen export options as a dictionary"""
+        
+        config = {"sim_titles": self._get_checked(self.simListWidget),
+                  "var_ids": self._get_checked(self.varListWidget),
+                  "all_plots": self.allPlotsCheckBox.isChecked(),
+                  "out_dir": str(self.pathLineEdit.text()),
+                  "ext": str(self.formatComboBox.currentText()),
+                  "size": (float(self.widthSpinBox.value()),
+                           float(self.heightSpinBox.value())),
+                  "dpi": int(self.dpiSpinBox.value()),
+                  "n_workers": int(self.workersSpinBox.value())}
+        
+        return config
+    
+    def _add_item(self, list_widget, text, value, checked):
+        
+        item = QtGui.QListWidgetItem(text, list_widget)
+        item.setData(QtCore.Qt.UserRole, value)
+        item.setFlags(item.flags() | QtCore.Qt.ItemIsUserCheckable)
+        
+        if checked:
+            item.setCheckState(QtCore.Qt.Checked)
+        else:
+            item.setCheckState(QtCore.Qt.Unchecked)
+        
+        return
+    
+    def _get_checked(self, list_widget):
+        
+        values = []
+        
+        for i in xrange(list_widget.count()):
+            
+            item = list_widget.item(i)
+            
+            if item.checkState() != QtCore.Qt.Checked: continue
+            
+            value = item.data(QtCore.Qt.UserRole).toPyObject()
+            values.append(str(value))
+        
+        return values
+    
+    def _set_all_checked(self, list_widget, checked):
+        
+        if checked:
+            state = QtCore.Qt.Checked
+        else:
+            state = QtCore.Qt.Unchecked
+        
+        for i in xrange(list_widget.count()):
+            list_widget.item(i).setCheckState(state)
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _set_path(self):
+        
+        dir_path = QtGui.QFileDialog.getExistingDirectory(
+                                            self,
+                                            "Select directory for plots",
+                                            HOME)
+        
+        if dir_path: self.pathLineEdit.setText(dir_path)
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _update_ok(self):
+        
+        ready = (bool(self._get_checked(self.simListWidget)) and
+                 bool(self._get_checked(self.varListWidget)) and
+                 bool(str(self.pathLineEdit.text()).strip()))
+        
+        self.buttonBox.button(QtGui.QDialogButtonBox.Ok).setEnabled(ready)
+        
+        return
+
+
 class ProgressBar(QtGui.QDialog, Ui_ProgressBar):
     
     force_quit = QtCore.pyqtSignal()
+    cancel_requested = QtCore.pyqtSignal()
     
     def __init__(self, parent=None, allow_close=False):
         
@@ -567,6 +719,15 @@ class ProgressBar(QtGui.QDialog, Ui_ProgressBar):
         self.setupUi(self)
         
         self.allow_close = allow_close
+        self._status = None
+        
+        # Refresh the elapsed and remaining times between updates
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self._update_details)
+        
+        self.cancelButton.clicked.connect(self._request_cancel)
+        self.set_cancellable(False)
                 
         return
         
@@ -574,11 +735,62 @@ class ProgressBar(QtGui.QDialog, Ui_ProgressBar):
         
         self.progressBar.setRange(0,0)
         
+        self._status = None
+        self._timer.stop()
+        self.detailsLabel.clear()
+        self.set_cancellable(False)
+        
+        return
+    
+    def set_cancellable(self, cancellable=True):
+        
+        """Show or hide the cancel button"""
+        
+        self.cancelButton.setText("Cancel")
+        self.cancelButton.setEnabled(cancellable)
+        self.cancelButton.setVisible(cancellable)
+        
+        return
+    
+    @QtCore.pyqtSlot(object)
+    def set_status(self, status):
+        
+        """Show the status of an ExecutionProgress object"""
+        
+        self._status = status
+        
+        if status["total"]:
+            self.progressBar.setRange(0, status["total"])
+            self.progressBar.setValue(status["completed"])
+        
+        self._update_details()
+        
+        if not self._timer.isActive(): self._timer.start()
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _request_cancel(self):
+        
+        self.cancelButton.setText("Cancelling...")
+        self.cancelButton.setEnabled(False)
+        self.cancel_requested.emit()
+        
+        return
+    
+    @QtCore.pyqtSlot()
+    def _update_details(self):
+        
+        if self._status is None: return
+        
+        self.detailsLabel.setText(get_status_text(self._status))
+        
         return
         
     def closeEvent(self, event):
         
         if self.allow_close:
+            self._timer.stop()
             event.accept() 
         else:
             self.force_quit.emit()
@@ -24,8 +24,13 @@ Created on Thu Apr 23 12:51:14 2015
 from __future__ import unicode_literals
 
 import os
+import logging
+from collections import OrderedDict
 
+import sip
+import numpy as np
 from PyQt4 import QtGui, QtCore
+from matplotlib._pylab_helpers import Gcf
 from matplotlib.backends.backend_qt4agg import (
                                         FigureCanvasQTAgg as FigureCanvas)
 import matplotlib.pyplot as plt
@@ -33,6 +38,15 @@ import matplotlib.pyplot as plt
 plt.style.use('ggplot')
 plt.rcParams['svg.fonttype'] = 'none'
 
+# Set up logging
+module_logger = logging.getLogger(__name__)
+
+# Number of points above which interactive plots are decimated
+MAX_PLOT_POINTS = 20000
+
+# Number of figures which may be open at once
+MAX_FIGURES = 3
+
 module_path = os.path.realpath(__file__)
 test_image_path = os.path.join(module_path, '..', 'test_images')
 
@@ -141,6 +155,8 @@ class MPLWidget(FigureCanvas):
                                    QtGui.QSizePolicy.Expanding)
         FigureCanvas.updateGeometry(self)
         
+        figure_pool.add(self)
+        
         return
     
     def closeEvent(self, event):
@@ -151,6 +167,144 @@ class MPLWidget(FigureCanvas):
         return
 
 
+class PlotPlaceholder(QtGui.QLabel):
+    
+    """Shown in place of a plot while its figure is being made"""
+    
+    def __init__(self, parent=None, text="Plotting..."):
+        
+        super(PlotPlaceholder, self).__init__(text, parent)
+        self.setAlignment(QtCore.Qt.AlignCenter)
+        self.setSizePolicy(QtGui.QSizePolicy.Expanding,
+                           QtGui.QSizePolicy.Expanding)
+        
+        return
+
+
+class FigurePool(object):
+    
+    """Tracks the figures displayed by MPLWidgets, so that each figure is
+    closed when its widget is released or destroyed, and figures which are
+    left open by pyplot, but are not displayed, can be collected.
+    
+    Args:
+        max_figures (int, optional): number of figures which may be open
+            once undisplayed figures are collected
+    
+    """
+    
+    def __init__(self, max_figures=MAX_FIGURES):
+        
+        self.max_figures = max_figures
+        self.opened = 0
+        self.closed = 0
+        self.collected = 0
+        self.peak = 0
+        
+        self._widgets = OrderedDict()
+        
+        return
+    
+    def __len__(self):
+        return len(self._widgets)
+    
+    def add(self, widget):
+        
+        """Track the figure of the given widget, closing it when the widget
+        is destroyed"""
+        
+        key = id(widget.figure)
+        if key in self._widgets: return
+        
+        self._widgets[key] = widget
+        self.opened += 1
+        self.peak = max(self.peak, len(self._widgets))
+        
+        # The key is captured, rather than the widget, to avoid a reference
+        # cycle
+        widget.destroyed.connect(lambda *args: self._discard(key))
+        
+        return
+    
+    def release(self, widget):
+        
+        """Close the figure of the given widget and delete the widget"""
+        
+        self._discard(id(widget.figure))
+        sip.delete(widget)
+        
+        return
+    
+    def collect(self):
+        
+        """Close any figures open in pyplot which are not displayed by a
+        tracked widget"""
+        
+        displayed = [widget.figure for widget in self._widgets.values()]
+        
+        for manager in Gcf.get_all_fig_managers():
+            
+            figure = manager.canvas.figure
+            if any([figure is x for x in displayed]): continue
+            
+            log_msg = "Collecting undisplayed figure {}".format(manager.num)
+            module_logger.debug(log_msg)
+            
+            plt.close(figure)
+            self.collected += 1
+        
+        return
+    
+    def check(self):
+        
+        """Collect undisplayed figures and raise an error if too many
+        figures are still open"""
+        
+        self.collect()
+        
+        log_msg = ("Figures open: {open}, opened: {opened}, closed: "
+                   "{closed}, collected: {collected}, "
+                   "peak: {peak}").format(**self.get_counters())
+        module_logger.debug(log_msg)
+        
+        if len(plt.get_fignums()) <= self.max_figures: return
+        
+        num_strs = ["{}".format(x) for x in plt.get_fignums()]
+        num_str = ", ".join(num_strs)
+        err_msg = ("Too many matplotlib figures detected. "
+                   "Numbers: {}").format(num_str)
+        
+        raise RuntimeError(err_msg)
+    
+    def get_counters(self):
+        
+        counters = {"open": len(self._widgets),
+                    "opened": self.opened,
+                    "closed": self.closed,
+                    "collected": self.collected,
+                    "peak": self.peak}
+        
+        return counters
+    
+    def _discard(self, key):
+        
+        if key not in self._widgets: return
+        
+        widget = self._widgets.pop(key)
+        
+        log_msg = "Closing figure ({} open)".format(len(self._widgets))
+        module_logger.debug(log_msg)
+        
+        plt.close(widget.figure)
+        self.closed += 1
+        
+        return
+
+
+# Figures displayed by the application
+figure_pool = FigurePool()
+
+
 def get_current_filetypes():
     
     if not plt.get_fignums(): return {}
@@ -180,3 +334,87 @@ def get_current_figure_size():
     size_inches = fig.get_size_inches()
     
     return size_inches
+
+
+def decimate_points(x, y, max_points=MAX_PLOT_POINTS):
+    
+    """Return the positions, in order, of a subset of the given points
+    for plotting, keeping the first point in each cell of a grid over their
+    extent. Isolated points and the outline of the data are preserved. Non
+    finite points are discarded. All positions are returned if there are no
+    more than max_points."""
+    
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    
+    if len(x) <= max_points: return np.arange(len(x))
+    
+    finite = np.isfinite(x) & np.isfinite(y)
+    positions = np.flatnonzero(finite)
+    
+    if not len(positions): return positions
+    
+    n_bins = max(int(np.sqrt(max_points)), 1)
+    
+    cells = (_get_bins(x[finite], n_bins) * n_bins +
+                                             _get_bins(y[finite], n_bins))
+    _, first = np.unique(cells, return_index=True)
+    
+    return positions[np.sort(first)]
+
+
+def decimate_figure(fig, max_points=MAX_PLOT_POINTS):
+    
+    """Decimate, in place, the scatter collections and marker only lines
+    of a figure which have more than max_points points"""
+    
+    for ax in fig.get_axes():
+        
+        for collection in ax.collections:
+            
+            offsets = np.asarray(collection.get_offsets())
+            n_points = len(offsets)
+            
+            if n_points <= max_points: continue
+            
+            keep = decimate_points(offsets[:, 0], offsets[:, 1], max_points)
+            collection.set_offsets(offsets[keep])
+            
+            # Per point properties must match the remaining points
+            array = collection.get_array()
+            if array is not None and len(array) == n_points:
+                collection.set_array(array[keep])
+            
+            facecolors = collection.get_facecolors()
+            if len(facecolors) == n_points:
+                collection.set_facecolors(facecolors[keep])
+            
+            sizes = collection.get_sizes()
+            if len(sizes) == n_points:
+                collection.set_sizes(sizes[keep])
+        
+        for line in ax.get_lines():
+            
+            if line.get_linestyle() not in ["None", " ", ""]: continue
+            
+            xdata = np.asarray(line.get_xdata())
+            ydata = np.asarray(line.get_ydata())
+            
+            if len(xdata) <= max_points: continue
+            
+            keep = decimate_points(xdata, ydata, max_points)
+            line.set_data(xdata[keep], ydata[keep])
+    
+    return
+
+
+def _get_bins(values, n_bins):
+    
+    vmin = values.min()
+    span = values.max() - vmin
+    
+    if span == 0: return np.zeros(len(values), dtype=int)
+    
+    bins = ((values - vmin) / span * n_bins).astype(int)
+    
+    return np.minimum(bins, n_bins - 1)
@@ -23,6 +23,7 @@ Created on Thu Apr 23 12:51:14 2015
 
 from PyQt4 import QtCore, QtGui
 
+from ..profiling import PROFILE_COLUMNS, get_profile_table
 from ..utils.display import is_high_dpi
 from ..utils.qtlog import XStream
 
@@ -30,6 +31,7 @@ if is_high_dpi():
 
     from ..designer.high.listdock import Ui_ListDock
     from ..designer.high.pipelinedock import Ui_PipeLineDock
+    from ..designer.high.profiledock import Ui_ProfileDock
     from ..designer.high.treedock import Ui_TreeDock
     from ..designer.high.systemdock import Ui_SystemDock
     
@@ -37,6 +39,7 @@ else:
     
     from ..designer.low.listdock import Ui_ListDock
     from ..designer.low.pipelinedock import Ui_PipeLineDock
+    from ..designer.low.profiledock import Ui_ProfileDock
     from ..designer.low.treedock import Ui_TreeDock
     from ..designer.low.systemdock import Ui_SystemDock
 
@@ -169,3 +172,58 @@ class LogDock(QtGui.QDockWidget, Ui_SystemDock):
         self._console.moveCursor(QtGui.QTextCursor.End)
         
         return
+
+
+class ProfileDock(QtGui.QDockWidget, Ui_ProfileDock):
+    
+    """Table of the execution profile of a project"""
+    
+    def __init__(self, parent=None):
+        
+        QtGui.QDockWidget.__init__(self, "Dockable", parent)
+        Ui_ProfileDock.__init__(self)
+        self.setupUi(self)
+        
+        self.profileTable.setColumnCount(len(PROFILE_COLUMNS))
+        self.profileTable.setHorizontalHeaderLabels(PROFILE_COLUMNS)
+        
+        self._showclose_filter = DockShowCloseFilter(self)
+        self.installEventFilter(self._showclose_filter)
+        
+        return
+    
+    def _update_profile(self, records=None):
+        
+        """Show the given stage records, or clear the table if None"""
+        
+        if records is None: records = []
+        
+        table = get_profile_table(records)
+        
+        # Sorting while filling would move rows under the cursor
+        self.profileTable.setSortingEnabled(False)
+        self.profileTable.clearContents()
+        self.profileTable.setRowCount(len(table))
+        
+        for i, row in enumerate(table.itertuples(index=False)):
+            
+            for j, value in enumerate(row):
+                
+                item = QtGui.QTableWidgetItem()
+                
+                if value is None or value != value:
+                    item.setText("")
+                elif isinstance(value, float):
+                    item.setData(QtCore.Qt.DisplayRole, round(value, 2))
+                else:
+                    item.setText(value)
+                
+                self.profileTable.setItem(i, j, item)
+        
+        self.profileTable.setSortingEnabled(True)
+        self.profileTable.resizeColumnsToContents()
+        
+        self.clearButton.setEnabled(bool(records))
+        self.exportButton.setEnabled(bool(records))
+        
+        return
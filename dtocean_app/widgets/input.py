@@ -38,6 +38,8 @@ except AttributeError:
         return s
 
 from .datatable import DataTableWidget
+from .tablemodel import get_unit_labels, relabel_view
+from .tableimport import read_table, read_table_text
 from ..utils.display import is_high_dpi
 
 from .scientificselect import Ui_ScientificSelect
@@ -710,6 +712,9 @@ class InputDataTable(QtGui.QWidget):
         self._fixed_index_col = fixed_index_col
         self._fixed_index_names = fixed_index_names
         self._edit_cols = edit_cols
+        self._dtypes = None
+        self.pasteAction = None
+        self.importAction = None
         
         self._setup_ui()
         self._init_ui()
@@ -761,9 +766,30 @@ class InputDataTable(QtGui.QWidget):
         self.buttonBox.button(QtGui.QDialogButtonBox.Cancel).clicked.connect(
                                                               self._emit_null)
         
+        # Rows can only be added in bulk if the index is not fixed
+        if (self._fixed_index_col is not None and
+            self._fixed_index_names is not None): return
+        
+        view = self.datatable.view()
+        
+        self.pasteAction = QtGui.QAction("Paste rows", view)
+        self.pasteAction.setShortcut(QtGui.QKeySequence.Paste)
+        self.pasteAction.setShortcutContext(
+                                    QtCore.Qt.WidgetWithChildrenShortcut)
+        self.pasteAction.triggered.connect(lambda: self._paste_rows())
+        
+        self.importAction = QtGui.QAction("Import rows from CSV...", view)
+        self.importAction.triggered.connect(lambda: self._import_rows())
+        
+        view.addAction(self.pasteAction)
+        view.addAction(self.importAction)
+        view.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
+        
         return
     
     def _set_value(self, value, dtypes=None):
+        
+        self._dtypes = dtypes
                 
         # setup a new model
         data = self._get_dataframe(value, dtypes)
@@ -784,22 +810,7 @@ class InputDataTable(QtGui.QWidget):
     
     def _get_dataframe(self, value, dtypes=None):
         
-        if self._units is None:
-            units = [None] * len(self._columms)
-        else:
-            units = self._units
-        
-        # Build new columns
-        new_cols = []
-        
-        for col, unit in zip(self._columms, units):
-            
-            if unit is not None:
-                new_col = "{} [{}]".format(col, unit)
-            else:
-                new_col = col
-                
-            new_cols.append(new_col)
+        new_cols = get_unit_labels(self._columms, self._units)
         
         if value is None:
             
@@ -826,8 +837,8 @@ class InputDataTable(QtGui.QWidget):
         
         else:
             
-            data = value
-            data.columns = new_cols
+            # Relabel without copying or modifying the stored value
+            data = relabel_view(value, new_cols)
             
             if (self._fixed_index_col is not None and
                 self._fixed_index_names is not None):
@@ -855,6 +866,54 @@ class InputDataTable(QtGui.QWidget):
         
         return df
     
+    def _paste_rows(self):
+        
+        "Append rows from delimited text in the clipboard"
+        
+        text = unicode(QtGui.qApp.clipboard().text())
+        labels = list(self.datatable.model().dataFrame().columns)
+        
+        data = read_table_text(text, labels, self._dtypes)
+        self._append_rows(data)
+        
+        return
+    
+    def _import_rows(self, file_path=None):
+        
+        "Append rows from a CSV file"
+        
+        if file_path is None:
+            
+            file_path = QtGui.QFileDialog.getOpenFileName(
+                                    self,
+                                    "Import rows",
+                                    "",
+                                    "CSV files (*.csv);;All files (*.*)")
+            
+            if not file_path: return
+        
+        labels = list(self.datatable.model().dataFrame().columns)
+        
+        data = read_table(unicode(file_path), labels, self._dtypes)
+        self._append_rows(data)
+        
+        return
+    
+    def _append_rows(self, data):
+        
+        if data.empty: return
+        
+        current = self.datatable.model().dataFrame()
+        
+        if not current.empty:
+            data = pd.concat([current, data], ignore_index=True)
+        
+        # Replace the model once, rather than inserting rows one at a time
+        model = DataFrameModel(data)
+        self.datatable.setViewModel(model)
+        
+        return
+    
     def _get_read_event(self):
         return self.buttonBox.button(QtGui.QDialogButtonBox.Ok).clicked
     
@@ -870,6 +929,9 @@ class InputDataTable(QtGui.QWidget):
         
         self.buttonBox.setDisabled(True)
         
+        if self.pasteAction is not None: self.pasteAction.setDisabled(True)
+        if self.importAction is not None: self.importAction.setDisabled(True)
+        
         self.datatable.view().setSelectionMode(
                                         QtGui.QAbstractItemView.NoSelection)
         self.datatable.view().setFocusPolicy(QtCore.Qt.NoFocus)
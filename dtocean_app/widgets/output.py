@@ -26,8 +26,6 @@ import re
 import pandas as pd
 from PyQt4 import QtCore, QtGui
 
-from dtocean_qt.models.DataFrameModel import DataFrameModel
-
 try:
     _fromUtf8 = QtCore.QString.fromUtf8
 except AttributeError:
@@ -35,6 +33,7 @@ except AttributeError:
         return s
 
 from .datatable import DataTableWidget
+from .tablemodel import VirtualDataFrameModel, get_unit_labels
 from ..utils.display import is_high_dpi
 
 if is_high_dpi():
@@ -100,6 +99,14 @@ class OutputDataTable(QtGui.QWidget):
         QtGui.QWidget.__init__(self, parent)
         self._columns = columns
         self._units = units
+        self._labels = get_unit_labels(columns, units)
+        self._legacy_labels = {}
+        
+        # Map labels with or without units to labels for legacy data
+        for label in self._labels:
+            clean_label = re.sub(r'\s\[[^)]*\]', '', label)
+            self._legacy_labels.setdefault(clean_label, label)
+            self._legacy_labels.setdefault(label, label)
         
         self._setup_ui()
         
@@ -128,25 +135,10 @@ class OutputDataTable(QtGui.QWidget):
     @QtCore.pyqtSlot(object)
     def _set_value(self, value):
 
-        if self._units is None:
-            units = [None] * len(self._columns)
-        else:
-            units = self._units
+        new_cols = self._labels
         
-        # Build new columns
-        new_cols = []        
-        
-        for col, unit in zip(self._columns, units):
-            
-            if unit is not None:
-                new_col = "{} [{}]".format(col, unit)
-            else:
-                new_col = col
-                
-            new_cols.append(new_col)
-                    
-        # setup a new empty model
-        model = DataFrameModel()
+        # setup a new empty model, which reads the data on demand
+        model = VirtualDataFrameModel()
         
         # set table view widget model
         self.datatable.setViewModel(model)
@@ -166,20 +158,9 @@ class OutputDataTable(QtGui.QWidget):
             safe_cols = new_cols
         
         elif len(value.columns) < len(new_cols):
-        
-            # Strip any units
-            clean_cols = [re.sub(r'\s\[[^)]*\]', '', x) for x in new_cols]
-            
-            safe_cols = []
             
-            for col in value.columns:
-                
-                match = [new_cols[clean_cols.index(x)]
-                                            for x in clean_cols if col == x]
-                
-                if len(match) == 0: continue
-                    
-                safe_cols.append(match[0])
+            safe_cols = [self._legacy_labels[col] for col in value.columns
+                                                if col in self._legacy_labels]
                 
         else:
             
@@ -188,11 +169,9 @@ class OutputDataTable(QtGui.QWidget):
                        "columns argument").format(extra_cols)
             raise ValueError(err_str)
 
-        data = value
-        data.columns = safe_cols
-        
-        # fill the model with data
-        model.setDataFrame(data)
+        # fill the model with data, labelling the columns without modifying
+        # the stored value
+        model.setDataFrame(value, safe_cols)
         
         return
 
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Bulk import of delimited text, such as pasted spreadsheet cells or CSV
+files, into input tables.
+
+The text is parsed in chunks of rows, as strings, and each column of a chunk
+is converted to its declared type in one operation. Values which can not be
+converted are collected for the whole column, so that an error lists every
+bad row at once.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import re
+import io
+
+import pandas as pd
+
+# Number of rows parsed at a time
+CHUNK_ROWS = 10000
+
+# Number of bad rows listed in error messages
+MAX_ERROR_ROWS = 10
+
+# Text values of booleans
+BOOL_VALUES = {"true": True,
+               "yes": True,
+               "1": True,
+               "false": False,
+               "no": False,
+               "0": False}
+
+
+def read_table_text(text, labels, dtypes=None, chunksize=CHUNK_ROWS):
+
+    """Read delimited text, such as the contents of the clipboard, into a
+    DataFrame. Tabs are used as the delimiter if found in the first line,
+    otherwise commas. A first row which matches the labels is treated as a
+    header.
+
+    Args:
+        text (str): the delimited text
+        labels (list): the labels of the columns, in order
+        dtypes (list, optional): the type of each column
+        chunksize (int, optional): number of rows parsed at a time
+
+    Returns:
+        pandas.DataFrame
+
+    """
+
+    text = unicode(text)
+    first_line = text.split("\n", 1)[0]
+
+    if "\t" in first_line:
+        sep = "\t"
+    else:
+        sep = ","
+
+    return read_table(io.StringIO(text), labels, dtypes, sep, chunksize)
+
+
+def read_table(source, labels, dtypes=None, sep=",", chunksize=CHUNK_ROWS):
+
+    """Read a delimited file, or buffer, into a DataFrame, in chunks of
+    rows, converting each column to its given type. Columns beyond the
+    number of labels are ignored and missing columns are left empty.
+
+    Args:
+        source (str or file): path to, or buffer of, the delimited text
+        labels (list): the labels of the columns, in order
+        dtypes (list, optional): the type of each column
+        sep (str, optional): the delimiter
+        chunksize (int, optional): number of rows parsed at a time
+
+    Returns:
+        pandas.DataFrame
+
+    Raises:
+        ValueError: if any values can not be converted to their column type
+
+    """
+
+    if dtypes is None: dtypes = [None] * len(labels)
+
+    try:
+        reader = pd.read_csv(source,
+                             sep=sep,
+                             header=None,
+                             names=labels,
+                             index_col=False,
+                             dtype=unicode,
+                             skip_blank_lines=True,
+                             chunksize=chunksize)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=labels)
+
+    chunks = []
+    errors = []
+
+    for i, chunk in enumerate(reader):
+
+        if i == 0 and len(chunk) and _is_header(chunk.iloc[0], labels):
+            chunk = chunk.iloc[1:].copy()
+
+        for label, dtype in zip(labels, dtypes):
+
+            values, bad_rows = coerce_column(chunk[label], dtype)
+            chunk[label] = values
+
+            if len(bad_rows): errors.append((label, dtype, bad_rows))
+
+        chunks.append(chunk)
+
+    if errors:
+        raise ValueError(_get_error_message(errors))
+
+    if not chunks: return pd.DataFrame(columns=labels)
+
+    data = pd.concat(chunks, ignore_index=True)
+
+    return data
+
+
+def coerce_column(values, dtype):
+
+    """Convert a series of strings to the given type.
+
+    Returns:
+        tuple: the converted series and the index labels of the values
+            which could not be converted
+
+    """
+
+    type_name = _get_type_name(dtype)
+
+    if type_name in ["float", "int"]:
+
+        coerced = pd.to_numeric(values, errors="coerce")
+        bad = coerced.isnull() & values.notnull()
+
+        if type_name == "float":
+
+            coerced = coerced.astype(float)
+
+        else:
+
+            bad |= coerced.isnull()
+            bad |= coerced.notnull() & (coerced % 1 != 0)
+
+            if not bad.any(): coerced = coerced.astype(int)
+
+    elif type_name == "bool":
+
+        coerced = values.str.strip().str.lower().map(BOOL_VALUES)
+        bad = coerced.isnull()
+
+        if not bad.any(): coerced = coerced.astype(bool)
+
+    elif type_name in ["datetime", "timestamp"]:
+
+        coerced = pd.to_datetime(values, errors="coerce")
+        bad = coerced.isnull() & values.notnull()
+
+    else:
+
+        coerced = values.where(values.notnull(), None)
+        bad = pd.Series(False, index=values.index)
+
+    return coerced, values.index[bad.values]
+
+
+def _get_type_name(dtype):
+
+    if dtype is None: return None
+
+    if isinstance(dtype, basestring):
+        type_name = dtype
+    else:
+        type_name = getattr(dtype, "__name__", str(dtype))
+
+    type_name = type_name.split(".")[-1].lower()
+
+    if re.match(r"float\d*$", type_name): return "float"
+    if re.match(r"u?int\d*$", type_name): return "int"
+    if type_name.startswith("datetime64"): return "datetime"
+
+    return type_name
+
+
+def _is_header(row, labels):
+
+    clean_labels = [re.sub(r'\s\[[^)]*\]', '', label).strip().lower()
+                                                        for label in labels]
+
+    for value, label, clean_label in zip(row, labels, clean_labels):
+
+        if pd.isnull(value): return False
+
+        value = value.strip().lower()
+
+        if value != label.lower() and value != clean_label: return False
+
+    return True
+
+
+def _get_error_message(errors):
+
+    lines = ["Some values could not be converted to the column type:"]
+
+    for label, dtype, bad_rows in errors:
+
+        rows = ", ".join([str(row + 1) for row in bad_rows[:MAX_ERROR_ROWS]])
+        if len(bad_rows) > MAX_ERROR_ROWS: rows += ", ..."
+
+        line = "  '{}' ({}): {} bad value(s) in rows {}".format(
+                                                    label,
+                                                    _get_type_name(dtype),
+                                                    len(bad_rows),
+                                                    rows)
+        lines.append(line)
+
+    return "\n".join(lines)
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Read-only table model for displaying large pandas DataFrames.
+
+Cells are read from the arrays underlying the columns of the DataFrame only
+when the view asks for them, and formatted using a function chosen once per
+column from its dtype. Rows are made available to the view in chunks, as it
+scrolls, and sorting reorders an array of row positions rather than the
+data. The column headers can be labelled independently of the DataFrame, so
+stored data can be displayed with units without being modified.
+
+.. moduleauthor:: Mathew Topper <mathew.topper@dataonlygreater.com>
+"""
+
+import numpy as np
+import pandas as pd
+from PyQt4 import QtCore
+
+# Number of rows made available to the view at a time
+FETCH_ROWS = 10000
+
+# Significant figures displayed for each float dtype
+FLOAT_PRECISIONS = {"float16": 4,
+                    "float32": 7,
+                    "float64": 15}
+
+
+class VirtualDataFrameModel(QtCore.QAbstractTableModel):
+
+    """Read-only model of a pandas DataFrame which does not copy the data.
+
+    Args:
+        dataFrame (pandas.DataFrame, optional): the data to display
+        fetch_rows (int, optional): number of rows made available to the
+            view at a time
+
+    """
+
+    # Signals expected by DataTableWidget
+    dtypeChanged = QtCore.pyqtSignal(int, object)
+    dataFrameChanged = QtCore.pyqtSignal()
+
+    def __init__(self, dataFrame=None, fetch_rows=FETCH_ROWS, parent=None):
+
+        super(VirtualDataFrameModel, self).__init__(parent)
+
+        self._fetch_rows = fetch_rows
+        self._dataFrame = None
+        self._column_labels = []
+        self._columns = []
+        self._formatters = []
+        self._index = None
+        self._order = None
+        self._n_rows = 0
+        self._n_loaded = 0
+
+        if dataFrame is None: dataFrame = pd.DataFrame()
+        self.setDataFrame(dataFrame)
+
+        return
+
+    def dataFrame(self):
+
+        return self._dataFrame
+
+    def setDataFrame(self, dataFrame, column_labels=None):
+
+        """Display a DataFrame, optionally with the given column labels in
+        place of its column names"""
+
+        if (column_labels is not None and
+            len(column_labels) != dataFrame.shape[1]):
+
+            errStr = ("Number of column labels ({}) does not match the "
+                      "number of columns ({})").format(len(column_labels),
+                                                       dataFrame.shape[1])
+            raise ValueError(errStr)
+
+        if column_labels is None: column_labels = dataFrame.columns
+
+        self.beginResetModel()
+
+        self._dataFrame = dataFrame
+        self._column_labels = list(column_labels)
+        self._columns = [dataFrame.iloc[:, i].values
+                                        for i in xrange(dataFrame.shape[1])]
+        self._formatters = [_get_formatter(column.dtype)
+                                                for column in self._columns]
+        self._index = dataFrame.index
+        self._order = None
+        self._n_rows = len(dataFrame)
+        self._n_loaded = min(self._n_rows, self._fetch_rows)
+
+        self.endResetModel()
+        self.dataFrameChanged.emit()
+
+        # Allows views to update their delegates and column widths
+        if self._n_loaded and self._columns:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(self._n_loaded - 1,
+                                             len(self._columns) - 1))
+
+        return
+
+    def enableEditing(self, editable):
+
+        # The data can not be edited
+        return
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+
+        if parent.isValid(): return 0
+
+        return self._n_loaded
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+
+        if parent.isValid(): return 0
+
+        return len(self._columns)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+
+        if parent.isValid(): return False
+
+        return self._n_loaded < self._n_rows
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+
+        if parent.isValid(): return
+
+        n_fetch = min(self._fetch_rows, self._n_rows - self._n_loaded)
+        if n_fetch <= 0: return
+
+        self.beginInsertRows(QtCore.QModelIndex(),
+                             self._n_loaded,
+                             self._n_loaded + n_fetch - 1)
+        self._n_loaded += n_fetch
+        self.endInsertRows()
+
+        return
+
+    def flags(self, index):
+
+        if not index.isValid(): return QtCore.Qt.NoItemFlags
+
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+
+        if (not index.isValid() or
+            role not in [QtCore.Qt.DisplayRole, QtCore.Qt.EditRole]):
+            return QtCore.QVariant()
+
+        row = self._get_data_row(index.row())
+        column = index.column()
+        value = self._formatters[column](self._columns[column][row])
+
+        return QtCore.QVariant(value)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+
+        if role != QtCore.Qt.DisplayRole: return QtCore.QVariant()
+
+        if orientation == QtCore.Qt.Horizontal:
+            label = self._column_labels[section]
+        else:
+            label = self._index[self._get_data_row(section)]
+
+        return QtCore.QVariant(unicode(label))
+
+    def dataFrameRows(self, rows):
+
+        """Return the positions in the DataFrame of the given rows of the
+        model, as sorted"""
+
+        rows = np.asarray(rows, dtype=int)
+
+        if self._order is None: return rows
+
+        return self._order[rows]
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+
+        self.layoutAboutToBeChanged.emit()
+
+        data_order = np.argsort(self._columns[column], kind="mergesort")
+        if order == QtCore.Qt.DescendingOrder: data_order = data_order[::-1]
+
+        self._order = data_order
+
+        self.layoutChanged.emit()
+
+        return
+
+    def _get_data_row(self, row):
+
+        if self._order is None: return row
+
+        return self._order[row]
+
+
+def get_unit_labels(columns, units=None):
+
+    """Return the column names labelled with their units, if given, in the
+    form "name [unit]".
+    """
+
+    if units is None: units = [None] * len(columns)
+
+    labels = []
+
+    for column, unit in zip(columns, units):
+
+        if unit is not None:
+            label = "{} [{}]".format(column, unit)
+        else:
+            label = column
+
+        labels.append(label)
+
+    return labels
+
+
+def relabel_view(data, labels):
+
+    """Return a DataFrame with the given column labels which shares the
+    values of the given DataFrame, rather than copying them or modifying
+    its columns"""
+
+    view = data.copy(deep=False)
+    view.columns = labels
+
+    return view
+
+
+def _get_formatter(dtype):
+
+    if dtype.kind == "f":
+
+        precision = FLOAT_PRECISIONS.get(dtype.name, 15)
+
+        def format_float(value):
+            if np.isnan(value): return ""
+            return "{:.{}g}".format(value, precision)
+
+        return format_float
+
+    if dtype.kind in ["i", "u"]:
+        return lambda value: "{:d}".format(value)
+
+    if dtype.kind == "M":
+
+        def format_datetime(value):
+            if pd.isnull(value): return ""
+            return unicode(pd.Timestamp(value))
+
+        return format_datetime
+
+    def format_object(value):
+        if value is None: return ""
+        return unicode(value)
+
+    return format_object
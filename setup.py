@@ -247,6 +247,7 @@ setup(name='dtocean-app',
           'console_scripts':
           [
            'dtocean-app = dtocean_app:gui_interface',
+           'dtocean-app-batch = dtocean_app.batch:batch_interface',
            'dtocean-app-config = dtocean_app.utils.config:init_config_interface'
            ]},
       package_data={'': ['*.png', 'test_images/*.png'],
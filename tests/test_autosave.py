@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name
+
+import os
+
+import pytest
+
+from dtocean_app.autosave import (AUTOSAVE_NAME,
+                                  AutosaveJournal,
+                                  read_snapshot_info)
+from dtocean_app.storage import FORMAT_VERSION, MANIFEST_NAME
+from dtocean_app.utils.archive import ArchiveWriter
+
+
+def write_snapshot(journal, title):
+
+    snapshot_path = journal.get_new_path()
+
+    with ArchiveWriter(snapshot_path) as archive:
+        archive.write_json(MANIFEST_NAME, {"format": FORMAT_VERSION,
+                                           "simulations": [],
+                                           "pools": []})
+        archive.write_json(AUTOSAVE_NAME, {"project_path": None,
+                                           "title": title})
+
+    return snapshot_path
+
+
+@pytest.fixture
+def journal(tmpdir):
+    return AutosaveJournal(str(tmpdir.join("autosave")), 2)
+
+
+def test_journal_bad_size(tmpdir):
+
+    with pytest.raises(ValueError):
+        AutosaveJournal(str(tmpdir), 0)
+
+
+def test_journal_empty(journal):
+
+    assert journal.get_snapshots() == []
+    assert journal.find_recoverable() is None
+
+
+def test_journal_order(journal):
+
+    first = write_snapshot(journal, "First")
+    second = write_snapshot(journal, "Second")
+
+    assert journal.get_snapshots() == [second, first]
+
+
+def test_journal_find_recoverable(journal):
+
+    write_snapshot(journal, "First")
+
+    # An unreadable snapshot is skipped
+    with open(journal.get_new_path(), "wb") as bad_file:
+        bad_file.write("Not an archive")
+
+    snapshot_path, info = journal.find_recoverable()
+
+    assert read_snapshot_info(snapshot_path) == info
+    assert info["title"] == "First"
+
+
+def test_journal_prune(journal):
+
+    first = write_snapshot(journal, "First")
+    write_snapshot(journal, "Second")
+    write_snapshot(journal, "Third")
+
+    part_path = os.path.join(journal.path, ".autosave-test.dto.1.part")
+    open(part_path, "wb").close()
+
+    journal.prune()
+
+    snapshot_paths = journal.get_snapshots()
+
+    assert len(snapshot_paths) == 2
+    assert first not in snapshot_paths
+    assert not os.path.isfile(part_path)
+
+
+def test_journal_clear_keep(journal):
+
+    first = write_snapshot(journal, "First")
+    write_snapshot(journal, "Second")
+
+    journal.clear(keep=first)
+
+    assert journal.get_snapshots() == [first]
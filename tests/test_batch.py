@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name,protected-access
+
+import pytest
+
+from dtocean_core.menu import ProjectMenu
+from dtocean_core.pipeline import Tree
+from dtocean_app.batch import (batch_interface,
+                               batch_parser,
+                               get_core,
+                               run_batch,
+                               run_project)
+from dtocean_app.storage import read_project_file, write_project_file
+
+
+@pytest.fixture(scope="module")
+def core():
+    return get_core()
+
+
+@pytest.fixture
+def dto_path(tmpdir, core):
+
+    project_menu = ProjectMenu()
+    var_tree = Tree()
+
+    project = core.new_project("Batch")
+
+    options_branch = var_tree.get_branch(core,
+                                         project,
+                                         "System Type Selection")
+    device_type = options_branch.get_input_variable(core,
+                                                    project,
+                                                    "device.system_type")
+    device_type.set_raw_interface(core, "Tidal Fixed")
+    device_type.read(core, project)
+
+    project_menu.initiate_pipeline(core, project)
+
+    dto_path = str(tmpdir.join("batch.dto"))
+    write_project_file(core, dto_path, project, "global", {}, None)
+
+    return dto_path
+
+
+def test_batch_parser():
+
+    path, out, mode, debug = batch_parser(["test.dto",
+                                           "-o",
+                                           "out.dto",
+                                           "--mode",
+                                           "themes"])
+
+    assert path == "test.dto"
+    assert out == "out.dto"
+    assert mode == "themes"
+    assert not debug
+
+
+def test_run_project_bad_mode(core):
+
+    with pytest.raises(ValueError) as excinfo:
+        run_project(core, None, mode="bad")
+
+    assert "bad" in str(excinfo)
+
+
+def test_run_project_no_strategy(core, dto_path):
+
+    project = read_project_file(core, dto_path)["project"]
+
+    with pytest.raises(ValueError):
+        run_project(core, project, mode="strategy")
+
+
+def test_run_batch(tmpdir, core, dto_path):
+
+    out_path = str(tmpdir.join("out.dto"))
+    run_batch(dto_path, out_path, "themes")
+
+    project_file = read_project_file(core, out_path)
+
+    assert project_file["project"].title == "Batch"
+    assert project_file["project_path"] == out_path
+    assert project_file["scope"] == "global"
+
+
+def test_batch_interface_error(mocker, tmpdir):
+
+    bad_path = str(tmpdir.join("bad.txt"))
+    mocker.patch("dtocean_app.batch.sys.argv", ["dtocean-app-batch",
+                                                bad_path])
+
+    with pytest.raises(SystemExit) as excinfo:
+        batch_interface()
+
+    assert excinfo.value.code == 1
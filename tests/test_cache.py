@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import pandas as pd
+from PyQt4 import QtGui
+
+from dtocean_qt.models.DataFrameModel import DataFrameModel
+
+from dtocean_app.cache import (WIDGET_OVERHEAD,
+                               ValuesCache,
+                               WidgetCache,
+                               get_values_key,
+                               get_widget_size)
+from dtocean_app.widgets.datatable import DataTableWidget
+
+
+def test_get_widget_size(qtbot):
+
+    data = pd.DataFrame({"a": range(1000)})
+
+    model = DataFrameModel()
+    model.setDataFrame(data)
+
+    widget = QtGui.QWidget()
+    table = DataTableWidget(widget)
+    table.setViewModel(model)
+    qtbot.addWidget(widget)
+
+    size = get_widget_size(widget)
+
+    assert size == WIDGET_OVERHEAD + data.memory_usage(index=True).sum()
+
+
+def test_WidgetCache_get(qtbot):
+
+    widget = QtGui.QWidget()
+    qtbot.addWidget(widget)
+
+    cache = WidgetCache(10, get_size=lambda widget: 1)
+
+    assert cache.get("a") is None
+
+    cache.put("a", widget)
+
+    assert cache.get("a") is widget
+    assert cache.has_widget(widget)
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_WidgetCache_put_lru(qtbot):
+
+    widgets = [QtGui.QWidget() for _ in range(3)]
+    cache = WidgetCache(2, get_size=lambda widget: 1)
+
+    cache.put("a", widgets[0])
+    cache.put("b", widgets[1])
+    cache.get("a")
+    cache.put("c", widgets[2])
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.size == 2
+
+
+def test_WidgetCache_put_too_large(qtbot):
+
+    widget = QtGui.QWidget()
+    cache = WidgetCache(2, get_size=lambda widget: 3)
+
+    assert not cache.put("a", widget)
+    assert len(cache) == 0
+
+
+def test_WidgetCache_discard(qtbot):
+
+    widgets = [QtGui.QWidget() for _ in range(3)]
+    cache = WidgetCache(10, get_size=lambda widget: 1)
+
+    for i, widget in enumerate(widgets):
+        cache.put(("var", i), widget)
+
+    cache.discard(lambda key: key[1] != 2)
+
+    assert len(cache) == 1
+    assert cache.size == 1
+    assert ("var", 2) in cache
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_ValuesCache():
+
+    cache = ValuesCache()
+    values = {"sim": [1, 2]}
+    key = get_values_key("level", "var", ["sim"], scope="global")
+
+    assert cache.get(key) is None
+
+    cache.put(key, values)
+    values["sim"].append(3)
+
+    result = cache.get(key)
+    result["sim"].append(4)
+
+    assert cache.get(key) == {"sim": [1, 2]}
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_get_values_key():
+
+    key_one = get_values_key("level", "var", ["a", "b"], scope="local")
+    key_two = get_values_key("level", "var", ["a", "b"], scope="local")
+    key_three = get_values_key("level", "var", ["a", "b"], scope="global")
+
+    assert key_one == key_two
+    assert hash(key_one) == hash(key_two)
+    assert key_one != key_three
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name,protected-access
+
+import pytest
+
+from dtocean_app.core import GUICore
+
+
+class MockProject(object):
+
+    def __init__(self):
+        self.simulation = object()
+
+    def get_simulation(self):
+        return self.simulation
+
+
+class MockBranch(object):
+
+    def __init__(self):
+        self.n_input_calls = 0
+        self.n_output_calls = 0
+
+    def get_input_status(self, core, project):
+        self.n_input_calls += 1
+        return {"a": "required"}
+
+    def get_output_status(self, core, project):
+        self.n_output_calls += 1
+        return {"b": "unavailable"}
+
+
+@pytest.fixture(scope="module")
+def core():
+    return GUICore()
+
+
+def test_GUICore_get_branch_status_shared(core):
+
+    project = MockProject()
+    branch = MockBranch()
+
+    core.clear_status_cache()
+
+    for _ in range(3):
+        assert core.get_branch_status(project, branch) == {"a": "required"}
+        assert core.get_branch_status(project,
+                                      branch,
+                                      outputs=True) == {"b": "unavailable"}
+
+    assert branch.n_input_calls == 1
+    assert branch.n_output_calls == 1
+
+
+def test_GUICore_get_branch_status_copy(core):
+
+    project = MockProject()
+    branch = MockBranch()
+
+    core.clear_status_cache()
+
+    status = core.get_branch_status(project, branch)
+    status["a"] = "satisfied"
+
+    assert core.get_branch_status(project, branch) == {"a": "required"}
+
+
+def test_GUICore_get_branch_status_invalidated(core):
+
+    project = MockProject()
+    branch = MockBranch()
+
+    core.clear_status_cache()
+    core.get_branch_status(project, branch)
+
+    # Changing the active simulation
+    project.simulation = object()
+    core.get_branch_status(project, branch)
+
+    assert branch.n_input_calls == 2
+
+    # Changing the interface status
+    core._status_version += 1
+    core.get_branch_status(project, branch)
+
+    assert branch.n_input_calls == 3
+
+    # Clearing the cache
+    core.clear_status_cache()
+    core.get_branch_status(project, branch)
+
+    assert branch.n_input_calls == 4
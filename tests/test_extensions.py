@@ -403,3 +403,47 @@ def test_GUIStrategyManager_configure_strategy_unavailable(mocker,
     window._configure_strategy()
     
     assert str(window.topDynamicLabel.text()) == "Mock Strategy (unavailable)"
+
+
+def test_GUIStrategyManager_get_level_values_cached(mocker,
+                                                    qtbot,
+                                                    mock_shell):
+    
+    from dtocean_core.extensions import StrategyManager
+    
+    level_values = {"Default": {"start": 1.}}
+    mock_get = mocker.patch.object(StrategyManager,
+                                   'get_level_values',
+                                   return_value=level_values,
+                                   autospec=True)
+    
+    window = GUIStrategyManager(mock_shell)
+    qtbot.addWidget(window)
+    
+    first = window.get_level_values(mock_shell.core,
+                                    mock_shell.project,
+                                    "mock.var",
+                                    None,
+                                    ["Default"],
+                                    "global")
+    second = window.get_level_values(mock_shell.core,
+                                     mock_shell.project,
+                                     "mock.var",
+                                     None,
+                                     ["Default"],
+                                     "global")
+    
+    assert first == second == level_values
+    assert first is not second
+    assert mock_get.call_count == 1
+    
+    mock_shell.core.status_updated.emit()
+    
+    window.get_level_values(mock_shell.core,
+                            mock_shell.project,
+                            "mock.var",
+                            None,
+                            ["Default"],
+                            "global")
+    
+    assert mock_get.call_count == 2
@@ -24,6 +24,10 @@ import warnings
 from polite.paths import Directory
 from dtocean_app import (warn_with_traceback,
                          start_logging,
+                         get_save_options,
+                         get_autosave_dir,
+                         get_autosave_options,
+                         get_cache_options,
                          main_,
                          gui_interface)
 from dtocean_app.utils.config import init_config
@@ -111,6 +115,97 @@ def test_start_logging_user(mocker, tmpdir):
     assert len(logdir.listdir()) == 1
 
 
+def test_get_save_options():
+    
+    save_options = get_save_options()
+    
+    assert save_options == {"compression": "gzip",
+                            "level": 6,
+                            "incremental": True}
+
+
+def test_get_save_options_user(mocker, tmpdir):
+    
+    # Make a user files.ini without a save section
+    config_tmpdir = tmpdir.mkdir("config")
+    config_tmpdir.join("files.ini").write("[logs]\npath=logs\n")
+    mock_dir = Directory(str(config_tmpdir))
+    
+    mocker.patch('dtocean_app.UserDataDirectory',
+                 return_value=mock_dir)
+    
+    save_options = get_save_options()
+    
+    assert save_options == {"compression": "gzip",
+                            "level": 6,
+                            "incremental": True}
+
+
+def test_get_save_options_not_incremental(mocker, tmpdir):
+    
+    config_tmpdir = tmpdir.mkdir("config")
+    config_tmpdir.join("files.ini").write("[logs]\npath=logs\n"
+                                          "[save]\nincremental=False\n")
+    mock_dir = Directory(str(config_tmpdir))
+    
+    mocker.patch('dtocean_app.UserDataDirectory',
+                 return_value=mock_dir)
+    
+    save_options = get_save_options()
+    
+    assert save_options["compression"] == "gzip"
+    assert not save_options["incremental"]
+
+
+def test_get_autosave_options():
+    
+    autosave_options = get_autosave_options()
+    
+    assert autosave_options == {"enabled": True,
+                                "interval": 10,
+                                "snapshots": 3}
+
+
+def test_get_cache_options():
+    
+    cache_options = get_cache_options()
+    
+    assert cache_options == {"widget_memory": 256}
+
+
+def test_get_cache_options_user(mocker, tmpdir):
+    
+    config_tmpdir = tmpdir.mkdir("config")
+    config_tmpdir.join("files.ini").write("[logs]\npath=logs\n"
+                                          "[cache]\nwidget_memory=0\n")
+    mock_dir = Directory(str(config_tmpdir))
+    
+    mocker.patch('dtocean_app.UserDataDirectory',
+                 return_value=mock_dir)
+    
+    cache_options = get_cache_options()
+    
+    assert cache_options == {"widget_memory": 0}
+
+
+def test_get_autosave_dir_user(mocker, tmpdir):
+    
+    # Make a user files.ini without an autosave section
+    config_tmpdir = tmpdir.mkdir("config")
+    config_tmpdir.join("files.ini").write("[logs]\npath=logs\n")
+    mock_dir = Directory(str(config_tmpdir))
+    
+    mocker.patch('dtocean_app.UserDataDirectory',
+                 return_value=mock_dir)
+    
+    autosave_dir = get_autosave_dir()
+    autosave_options = get_autosave_options()
+    
+    assert os.path.normpath(autosave_dir.get_path()) == \
+                                        str(tmpdir.join("autosave"))
+    assert autosave_options["enabled"]
+
+
 def test_main(mocker, qtbot):
     
     # The qtbot fixture must be requested along with mocking QApplication and
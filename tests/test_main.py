@@ -29,13 +29,19 @@ from PyQt4 import QtCore, QtGui
 from polite.paths import Directory
 from dtocean_core.interfaces import ModuleInterface, ThemeInterface
 from dtocean_core.tools import Tool
+from dtocean_app.autosave import AutosaveJournal
 from dtocean_app.core import GUICore
-from dtocean_app.main import DTOceanWindow, Shell
+from dtocean_app.main import (DTOceanWindow,
+                              Shell,
+                              ThreadCurrent,
+                              ThreadStrategy)
+from dtocean_app.progress import CancelToken, ExecutionCancelled
+from dtocean_app.plotting import PLOT_NONE
 from dtocean_app.pipeline import (InputBranchControl,
                                   InputVarControl,
                                   SectionControl)
 from dtocean_app.tools import GUITool
-from dtocean_app.widgets.display import MPLWidget
+from dtocean_app.widgets.display import MPLWidget, PlotPlaceholder
 from dtocean_app.widgets.input import FloatSelect, ListSelect
 
 
@@ -1328,6 +1334,17 @@ def test_plot_context_clear(qtbot, window_plot_context):
     assert window_plot_context._plot_context._bottom_contents is None
 
 
+def test_plot_context_no_plot(mocker, window_plot_context):
+    
+    window_plot_context._plot_request = (-1, mocker.Mock(), None)
+    window_plot_context._show_plot(-1, PLOT_NONE, None)
+    
+    bottom_contents = window_plot_context._plot_context._bottom_contents
+    
+    assert isinstance(bottom_contents, PlotPlaceholder)
+    assert bottom_contents.text() == "No plot available"
+
+
 @pytest.fixture
 def window_dataflow_theme(qtbot, window_with_pipeline):
     
@@ -1645,6 +1662,143 @@ def test_project_save(qtbot, mocker, tmp_path, window_dataflow_module, ext):
     assert dto_file.is_file()
 
 
+@pytest.mark.parametrize("ext", ["dto", "prj"])
+def test_project_save_open(qtbot,
+                           mocker,
+                           tmp_path,
+                           window_dataflow_module,
+                           ext):
+    
+    dto_file = tmp_path / "test.{}".format(ext)
+    mocker.patch.object(QtGui.QFileDialog,
+                        'getSaveFileName',
+                        return_value=str(dto_file))
+    
+    shell = window_dataflow_module._shell
+    title = shell.project.title
+    
+    # Save the simulation
+    save_button = window_dataflow_module.fileToolBar.widgetForAction(
+                                            window_dataflow_module.actionSave)
+    qtbot.mouseClick(save_button, QtCore.Qt.LeftButton)
+    
+    def dto_file_saved():
+        assert dto_file.is_file()
+        assert shell._active_thread is None
+    
+    qtbot.waitUntil(dto_file_saved)
+    
+    # No partial files should be left behind
+    assert list(tmp_path.iterdir()) == [dto_file]
+    
+    shell.close_project()
+    shell.open_project(str(dto_file))
+    
+    def project_opened():
+        assert shell._active_thread is None
+        assert shell.project is not None
+    
+    qtbot.waitUntil(project_opened)
+    
+    assert shell.project.title == title
+    assert shell.project_path == str(dto_file)
+
+
+def test_project_autosave_recover(qtbot,
+                                  mocker,
+                                  tmp_path,
+                                  window_dataflow_module):
+    
+    autosave_dir = tmp_path / "autosave"
+    journal = AutosaveJournal(str(autosave_dir))
+    
+    shell = window_dataflow_module._shell
+    title = shell.project.title
+    
+    shell.start_autosave(journal, 10)
+    shell.autosave_project()
+    
+    def snapshot_saved():
+        assert shell._autosave_thread is None
+        assert len(journal.get_snapshots()) == 1
+    
+    qtbot.waitUntil(snapshot_saved)
+    
+    # Simulate a crash by leaving the journal in place
+    shell.stop_autosave()
+    shell.project = None
+    
+    mocker.patch("dtocean_app.main.get_autosave_dir",
+                 return_value=Directory(str(autosave_dir)))
+    mocker.patch.object(QtGui.QMessageBox,
+                        'question',
+                        return_value=QtGui.QMessageBox.Yes)
+    
+    window_dataflow_module.start_autosave()
+    
+    def project_recovered():
+        assert shell._active_thread is None
+        assert shell.project is not None
+    
+    qtbot.waitUntil(project_recovered)
+    
+    assert shell.project.title == title
+    assert shell.project_path is None
+    assert shell.project_unsaved
+    
+    shell.stop_autosave()
+
+
+def test_project_autosave_wait(tmp_path, window_dataflow_module):
+    
+    journal = AutosaveJournal(str(tmp_path / "autosave"))
+    
+    shell = window_dataflow_module._shell
+    shell.start_autosave(journal, 10)
+    shell.autosave_project()
+    
+    assert shell._autosave_thread is not None
+    
+    # Changing the project waits for the snapshot to be finished
+    shell.set_project_title("Changed")
+    
+    assert shell._autosave_thread is None
+    assert len(journal.get_snapshots()) == 1
+    assert shell.project.title == "Changed"
+    
+    shell.stop_autosave()
+
+
+def test_project_autosave_unchanged(qtbot, tmp_path, window_dataflow_module):
+    
+    journal = AutosaveJournal(str(tmp_path / "autosave"))
+    
+    shell = window_dataflow_module._shell
+    shell.start_autosave(journal, 10)
+    shell.autosave_project()
+    
+    def snapshot_saved():
+        assert shell._autosave_thread is None
+        assert len(journal.get_snapshots()) == 1
+    
+    qtbot.waitUntil(snapshot_saved)
+    
+    # No further snapshot is taken until the project changes
+    shell.autosave_project()
+    
+    assert shell._autosave_thread is None
+    assert len(journal.get_snapshots()) == 1
+    
+    shell.set_project_title("Changed")
+    shell.autosave_project()
+    
+    assert shell._autosave_thread is not None
+    
+    qtbot.waitUntil(lambda: shell._autosave_thread is None)
+    
+    shell.stop_autosave()
+
+
 def test_project_close(qtbot, window_dataflow_module):
     
     # Close the project
@@ -1659,6 +1813,70 @@ def test_project_close(qtbot, window_dataflow_module):
     assert not close_button.isEnabled()
 
 
+def test_ThreadCurrent_cancelled(mocker, qtbot):
+    
+    core = GUICore()
+    project = core.new_project("test")
+    
+    cancel_token = CancelToken()
+    cancel_token.cancel()
+    
+    # The menu reaches the core, which checks the token first
+    execute = mocker.patch("dtocean_core.core.Core.execute_current")
+    mocker.patch("dtocean_app.main.ModuleMenu.execute_current",
+                 side_effect=lambda core, project: core.execute_current(
+                                                                    project))
+    
+    thread = ThreadCurrent(core, project, cancel_token)
+    error_detected = mocker.Mock()
+    thread.error_detected.connect(error_detected)
+    
+    with qtbot.waitSignal(thread.taskFinished):
+        thread._run()
+    
+    assert not execute.called
+    assert not error_detected.called
+    assert core._cancel_token is None
+
+
+def test_ThreadStrategy_cancelled(mocker, qtbot):
+    
+    sim_titles = ["Default"]
+    
+    project = mocker.MagicMock()
+    project.__len__.side_effect = lambda: len(sim_titles)
+    project.get_simulation_titles.side_effect = lambda: list(sim_titles)
+    
+    core = mocker.MagicMock()
+    core.remove_simulation.side_effect = \
+                    lambda project, sim_title: sim_titles.remove(sim_title)
+    
+    # The second simulation is cancelled after it is added
+    def execute(core, project):
+        sim_titles.extend(["Simulation 1", "Simulation 2"])
+        raise ExecutionCancelled("Execution was cancelled")
+    
+    strategy = mocker.Mock()
+    strategy.get_simulation_count.return_value = 2
+    strategy.get_simulation_record.return_value = [1]
+    strategy.execute.side_effect = execute
+    
+    mocker.patch("dtocean_app.main.ModuleMenu.get_scheduled",
+                 return_value=["Mock Module"])
+    mocker.patch("dtocean_app.main.ThemeMenu.get_scheduled",
+                 return_value=[])
+    
+    thread = ThreadStrategy(core, project, strategy, CancelToken())
+    error_detected = mocker.Mock()
+    thread.error_detected.connect(error_detected)
+    
+    with qtbot.waitSignal(thread.taskFinished):
+        thread._run()
+    
+    assert not error_detected.called
+    assert sim_titles == ["Default", "Simulation 1"]
+
+
 def test_modify_variable(qtbot, window_dataflow_module):
     
     # Modify a variable
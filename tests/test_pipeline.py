@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name,protected-access
+
+from collections import OrderedDict
+
+import pytest
+from PyQt4 import QtCore, QtGui
+
+from dtocean_app.pipeline import (ControlIndex,
+                                  InputBranchControl,
+                                  InputVarControl,
+                                  PipelineFilterProxyModel,
+                                  PipelineItemModel,
+                                  PipelineSearchIndex)
+
+
+class MockMetaData(object):
+
+    def __init__(self, identifier):
+        self.identifier = identifier
+        self.title = identifier.title()
+
+
+class MockVariable(object):
+
+    def __init__(self, var_id):
+        self._id = var_id
+
+    def get_metadata(self, core):
+        return MockMetaData(self._id)
+
+
+class MockBranch(object):
+
+    def __init__(self, input_status):
+        self.input_status = input_status
+        self.n_variable_calls = 0
+
+    def get_input_status(self, core, project):
+        return OrderedDict(self.input_status)
+
+    def get_inputs(self, core, project):
+        return self.input_status.keys()
+
+    def get_input_variable(self, core, project, var_id):
+        self.n_variable_calls += 1
+        return MockVariable(var_id)
+
+
+class MockCore(object):
+
+    def get_branch_status(self, project, branch, outputs=False):
+        return branch.get_input_status(self, project)
+
+    def get_metadata(self, var_id):
+        return MockMetaData(var_id)
+
+
+class MockShell(object):
+
+    def __init__(self):
+        self.core = MockCore()
+        self.project = None
+
+
+class MockControl(object):
+
+    def __init__(self, address, title, controls=None, var_id=None):
+        self._address = address
+        self._title = title
+        self._controls = controls or []
+        self._id = var_id
+
+
+@pytest.fixture
+def lazy_branch_control(qtbot):
+
+    model = PipelineItemModel()
+    proxy = PipelineFilterProxyModel()
+    proxy.setSourceModel(model)
+    proxy.setDynamicSortFilter(True)
+
+    view = QtGui.QTreeView()
+    view.setModel(proxy)
+    qtbot.addWidget(view)
+
+    address = "Inputs.Branch"
+    user_dict = {"address": address,
+                 "visible": True,
+                 "section": "branch",
+                 "status": None}
+
+    item = QtGui.QStandardItem("Branch")
+    item.setData(address, QtCore.Qt.UserRole)
+    item.setData((user_dict,), 33)
+    model.appendRow(item)
+
+    input_status = OrderedDict([("a", "required"),
+                                ("b", "optional"),
+                                ("c", "satisfied")])
+    branch = MockBranch(input_status)
+
+    control = InputBranchControl(address,
+                                 "Branch",
+                                 view,
+                                 model,
+                                 proxy,
+                                 "Inputs",
+                                 branch)
+    model.control_index.add(control)
+    model.defer_fetch(control, MockShell())
+
+    return control
+
+
+@pytest.fixture
+def branch_control(lazy_branch_control):
+
+    lazy_branch_control._model.fetch(lazy_branch_control)
+
+    return lazy_branch_control
+
+
+def test_ControlIndex():
+
+    child = MockControl("a.b", "B")
+    other = MockControl("a.c", "B")
+    parent = MockControl("a", "A", [child, other])
+
+    control_index = ControlIndex()
+    control_index.add(parent)
+    control_index.add(child)
+    control_index.add(other)
+
+    assert control_index.find_address("a.c") is other
+    assert control_index.find_title("B") is child
+    assert control_index.find_title("B", InputVarControl) is None
+
+    control_index.remove(parent)
+
+    assert control_index.find_address("a") is None
+    assert control_index.find_title("B") is None
+
+
+@pytest.fixture
+def search_index():
+
+    speed = MockControl("Hub.Branch.speed",
+                        "Current Speed",
+                        var_id="farm.current_speed")
+    depth = MockControl("Hub.Branch.depth",
+                        "Water Depth",
+                        var_id="bathymetry.depth")
+    branch = MockControl("Hub.Branch", "Branch", [speed, depth])
+    hub = MockControl("Hub", "Hub", [branch])
+
+    return PipelineSearchIndex([hub])
+
+
+@pytest.mark.parametrize("pattern, mode, expected", [
+                            ("speed", "substring", ["Hub.Branch.speed"]),
+                            ("BATHY", "substring", ["Hub.Branch.depth"]),
+                            ("wtr dp", "fuzzy", ["Hub.Branch.depth"]),
+                            ("^(current|water)", "regex",
+                                 ["Hub.Branch.depth", "Hub.Branch.speed"]),
+                            ("(", "regex", [])])
+def test_PipelineSearchIndex_search(search_index, pattern, mode, expected):
+
+    matches, ancestors = search_index.search(pattern, mode)
+
+    assert sorted(matches) == expected
+
+    if expected:
+        assert ancestors == set(["Hub", "Hub.Branch"])
+    else:
+        assert not ancestors
+
+
+def test_PipelineSearchIndex_search_bad_mode(search_index):
+
+    with pytest.raises(ValueError):
+        search_index.search("speed", "bad")
+
+
+def test_PipelineSearchIndex_search_deferred(lazy_branch_control):
+
+    model = lazy_branch_control._model
+    search_index = PipelineSearchIndex([lazy_branch_control], model)
+
+    matches, ancestors = search_index.search("^a$", "regex")
+
+    assert matches == set(["Inputs.Branch.a"])
+    assert ancestors == set(["Inputs.Branch"])
+    assert model.is_fetch_pending(lazy_branch_control)
+    assert search_index.get_deferred(matches) == [lazy_branch_control]
+    assert not search_index.get_deferred(["Inputs.Branch"])
+
+
+def test_PipelineFilterProxyModel_set_search(branch_control):
+
+    proxy = branch_control._proxy
+    index = branch_control._get_index_from_address()
+
+    proxy.set_search(set(["Inputs.Branch.a"]), set(["Inputs.Branch"]))
+
+    assert proxy.rowCount(proxy.mapFromSource(index)) == 1
+
+    proxy.set_search()
+
+    assert proxy.rowCount(proxy.mapFromSource(index)) == 3
+
+
+def test_PipelineItemModel_defer_fetch(lazy_branch_control):
+
+    model = lazy_branch_control._model
+    index = lazy_branch_control._get_index_from_address()
+
+    assert model.hasChildren(index)
+    assert model.canFetchMore(index)
+    assert model.rowCount(index) == 0
+    assert model.control_index.find_address("Inputs.Branch.a") is None
+
+    model.fetchMore(index)
+
+    assert not model.canFetchMore(index)
+    assert model.rowCount(index) == 3
+    assert len(lazy_branch_control._controls) == 3
+    assert model.control_index.find_address("Inputs.Branch.a") is not None
+
+
+def test_PipelineItemModel_fetch_all(lazy_branch_control):
+
+    model = lazy_branch_control._model
+    model.fetch_all()
+
+    assert not model.is_fetch_pending(lazy_branch_control)
+    assert len(lazy_branch_control._controls) == 3
+
+
+def test_InputBranchControl_update_status_pending(lazy_branch_control):
+
+    model = lazy_branch_control._model
+    branch = lazy_branch_control._branch
+
+    branch.input_status["a"] = "satisfied"
+    lazy_branch_control._update_status(MockShell())
+
+    assert model.is_fetch_pending(lazy_branch_control)
+    assert not lazy_branch_control._controls
+
+    model.fetch(lazy_branch_control)
+
+    assert lazy_branch_control._controls[0]._status == "satisfied"
+
+
+def test_InputBranchControl_update_status_changed(branch_control):
+
+    branch = branch_control._branch
+    controls = list(branch_control._controls)
+    n_variable_calls = branch.n_variable_calls
+
+    branch.input_status["a"] = "satisfied"
+    branch_control._update_status(MockShell())
+
+    index = branch_control._get_index_from_address("Inputs.Branch.a")
+    item = branch_control._model.itemFromIndex(index)
+    user_dict = item.data(33).toPyObject()[0]
+
+    assert branch_control._controls == controls
+    assert branch.n_variable_calls == n_variable_calls
+    assert controls[0]._status == "satisfied"
+    assert user_dict["status"] == "satisfied"
+
+
+def test_InputBranchControl_update_status_hidden(branch_control):
+
+    branch = branch_control._branch
+
+    branch.input_status["b"] = "overwritten"
+    branch_control._update_status(MockShell())
+
+    index = branch_control._get_index_from_address("Inputs.Branch.b")
+    item = branch_control._model.itemFromIndex(index)
+    user_dict = item.data(33).toPyObject()[0]
+
+    assert not user_dict["visible"]
+    assert branch_control._proxy.rowCount(
+                branch_control._proxy.mapFromSource(index.parent())) == 2
+
+
+def test_InputBranchControl_update_status_new_variable(branch_control):
+
+    branch = branch_control._branch
+    controls = list(branch_control._controls)
+
+    branch.input_status["d"] = "required"
+    branch_control._update_status(MockShell())
+
+    index = branch_control._get_index_from_address()
+    item = branch_control._model.itemFromIndex(index)
+
+    assert branch_control._controls != controls
+    assert len(branch_control._controls) == 4
+    assert item.rowCount() == 4
+
+
+def test_InputBranchControl_rebuild_index(branch_control):
+
+    control_index = branch_control._model.control_index
+    old_control = control_index.find_address("Inputs.Branch.a")
+
+    branch_control._branch.input_status["d"] = "required"
+    branch_control._update_status(MockShell())
+
+    new_control = control_index.find_address("Inputs.Branch.a",
+                                             InputVarControl)
+
+    assert new_control is not None
+    assert new_control is not old_control
+    assert control_index.find_title("D", InputVarControl) is not None
+    assert control_index.find_title("Branch",
+                                    InputBranchControl) is branch_control
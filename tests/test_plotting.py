@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name
+
+import os
+import cPickle as pickle
+
+import pandas as pd
+import matplotlib.pyplot as plt
+from PIL import Image
+
+import dtocean_app.plotting as plotting
+from dtocean_app.plotting import (PLOT_FIGURE,
+                                  PLOT_NONE,
+                                  PLOT_SAVED,
+                                  export_plots,
+                                  get_export_path,
+                                  get_export_tasks,
+                                  render_plot,
+                                  save_figure,
+                                  write_plot_index)
+
+
+class MockPlotInterface(object):
+    
+    def __init__(self, values=None):
+        self.values = values
+        self.fig_handle = None
+    
+    def connect(self):
+        
+        if self.values is None: return
+        
+        fig = plt.figure()
+        ax = fig.gca()
+        ax.plot(self.values)
+        
+        self.fig_handle = fig
+
+
+class MockVariable(object):
+    
+    def __init__(self, var_id, plots, auto=True, bad_plot=None):
+        self._id = var_id
+        self.plots = plots
+        self.auto = auto
+        self.bad_plot = bad_plot
+    
+    def get_available_plots(self, core, project):
+        return self.plots
+    
+    def _get_receivers(self, core, project, socket, wrapper):
+        
+        receivers = list(self.plots)
+        if self.auto: receivers.append("Auto")
+        
+        return receivers
+    
+    def _get_receiving_interface(self, core,
+                                       project,
+                                       socket,
+                                       wrapper,
+                                       plot_name):
+        
+        if plot_name is not None and plot_name == self.bad_plot:
+            raise ValueError("Bad plot")
+        
+        return MockPlotInterface([0, 1, 4])
+    
+    def _write_interface(self, core, project, interface):
+        interface.connect()
+
+
+class MockCore(object):
+    
+    def can_load_interface(self, project, interface):
+        return True
+
+
+class MockProject(object):
+    
+    def __init__(self):
+        self.title = None
+    
+    def set_active_index(self, title):
+        self.title = title
+
+
+def get_task(values, save_args=None):
+    
+    interface_data = pickle.dumps(MockPlotInterface(values),
+                                  pickle.HIGHEST_PROTOCOL)
+    
+    return (interface_data, save_args)
+
+
+def test_render_plot_figure():
+    
+    n_figs = len(plt.get_fignums())
+    status, data = render_plot(get_task([0, 1, 4]))
+    
+    assert status == PLOT_FIGURE
+    assert len(plt.get_fignums()) == n_figs
+    
+    # The unpickled figure is not restored to pyplot
+    fig = pickle.loads(data)
+    line = fig.axes[0].get_lines()[0]
+    
+    assert len(plt.get_fignums()) == n_figs
+    assert list(line.get_ydata()) == [0, 1, 4]
+    
+    plt.close(fig)
+
+
+def test_render_plot_none():
+    
+    status, data = render_plot(get_task(None))
+    
+    assert status == PLOT_NONE
+    assert data is None
+
+
+def test_render_plot_save(tmpdir):
+    
+    file_path = str(tmpdir.join("plot.png"))
+    status, data = render_plot(get_task([0, 1, 4], (file_path, (4, 3))))
+    
+    assert status == PLOT_SAVED
+    assert data == file_path
+    assert tmpdir.join("plot.png").check()
+
+
+def test_save_figure_png_dpi(tmpdir):
+    
+    file_path = str(tmpdir.join("plot.png"))
+    
+    fig = plt.figure()
+    save_figure(fig, file_path, (4, 3), dpi=100)
+    plt.close(fig)
+    
+    image = Image.open(file_path)
+    
+    assert [round(x) for x in image.info["dpi"]] == [100, 100]
+
+
+def test_save_figure_jpg_dpi(tmpdir):
+    
+    file_path = str(tmpdir.join("plot.jpg"))
+    
+    fig = plt.figure()
+    save_figure(fig, file_path, (4, 3), dpi=100)
+    plt.close(fig)
+    
+    image = Image.open(file_path)
+    
+    assert image.format == "JPEG"
+    assert [round(x) for x in image.info["dpi"]] == [100, 100]
+
+
+def test_get_export_path():
+    
+    result = get_export_path("out", "Sim 1/a", "device.x:y", "My Plot")
+    expected = os.path.join("out", "Sim 1_a", "device.x_y_My Plot.png")
+    
+    assert result == expected
+
+
+def test_get_export_path_auto():
+    
+    result = get_export_path("out", "Default", "device.x", ext="pdf")
+    expected = os.path.join("out", "Default", "device.x.pdf")
+    
+    assert result == expected
+
+
+def test_get_export_tasks():
+    
+    variables = [(MockVariable("a", []), "A"),
+                 (MockVariable("b", []), "B")]
+    tasks = get_export_tasks(["Sim 1", "Sim 2"], variables, "out", (4, 3))
+    
+    assert [task[0] for task in tasks] == [0, 1, 2, 3]
+    assert [(task[1], task[3]) for task in tasks] == [("Sim 1", "A"),
+                                                      ("Sim 1", "B"),
+                                                      ("Sim 2", "A"),
+                                                      ("Sim 2", "B")]
+
+
+def get_export_task(tmpdir, variable, all_plots):
+    
+    return (3,
+            "Sim 1",
+            pickle.dumps(variable, pickle.HIGHEST_PROTOCOL),
+            "Title",
+            str(tmpdir),
+            (4, 3),
+            50,
+            "png",
+            all_plots)
+
+
+def test_export_plots(monkeypatch, tmpdir):
+    
+    project = MockProject()
+    
+    monkeypatch.setattr(plotting, "_export_core", MockCore())
+    monkeypatch.setattr(plotting, "_export_project", project)
+    
+    variable = MockVariable("device.x", ["Named"])
+    task_index, records, errors = export_plots(get_export_task(tmpdir,
+                                                               variable,
+                                                               False))
+    
+    assert project.title == "Sim 1"
+    assert task_index == 3
+    assert not errors
+    assert [record[3] for record in records] == ["auto"]
+    assert tmpdir.join("Sim 1", "device.x.png").check()
+
+
+def test_export_plots_all(monkeypatch, tmpdir):
+    
+    monkeypatch.setattr(plotting, "_export_core", MockCore())
+    monkeypatch.setattr(plotting, "_export_project", MockProject())
+    
+    variable = MockVariable("device.x", ["Named", "Bad"], bad_plot="Bad")
+    _, records, errors = export_plots(get_export_task(tmpdir,
+                                                      variable,
+                                                      True))
+    
+    assert [record[3] for record in records] == ["auto", "Named"]
+    assert len(errors) == 1
+    assert "Bad plot" in errors[0]
+    assert tmpdir.join("Sim 1", "device.x_Named.png").check()
+
+
+def test_export_plots_all_no_auto(monkeypatch, tmpdir):
+    
+    monkeypatch.setattr(plotting, "_export_core", MockCore())
+    monkeypatch.setattr(plotting, "_export_project", MockProject())
+    
+    variable = MockVariable("device.x", ["Named"], auto=False)
+    _, records, _ = export_plots(get_export_task(tmpdir, variable, True))
+    
+    assert [record[3] for record in records] == ["Named"]
+
+
+def test_write_plot_index(tmpdir):
+    
+    out_dir = str(tmpdir)
+    records = [("Sim 1",
+                "device.x",
+                "Title",
+                "auto",
+                os.path.join(out_dir, "Sim 1", "device.x.png"))]
+    
+    index_path = write_plot_index(records, out_dir)
+    table = pd.read_csv(index_path)
+    
+    assert list(table.columns) == ["Simulation",
+                                   "Variable",
+                                   "Title",
+                                   "Plot",
+                                   "File"]
+    assert table["File"][0] == os.path.join("Sim 1", "device.x.png")
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name
+
+import pandas as pd
+import pytest
+
+from dtocean_app.profiling import (PROFILE_COLUMNS,
+                                   ExecutionProfiler,
+                                   get_profile_table,
+                                   write_profile_csv)
+
+
+@pytest.fixture
+def records():
+
+    return [{"simulation": "Default",
+             "stage": "Mock Module",
+             "start": "2022-01-01T00:00:00",
+             "wall_time": 2.,
+             "cpu_time": 1.,
+             "peak_rss": 2 * 1024 ** 2},
+            {"simulation": "Default",
+             "stage": "Themes",
+             "start": "2022-01-01T00:00:02",
+             "wall_time": 1.,
+             "cpu_time": 1.,
+             "peak_rss": None}]
+
+
+def test_ExecutionProfiler_stage():
+
+    profiler = ExecutionProfiler(0.01)
+    profiler.start_stage("Mock Module", "Default")
+
+    data = [0] * 100000
+
+    record = profiler.finish_stage()
+
+    assert data
+    assert record["simulation"] == "Default"
+    assert record["stage"] == "Mock Module"
+    assert record["wall_time"] >= 0
+    assert record["cpu_time"] >= 0
+
+
+def test_ExecutionProfiler_nested():
+
+    profiler = ExecutionProfiler(0.01)
+    profiler.start_stage("Strategy")
+    profiler.start_stage("Themes", "Default")
+
+    assert profiler.finish_stage()["stage"] == "Themes"
+
+    record = profiler.finish_stage()
+
+    assert record["stage"] == "Strategy"
+    assert record["simulation"] is None
+
+
+def test_ExecutionProfiler_finish_not_started():
+
+    profiler = ExecutionProfiler()
+
+    with pytest.raises(RuntimeError):
+        profiler.finish_stage()
+
+
+def test_ExecutionProfiler_no_rss(mocker):
+
+    mocker.patch("dtocean_app.profiling.get_rss", return_value=None)
+
+    profiler = ExecutionProfiler(0.01)
+    profiler.start_stage("Themes", "Default")
+
+    assert profiler.finish_stage()["peak_rss"] is None
+
+
+def test_get_profile_table(records):
+
+    table = get_profile_table(records)
+
+    assert list(table.columns) == PROFILE_COLUMNS
+    assert table["Peak Memory [MB]"][0] == 2
+    assert pd.isnull(table["Peak Memory [MB]"][1])
+
+
+def test_write_profile_csv(tmpdir, records):
+
+    csv_path = str(tmpdir.join("profile.csv"))
+    write_profile_csv(records, csv_path)
+
+    test = pd.read_csv(csv_path)
+
+    assert list(test.columns) == PROFILE_COLUMNS
+    assert list(test["Stage"]) == ["Mock Module", "Themes"]
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name
+
+import pytest
+
+from dtocean_app.progress import (CancelToken,
+                                  ExecutionCancelled,
+                                  ExecutionProgress,
+                                  format_duration,
+                                  get_status_text)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+
+    clock = Clock()
+    monkeypatch.setattr("dtocean_app.progress.time.time", clock)
+
+    return clock
+
+
+def test_ExecutionProgress_stages(clock):
+
+    sim_one = object()
+    sim_two = object()
+    statuses = []
+
+    progress = ExecutionProgress(2, 2, statuses.append)
+
+    progress.start_stage("Module", sim_one)
+    clock.now += 10
+    progress.finish_stage()
+
+    status = progress.get_status()
+
+    assert status["completed"] == 0
+    assert status["stage"] is None
+    assert status["remaining"] == 30
+
+    progress.start_stage("Themes", sim_one)
+    clock.now += 20
+    progress.finish_stage()
+
+    progress.start_stage("Module", sim_two)
+    clock.now += 5
+
+    status = progress.get_status()
+
+    assert status["completed"] == 1
+    assert status["stage"] == "Module"
+    assert status["elapsed"] == 35
+    assert status["remaining"] == 25
+    assert status["finish"] == clock.now + 25
+
+    progress.finish()
+
+    assert statuses[-1]["completed"] == 2
+    assert statuses[-1]["remaining"] == 0
+
+
+def test_ExecutionProgress_nested_stage(clock):
+
+    progress = ExecutionProgress(1, 1)
+
+    assert progress.start_stage("Module")
+    assert not progress.start_stage("Themes")
+
+
+def test_ExecutionProgress_set_completed(clock):
+
+    progress = ExecutionProgress()
+
+    assert progress.get_status()["remaining"] is None
+
+    clock.now += 30
+    progress.set_completed(3, 9)
+
+    status = progress.get_status()
+
+    assert status["total"] == 9
+    assert status["remaining"] == 60
+
+
+def test_format_duration():
+    assert format_duration(3725.4) == "1:02:05"
+
+
+def test_get_status_text(clock):
+
+    status = {"completed": 1,
+              "total": 4,
+              "stage": "Module",
+              "start": clock.now - 100,
+              "stage_start": clock.now - 10,
+              "elapsed": 100,
+              "remaining": 60,
+              "finish": clock.now + 60}
+
+    text = get_status_text(status, clock.now)
+
+    assert "Completed 1 of 4 simulations" in text
+    assert "Executing Module for 0:00:10" in text
+    assert "Elapsed time 0:01:40" in text
+    assert "(0:01:00 remaining)" in text
+
+
+def test_CancelToken():
+
+    token = CancelToken()
+    token.check()
+
+    token.cancel()
+
+    assert token.is_cancelled()
+
+    with pytest.raises(ExecutionCancelled):
+        token.check()
+
+    token.reset()
+
+    assert not token.is_cancelled()
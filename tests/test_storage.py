@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name,protected-access
+
+import pytest
+import numpy as np
+
+from dtocean_core.menu import ProjectMenu
+from dtocean_core.pipeline import Tree
+from dtocean_app.core import GUICore
+from dtocean_app.storage import (LazySimulation,
+                                 can_update,
+                                 get_pool_store,
+                                 is_lazy,
+                                 read_manifest,
+                                 read_project_file,
+                                 select_simulations,
+                                 write_project_file)
+from dtocean_app.utils.archive import ArchiveReader, ArchiveWriter
+
+
+@pytest.fixture(scope="module")
+def core():
+
+    core = GUICore()
+    core._create_data_catalog()
+    core._create_control()
+    core._create_sockets()
+    core._init_plots()
+
+    return core
+
+
+@pytest.fixture
+def project(core):
+
+    project_title = "Test"
+
+    project_menu = ProjectMenu()
+    var_tree = Tree()
+
+    project = core.new_project(project_title)
+
+    options_branch = var_tree.get_branch(core,
+                                         project,
+                                         "System Type Selection")
+    device_type = options_branch.get_input_variable(core,
+                                                    project,
+                                                    "device.system_type")
+    device_type.set_raw_interface(core, "Tidal Fixed")
+    device_type.read(core, project)
+
+    project_menu.initiate_pipeline(core, project)
+
+    for i in range(3):
+        core.clone_simulation(project,
+                              "Clone {}".format(i),
+                              sim_title="Default")
+
+    return project
+
+
+@pytest.fixture
+def dto_path(tmpdir, core, project):
+
+    dto_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(dto_path) as archive:
+        key_sources = core.dump_project_archive(project, archive)
+
+    core.link_project_archive(project, dto_path, key_sources)
+
+    return dto_path
+
+
+def test_get_pool_store(project):
+
+    store = get_pool_store(project._pool)
+
+    assert isinstance(store, dict)
+    assert len(store) > 0
+
+
+def test_select_simulations(project):
+
+    selected = select_simulations(project, ["Clone 1"])
+    store = get_pool_store(selected._pool)
+
+    assert selected.get_simulation_titles() == ["Clone 1"]
+    assert len(project.get_simulation_titles()) == 4
+    assert 0 < len(store) <= len(get_pool_store(project._pool))
+
+
+def test_select_simulations_lazy(core, dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+
+    test.set_active_index(title="Default")
+    select_simulations(test, ["Clone 2"])
+    lazy = dict((sim.get_title(), is_lazy(sim)) for sim in test._simulations)
+
+    assert not lazy["Clone 2"]
+    assert lazy["Clone 0"]
+    assert lazy["Clone 1"]
+
+
+def test_dump_project_archive_members(dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        names = archive.getnames()
+        manifest = archive.read_json("manifest.json")
+
+    sim_names = [x for x in names if x.startswith("simulations/")]
+
+    assert manifest["skeleton"] in names
+    assert len(sim_names) == 4
+    assert [x["title"] for x in manifest["simulations"]] == \
+                                ["Default", "Clone 0", "Clone 1", "Clone 2"]
+
+
+def test_load_project_archive_lazy(core, project, dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+
+    active_index = test._active_index
+    lazy = [is_lazy(sim) for sim in test._simulations]
+
+    assert test.title == project.title
+    assert test.get_simulation_titles() == project.get_simulation_titles()
+    assert not lazy[active_index]
+    assert sum(lazy) == len(project) - 1
+
+
+def test_load_project_archive_on_demand(core, project, dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+
+    test.set_active_index(title="Clone 2")
+    simulation = test.get_simulation()
+
+    assert type(simulation) is not LazySimulation
+    assert not is_lazy(test._simulations[test._active_index])
+    assert core.get_data_value(test, "device.system_type") == "Tidal Fixed"
+
+
+def test_save_lazy_project(tmpdir, core, project, dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+
+    # Save the project with unloaded simulations to a new file
+    new_path = str(tmpdir.join("new.dto"))
+
+    with ArchiveWriter(new_path) as archive:
+        key_sources = core.dump_project_archive(test, archive)
+
+    core.link_project_archive(test, new_path, key_sources)
+
+    # Unloaded simulations must now be read from the new file
+    tmpdir.join("test.dto").remove()
+
+    for title in test.get_simulation_titles():
+        test.set_active_index(title=title)
+        assert core.get_data_value(test,
+                                   "device.system_type") == "Tidal Fixed"
+
+    with ArchiveReader(new_path) as archive:
+        reloaded = core.load_project_archive(archive)
+
+    assert reloaded.get_simulation_titles() == project.get_simulation_titles()
+
+
+def test_save_project_update(tmpdir, core, project, dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+        sim_count = len([x for x in archive.getnames()
+                                         if x.startswith("simulations/")])
+
+    assert sim_count == 4
+    assert can_update(test._archive, dto_path)
+
+    # Modify one simulation and append it to the archive
+    test.set_active_index(title="Clone 1")
+    test._set_simulation_changed()
+
+    with ArchiveWriter(dto_path, append=True) as archive:
+        saved = core.dump_project_archive(test, archive, update=True)
+
+    core.link_project_archive(test, dto_path, saved, update=True)
+
+    with ArchiveReader(dto_path) as archive:
+        names = archive.getnames()
+        reloaded = core.load_project_archive(archive)
+
+    sim_names = [x for x in names if x.startswith("simulations/")]
+
+    # The unchanged pickle is detected and nothing new is written
+    assert len(sim_names) == sim_count
+    assert reloaded.get_simulation_titles() == \
+                                        project.get_simulation_titles()
+
+    for title in reloaded.get_simulation_titles():
+        reloaded.set_active_index(title=title)
+        assert core.get_data_value(reloaded,
+                                   "device.system_type") == "Tidal Fixed"
+
+
+def test_save_project_update_rename(core, dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+        sim_count = len([x for x in archive.getnames()
+                                         if x.startswith("simulations/")])
+
+    test._clear_changed()
+    test.set_simulation_title("Renamed", title="Clone 1")
+
+    assert test._get_changed_simulations() == set()
+
+    with ArchiveWriter(dto_path, append=True) as archive:
+        saved = core.dump_project_archive(test, archive, update=True)
+
+    core.link_project_archive(test, dto_path, saved, update=True)
+
+    with ArchiveReader(dto_path) as archive:
+        names = archive.getnames()
+        reloaded = core.load_project_archive(archive)
+
+    sim_names = [x for x in names if x.startswith("simulations/")]
+
+    # Only the manifest records the new title
+    assert len(sim_names) == sim_count
+    assert "Renamed" in reloaded.get_simulation_titles()
+
+    reloaded.set_active_index(title="Renamed")
+
+    assert reloaded.get_simulation_title() == "Renamed"
+
+
+def test_can_update_other_path(tmpdir, core, dto_path):
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+
+    new_path = str(tmpdir.join("new.dto"))
+
+    assert not can_update(test._archive, new_path)
+
+
+def test_dump_project_archive_dedup(tmpdir, core, project):
+
+    store = get_pool_store(project._pool)
+    store["test.dup1"] = np.ones(100000)
+    store["test.dup2"] = np.ones(100000)
+
+    dto_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(dto_path) as archive:
+        saved = core.dump_project_archive(project, archive)
+
+    assert saved["report"]["references"] >= 2
+    assert saved["report"]["saved"] >= 800000
+
+    with ArchiveReader(dto_path) as archive:
+        test = core.load_project_archive(archive)
+
+    test_store = get_pool_store(test._pool)
+
+    assert test_store["test.dup1"] is test_store["test.dup2"]
+    assert (test_store["test.dup1"] == 1).all()
+
+
+def test_write_project_file_profile(tmpdir, core, project):
+
+    record = {"simulation": "Default",
+              "stage": "Themes",
+              "start": "2022-01-01T00:00:00",
+              "wall_time": 1.,
+              "cpu_time": 0.5,
+              "peak_rss": None}
+
+    project.add_profile_records([record])
+
+    dto_path = str(tmpdir.join("test.dto"))
+    write_project_file(core, dto_path, project, "global", {}, None)
+
+    test = read_project_file(core, dto_path)["project"]
+
+    assert test.get_profile() == [record]
+
+
+def test_write_project_file_extras(tmpdir, core, project):
+
+    dto_path = str(tmpdir.join("test.dto"))
+    write_project_file(core, dto_path, project, "global", {}, None)
+    write_project_file(core,
+                       dto_path,
+                       project,
+                       "project",
+                       {},
+                       None,
+                       incremental=True)
+
+    with ArchiveReader(dto_path) as archive:
+        manifest = read_manifest(archive)
+        names = archive.getnames()
+
+    assert "scope.json" not in names
+    assert manifest["extras"]["scope.json"] in names
+    assert read_project_file(core, dto_path)["scope"] == "project"
+
+
+def test_dump_project_archive_value_changed(tmpdir, core, project):
+
+    value = np.ones(100000)
+    store = get_pool_store(project._pool)
+    store["test.before"] = value
+
+    dto_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(dto_path) as archive:
+        saved = core.dump_project_archive(project, archive)
+
+    core.link_project_archive(project, dto_path, saved)
+
+    # Change the saved value in place and store it again
+    value[:] = 2
+    store["test.after"] = value
+
+    new_path = str(tmpdir.join("new.dto"))
+
+    with ArchiveWriter(new_path) as archive:
+        core.dump_project_archive(project, archive)
+
+    with ArchiveReader(new_path) as archive:
+        test = core.load_project_archive(archive)
+
+    test_store = get_pool_store(test._pool)
+
+    assert (test_store["test.after"] == 2).all()
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=protected-access
+
+import copy
+import cPickle as pickle
+from cStringIO import StringIO
+
+import pandas as pd
+import pytest
+
+from dtocean_core.menu import ProjectMenu
+from dtocean_core.pipeline import Tree
+from dtocean_app.core import GUICore
+from dtocean_app.storage import is_lazy, select_simulations
+from dtocean_app.strategies.multi import GUIMultiSensitivity
+from dtocean_app.strategies.parallel import (merge_simulations,
+                                             renumber_titles,
+                                             split_values)
+from dtocean_app.strategies.sensitivity import GUIUnitSensitivity
+from dtocean_app.utils.archive import ArchiveReader, ArchiveWriter
+
+
+class MockPool(object):
+
+    def __init__(self):
+        self._data = {}
+        self._links = {}
+
+    def add(self, key, value):
+        self._data[key] = value
+        self._links[key] = self._links.get(key, 0) + 1
+
+
+class MockDataState(object):
+
+    def __init__(self, index_map):
+        self._data = index_map
+
+    def mirror_map(self):
+        return self._data.copy()
+
+
+class MockSimulation(object):
+
+    def __init__(self, title, keys, note=None):
+        self._title = title
+        self._states = [MockDataState({"var.{}".format(i): key
+                                            for i, key in enumerate(keys)})]
+        self.note = note
+
+    @property
+    def keys(self):
+        index_map = self._states[0]._data
+        return [index_map["var.{}".format(i)]
+                                        for i in range(len(index_map))]
+
+    def get_title(self):
+        return self._title
+
+    def set_title(self, title):
+        self._title = title
+
+
+class MockProject(object):
+
+    def __init__(self):
+        self._pool = MockPool()
+        self._simulations = []
+
+    def add_simulation(self, simulation):
+        self._simulations.append(simulation)
+
+
+@pytest.mark.parametrize("values, n_chunks, expected", [
+                            ([1, 2, 3, 4], 2, [[1, 2], [3, 4]]),
+                            ([1, 2, 3, 4, 5], 3, [[1, 2], [3, 4], [5]]),
+                            ([1, 2], 4, [[1], [2]]),
+                            ([1, 2], 1, [[1, 2]])])
+def test_split_values(values, n_chunks, expected):
+    assert split_values(values, n_chunks) == expected
+
+
+def test_GUIUnitSensitivity_configure_workers():
+
+    test = GUIUnitSensitivity()
+    test.configure("mock", "var", [1, 2, 3], n_workers=2)
+
+    assert test.get_workers() == 2
+
+
+def test_GUIUnitSensitivity_configure_workers_invalid():
+
+    test = GUIUnitSensitivity()
+
+    with pytest.raises(ValueError):
+        test.configure("mock", "var", [1, 2, 3], n_workers=0)
+
+
+def test_GUIUnitSensitivity_get_chunks():
+
+    test = GUIUnitSensitivity()
+    test.configure("mock", "var", [1, 2, 3, 4, 5], n_workers=2)
+
+    chunks = test.get_chunks(2)
+    var_values = [config["var_values"] for config, _ in chunks]
+
+    assert var_values == [[1, 2, 3], [4, 5]]
+    assert [n_sims for _, n_sims in chunks] == [3, 2]
+
+
+def test_GUIUnitSensitivity_execute_serial(mocker):
+
+    execute = mocker.patch("dtocean_app.strategies.sensitivity."
+                           "UnitSensitivity.execute")
+
+    test = GUIUnitSensitivity()
+    test.configure("mock", "var", [1, 2, 3])
+    test.execute("core", "project")
+
+    execute.assert_called_once_with("core", "project")
+
+
+def test_GUIMultiSensitivity_get_chunks():
+
+    inputs_df = pd.DataFrame({"Module": ["mock", "mock"],
+                              "Variable": ["a", "b"],
+                              "Values": [[1, 2], [3, 4, 5]]})
+
+    test = GUIMultiSensitivity()
+    test.configure(inputs_df, 1., n_workers=4)
+
+    chunks = test.get_chunks(4)
+    chunk_values = [list(config["inputs_df"]["Values"])
+                                                for config, _ in chunks]
+
+    assert chunk_values == [[[1], [3, 4]],
+                            [[1], [5]],
+                            [[2], [3, 4]],
+                            [[2], [5]]]
+    assert sum([n_sims for _, n_sims in chunks]) == 6
+
+
+def test_GUIMultiSensitivity_get_chunks_subset():
+
+    inputs_df = pd.DataFrame({"Module": ["mock"],
+                              "Variable": ["a"],
+                              "Values": [[1, 2, 3, 4]]})
+
+    test = GUIMultiSensitivity()
+    test.configure(inputs_df, 0.5, n_workers=4)
+
+    assert test.get_chunks(4) is None
+
+
+def test_merge_simulations():
+
+    original = MockProject()
+    original._pool.add("base", "base value")
+    original.add_simulation(MockSimulation("Default", ["base"]))
+
+    project = copy.deepcopy(original)
+    project._pool.add("base", "base value")
+    project._pool.add("new", "project value")
+    project.add_simulation(MockSimulation("var = 1", ["base", "new"]))
+
+    other = copy.deepcopy(original)
+    other._pool.add("base", "base value")
+    other._pool.add("new", "other value")
+    other._pool.add("unused", "unused value")
+    other.add_simulation(MockSimulation("var = 2", ["base", "new"], "new"))
+
+    indexes = merge_simulations(project, other, [1], original)
+
+    assert indexes == [2]
+
+    merged = project._simulations[2]
+    new_key = merged.keys[1]
+
+    assert merged.get_title() == "var = 2"
+    assert merged.keys[0] == "base"
+    assert new_key != "new"
+    assert merged.note == "new"
+    assert project._pool._data["new"] == "project value"
+    assert project._pool._data[new_key] == "other value"
+    assert project._pool._links["base"] == 3
+    assert project._pool._links[new_key] == 1
+    assert "unused" not in project._pool._data
+
+
+def test_merge_simulations_title():
+
+    original = MockProject()
+    original._pool.add("base", "base value")
+
+    project = copy.deepcopy(original)
+    project.add_simulation(MockSimulation("Simulation 1", ["base"]))
+
+    other = copy.deepcopy(original)
+    other.add_simulation(MockSimulation("Simulation 1", ["base"]))
+
+    merge_simulations(project, other, [0], original)
+
+    assert project._simulations[1].get_title() == "Simulation 1 (2)"
+
+
+@pytest.mark.parametrize("chunk_titles, expected", [
+                ([["Simulation 1", "Simulation 2"], ["Simulation 1"]],
+                 [["Simulation 1", "Simulation 2"], ["Simulation 3"]]),
+                ([["Run 3"], ["Run 3", "Run 4"], ["Run 3"]],
+                 [["Run 3"], ["Run 4", "Run 5"], ["Run 6"]]),
+                ([["var = 1", "var = 2"], ["var = 3"]],
+                 [["var = 1", "var = 2"], ["var = 3"]]),
+                ([["Simulation 1"], ["Other 1"]],
+                 [["Simulation 1"], ["Other 1"]]),
+                ([["Simulation 1", "Simulation 2"]],
+                 [["Simulation 1", "Simulation 2"]])])
+def test_renumber_titles(chunk_titles, expected):
+    assert renumber_titles(chunk_titles) == expected
+
+
+@pytest.fixture
+def saved_project(tmpdir):
+
+    core = GUICore()
+    core._create_data_catalog()
+    core._create_control()
+    core._create_sockets()
+
+    project = core.new_project("Test")
+    var_tree = Tree()
+
+    options_branch = var_tree.get_branch(core,
+                                         project,
+                                         "System Type Selection")
+    device_type = options_branch.get_input_variable(core,
+                                                    project,
+                                                    "device.system_type")
+    device_type.set_raw_interface(core, "Tidal Fixed")
+    device_type.read(core, project)
+
+    ProjectMenu().initiate_pipeline(core, project)
+
+    for i in range(2):
+        core.clone_simulation(project,
+                              "Clone {}".format(i),
+                              sim_title="Default")
+
+    project.set_active_index(title="Default")
+    dto_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(dto_path) as archive:
+        saved = core.dump_project_archive(project, archive)
+
+    core.link_project_archive(project, dto_path, saved)
+
+    return core, dto_path
+
+
+def test_merge_results_save(saved_project):
+
+    core, dto_path = saved_project
+
+    with ArchiveReader(dto_path) as archive:
+        project = core.load_project_archive(archive)
+        sim_count = len([x for x in archive.getnames()
+                                         if x.startswith("simulations/")])
+
+    # Execute a chunk as a worker would, from the active simulation only
+    project_data = pickle.dumps(select_simulations(project, ["Default"]),
+                                pickle.HIGHEST_PROTOCOL)
+
+    other = core.load_project_stream(StringIO(project_data))
+    core.clone_simulation(other, "var = 1", sim_title="Default")
+
+    test = GUIUnitSensitivity()
+    test._merge_results(project, project_data, [(other, [1], [])])
+
+    assert project.get_simulation_titles() == ["Default",
+                                               "Clone 0",
+                                               "Clone 1",
+                                               "var = 1"]
+    assert is_lazy(project._simulations[1])
+    assert is_lazy(project._simulations[2])
+
+    with ArchiveWriter(dto_path, append=True) as archive:
+        saved = core.dump_project_archive(project, archive, update=True)
+
+    core.link_project_archive(project, dto_path, saved, update=True)
+
+    with ArchiveReader(dto_path) as archive:
+        names = archive.getnames()
+
+    sim_names = [x for x in names if x.startswith("simulations/")]
+
+    # Only the merged simulation is written
+    assert len(sim_names) == sim_count + 1
@@ -1360,6 +1360,33 @@ def test_AdvancedPositionWidget_set_plot(qtbot, window_results):
     assert len(window_results.plotWidget.figure.axes) == 1
 
 
+def test_AdvancedPositionWidget_set_plot_reuse(qtbot, window_results):
+    
+    window_results.tabWidget.setCurrentIndex(4)
+    
+    window_results.xAxisVarBox.setCurrentIndex(4)
+    window_results.yAxisVarBox.setCurrentIndex(2)
+    window_results.colorAxisVarBox.setCurrentIndex(-1)
+    window_results.filterVarBox.setCurrentIndex(-1)
+    
+    qtbot.mouseClick(window_results.plotButton, QtCore.Qt.LeftButton)
+    
+    figure = window_results.plotWidget.figure
+    offsets = figure.axes[0].collections[0].get_offsets()
+    
+    assert len(offsets) > 0
+    
+    window_results.filterVarBox.setCurrentIndex(5)
+    window_results.filterVarMaxBox.setChecked(True)
+    window_results.filterVarMaxSpinBox.setValue(-1e12)
+    
+    qtbot.mouseClick(window_results.plotButton, QtCore.Qt.LeftButton)
+    
+    offsets = figure.axes[0].collections[0].get_offsets()
+    
+    assert window_results.plotWidget.figure is figure
+    assert len(offsets) == 0
+
 def test_AdvancedPositionWidget_export_plot(mocker,
                                             qtbot,
                                             tmp_path,
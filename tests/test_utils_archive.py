@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name
+
+import tarfile
+import cPickle as pickle
+
+import pytest
+import numpy as np
+
+from dtocean_app.utils.archive import (ArchiveReader,
+                                       ArchiveWriter,
+                                       get_codec)
+
+
+@pytest.fixture
+def data():
+    return {"array": np.arange(100000),
+            "text": "Hello" * 1000}
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip", "bz2"])
+def test_archive_roundtrip(tmpdir, data, compression):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path, compression) as archive:
+
+        with archive.open_member("data.pkl") as member:
+            pickle.dump(data, member, -1)
+
+        archive.write_json("scope.json", "global")
+
+    with ArchiveReader(archive_path) as archive:
+
+        assert set(archive.getnames()) == set(["data.pkl", "scope.json"])
+
+        with archive.open_member("data.pkl") as member:
+            test = pickle.load(member)
+
+        scope = archive.read_json("scope.json")
+
+    assert (test["array"] == data["array"]).all()
+    assert test["text"] == data["text"]
+    assert scope == "global"
+
+
+def test_archive_compressed(tmpdir, data):
+
+    plain_path = str(tmpdir.join("plain.dto"))
+    gzip_path = str(tmpdir.join("gzip.dto"))
+
+    for path, compression in [(plain_path, "none"), (gzip_path, "gzip")]:
+        with ArchiveWriter(path, compression) as archive:
+            archive.write_bytes("data.pkl", pickle.dumps(data, -1))
+
+    assert tmpdir.join("gzip.dto").size() < tmpdir.join("plain.dto").size()
+
+
+def test_archive_is_tar(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path, "gzip") as archive:
+        archive.write_bytes("data.txt", "Hello")
+        archive.write_json("scope.json", "global")
+
+    tar = tarfile.open(archive_path)
+
+    assert tar.getnames() == ["data.txt.gz", "scope.json"]
+
+
+def test_archive_legacy(tmpdir):
+
+    src_path = tmpdir.join("scope.json")
+    src_path.write('"global"')
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    tar = tarfile.open(archive_path, "w")
+    tar.add(str(src_path), arcname="scope.json")
+    tar.close()
+
+    with ArchiveReader(archive_path) as archive:
+        scope = archive.read_json("scope.json")
+
+    assert scope == "global"
+
+
+def test_archive_readline(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path, "gzip") as archive:
+        archive.write_bytes("lines.txt", "one\ntwo\nthree")
+
+    with ArchiveReader(archive_path) as archive:
+        with archive.open_member("lines.txt") as member:
+            lines = [member.readline() for _ in range(4)]
+
+    assert lines == ["one\n", "two\n", "three", ""]
+
+
+def test_archive_extract_member(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path, "bz2") as archive:
+        archive.write_bytes("data.txt", "Hello")
+
+    file_path = str(tmpdir.join("data.txt"))
+
+    with ArchiveReader(archive_path) as archive:
+        archive.extract_member("data.txt", file_path)
+
+    assert tmpdir.join("data.txt").read() == "Hello"
+
+
+def test_archive_missing_member(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path) as archive:
+        archive.write_bytes("data.txt", "Hello")
+
+    with ArchiveReader(archive_path) as archive:
+        with pytest.raises(KeyError):
+            archive.open_member("bad.txt")
+
+
+def test_archive_replaces_atomically(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path) as archive:
+        archive.write_bytes("data.txt", "Hello")
+
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(archive_path) as archive:
+            archive.write_bytes("data.txt", "Goodbye")
+            raise RuntimeError("Save failed")
+
+    # The original archive survives and no partial files remain
+    assert tmpdir.listdir() == [tmpdir.join("test.dto")]
+
+    with ArchiveReader(archive_path) as archive:
+        assert archive.read_bytes("data.txt") == "Hello"
+
+
+def test_archive_open_member_unclosed(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path) as archive:
+
+        archive.open_member("one.txt")
+
+        with pytest.raises(RuntimeError):
+            archive.open_member("two.txt")
+
+
+def test_get_codec_bad():
+
+    with pytest.raises(ValueError) as excinfo:
+        get_codec("bad")
+
+    assert "bad" in str(excinfo)
+
+
+def test_archive_copy_member(tmpdir, data):
+
+    src_path = str(tmpdir.join("src.dto"))
+    dst_path = str(tmpdir.join("dst.dto"))
+
+    with ArchiveWriter(src_path, "bz2") as archive:
+        archive.write_bytes("data.pkl", pickle.dumps(data, -1))
+
+    with ArchiveReader(src_path) as reader, \
+                            ArchiveWriter(dst_path, "gzip") as archive:
+        archive.copy_member(reader, "data.pkl")
+
+    # The member keeps its original compression
+    tar = tarfile.open(dst_path)
+    assert tar.getnames() == ["data.pkl.bz2"]
+
+    with ArchiveReader(dst_path) as archive:
+        test = pickle.loads(archive.read_bytes("data.pkl"))
+
+    assert (test["array"] == data["array"]).all()
+
+
+def test_archive_append(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path) as archive:
+        archive.write_bytes("one.txt", "One")
+        archive.write_bytes("two.txt", "Two")
+
+    with ArchiveWriter(archive_path, append=True) as archive:
+        archive.write_bytes("two.txt", "Three")
+
+    with ArchiveReader(archive_path) as archive:
+
+        assert set(archive.getnames()) == set(["one.txt", "two.txt"])
+        assert archive.get_version_count("two.txt") == 2
+        assert archive.read_bytes("one.txt") == "One"
+        assert archive.read_bytes("two.txt") == "Three"
+
+        with archive.open_member_version("two.txt", -2) as member:
+            assert member.read() == "Two"
+
+
+def test_archive_append_abort(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path) as archive:
+        archive.write_bytes("data.txt", "Hello")
+
+    size = tmpdir.join("test.dto").size()
+
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(archive_path, append=True) as archive:
+            archive.write_bytes("data.txt", "Goodbye")
+            raise RuntimeError("Save failed")
+
+    assert tmpdir.join("test.dto").size() == size
+
+    with ArchiveReader(archive_path) as archive:
+        assert archive.get_version_count("data.txt") == 1
+        assert archive.read_bytes("data.txt") == "Hello"
+
+
+def test_archive_commit_name(tmpdir):
+
+    archive_path = str(tmpdir.join("test.dto"))
+
+    with ArchiveWriter(archive_path) as archive:
+        archive.write_bytes("data.txt", "Hello")
+        archive.write_json("manifest.json", {})
+
+    # An append interrupted before its manifest was written
+    with ArchiveWriter(archive_path, append=True) as archive:
+        archive.write_bytes("data.txt", "Goodbye")
+        archive.write_bytes("new.txt", "New")
+
+    with ArchiveReader(archive_path, "manifest.json") as archive:
+
+        assert set(archive.getnames()) == set(["data.txt", "manifest.json"])
+        assert archive.get_version_count("data.txt") == 1
+        assert archive.read_bytes("data.txt") == "Hello"
+
+    with ArchiveReader(archive_path) as archive:
+        assert archive.read_bytes("data.txt") == "Goodbye"
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name
+
+import pandas as pd
+import pytest
+from PyQt4 import QtCore, QtGui
+
+from dtocean_app.widgets.datatable import DataTableWidget
+from dtocean_app.widgets.tablemodel import VirtualDataFrameModel
+
+
+@pytest.fixture
+def table(qtbot):
+
+    data = pd.DataFrame({"a": [3, 1, 2, 0],
+                         "b": [0, 1, 4, 9],
+                         "c": ["w", "x", "y", "z"]},
+                        columns=["a", "b", "c"])
+
+    model = VirtualDataFrameModel()
+    model.setDataFrame(data, ["a [m]", "b [s]", "c"])
+
+    widget = DataTableWidget(edit_rows=False, edit_cols=False)
+    widget.setViewModel(model)
+    qtbot.addWidget(widget)
+
+    return widget
+
+
+def select(table, top, left, bottom, right):
+
+    model = table.model()
+    selection = QtGui.QItemSelection(model.index(top, left),
+                                     model.index(bottom, right))
+    table.selectionModel().select(selection,
+                                  QtGui.QItemSelectionModel.Select)
+
+    return
+
+
+def get_clipboard():
+    return str(QtGui.QApplication.clipboard().text())
+
+
+def test_DataTableWidget_copySelection(table):
+
+    select(table, 1, 0, 2, 1)
+    table.copySelection()
+
+    assert get_clipboard() == "1,1\n2,4\n"
+
+
+def test_DataTableWidget_copySelection_sorted(table):
+
+    table.model().sort(0, QtCore.Qt.AscendingOrder)
+
+    select(table, 0, 0, 1, 2)
+    table.copySelection(sep="\t")
+
+    assert get_clipboard() == "0\t9\tz\n1\t1\tx\n"
+
+
+def test_DataTableWidget_copySelection_disjoint(table):
+
+    select(table, 0, 0, 0, 0)
+    select(table, 1, 2, 1, 2)
+    table.copySelection()
+
+    assert get_clipboard() == "3,,\n,,x\n"
+
+
+def test_DataTableWidget_copyTable(table):
+
+    table.copyTable()
+
+    assert get_clipboard() == ("a [m],b [s],c\n"
+                               "3,0,w\n"
+                               "1,1,x\n"
+                               "2,4,y\n"
+                               "0,9,z\n")
@@ -20,7 +20,7 @@
 import pytest
 from PyQt4 import QtCore, QtGui
 
-from dtocean_app.widgets.dialogs import TestDataPicker, About
+from dtocean_app.widgets.dialogs import TestDataPicker, About, ProgressBar
 
 
 @pytest.fixture
@@ -157,3 +157,55 @@ def test_About_pix_many(qtbot, mocker, picture):
     assert widget._effect is not None
     assert widget._fade_in is not None
     assert widget._fade_out is not None
+
+
+def test_ProgressBar_set_status(qtbot):
+    
+    widget = ProgressBar()
+    widget.show()
+    qtbot.addWidget(widget)
+    
+    widget.set_pulsing()
+    
+    status = {"completed": 2,
+              "total": 5,
+              "stage": "Mock Module",
+              "start": 0.,
+              "stage_start": 0.,
+              "elapsed": 0.,
+              "remaining": None,
+              "finish": None}
+    
+    widget.set_status(status)
+    
+    assert widget.progressBar.maximum() == 5
+    assert widget.progressBar.value() == 2
+    assert "Mock Module" in str(widget.detailsLabel.text())
+    
+    widget.set_pulsing()
+    
+    assert widget.progressBar.maximum() == 0
+    assert not str(widget.detailsLabel.text())
+    
+    widget.allow_close = True
+    widget.close()
+
+
+def test_ProgressBar_cancel(qtbot):
+    
+    widget = ProgressBar()
+    widget.show()
+    qtbot.addWidget(widget)
+    
+    assert not widget.cancelButton.isVisible()
+    
+    widget.set_pulsing()
+    widget.set_cancellable(True)
+    
+    with qtbot.waitSignal(widget.cancel_requested):
+        qtbot.mouseClick(widget.cancelButton, QtCore.Qt.LeftButton)
+    
+    assert not widget.cancelButton.isEnabled()
+    
+    widget.allow_close = True
+    widget.close()
@@ -17,10 +17,14 @@
 
 # pylint: disable=redefined-outer-name
 
+import numpy as np
 import pytest
 import matplotlib.pyplot as plt
 
-from dtocean_app.widgets.display import (MPLWidget,
+from dtocean_app.widgets.display import (FigurePool,
+                                         MPLWidget,
+                                         decimate_figure,
+                                         decimate_points,
                                          get_current_filetypes,
                                          save_current_figure,
                                          get_current_figure_size)
@@ -48,6 +52,58 @@ def test_MPLWidget_closing(qtbot, mpl_widget):
     assert blocker.signal_triggered
 
 
+def test_FigurePool_release(qtbot, figure):
+    
+    pool = FigurePool()
+    widget = MPLWidget(figure)
+    pool.add(widget)
+    
+    assert len(pool) == 1
+    
+    pool.release(widget)
+    
+    assert len(pool) == 0
+    assert figure.number not in plt.get_fignums()
+    assert pool.get_counters()["closed"] == 1
+
+
+def test_FigurePool_collect(qtbot, figure):
+    
+    plt.close('all')
+    
+    pool = FigurePool()
+    widget = MPLWidget(figure)
+    pool.add(widget)
+    qtbot.addWidget(widget)
+    
+    fig, _ = plt.subplots()
+    
+    pool.check()
+    
+    assert fig.number not in plt.get_fignums()
+    assert figure.number in plt.get_fignums()
+    assert pool.collected == 1
+
+
+def test_FigurePool_check_too_many(qtbot):
+    
+    plt.close('all')
+    
+    pool = FigurePool(max_figures=1)
+    
+    for _ in range(2):
+        fig, _ = plt.subplots()
+        widget = MPLWidget(fig)
+        pool.add(widget)
+        qtbot.addWidget(widget)
+    
+    with pytest.raises(RuntimeError) as excinfo:
+        pool.check()
+    
+    assert "Too many matplotlib figures" in str(excinfo)
+    
+    plt.close('all')
+
 def test_get_current_filetypes():
     
     plt.figure()
@@ -99,3 +155,46 @@ def test_get_current_figure_size():
     plt.close('all')
     
     assert (test == [8., 6.]).all()
+
+
+def test_decimate_points_small():
+    
+    test = decimate_points([0, 1, 2], [0, 1, 2], max_points=3)
+    
+    assert (test == [0, 1, 2]).all()
+
+
+def test_decimate_points():
+    
+    x = np.random.rand(10000)
+    y = np.random.rand(10000)
+    x[5] = 10.
+    y[7] = np.nan
+    
+    test = decimate_points(x, y, max_points=100)
+    
+    assert len(test) <= 100
+    assert 5 in test
+    assert 7 not in test
+    assert (np.diff(test) > 0).all()
+
+
+def test_decimate_figure():
+    
+    x = np.random.rand(10000)
+    y = np.random.rand(10000)
+    
+    fig, ax = plt.subplots()
+    ax.scatter(x, y, c=x)
+    ax.plot(x, y, "o")
+    
+    decimate_figure(fig, max_points=100)
+    
+    collection = ax.collections[0]
+    line = ax.get_lines()[0]
+    
+    assert len(collection.get_offsets()) <= 100
+    assert len(collection.get_array()) == len(collection.get_offsets())
+    assert len(line.get_xdata()) <= 100
+    
+    plt.close(fig)
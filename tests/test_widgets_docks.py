@@ -19,7 +19,7 @@
 
 import pytest
 
-from dtocean_app.widgets.docks import LogDock
+from dtocean_app.widgets.docks import LogDock, ProfileDock
 from dtocean_app.utils.qtlog import XStream
 
 
@@ -47,3 +47,32 @@ def test_LogDock_stderr(log_dock_widget):
     expected = "mock"
     XStream.stderr().write(expected)
     assert str(log_dock_widget._console.toPlainText()) == expected
+
+
+def test_ProfileDock_update_profile(qtbot):
+    
+    records = [{"simulation": "Default",
+                "stage": "Mock Module",
+                "start": "2022-01-01T00:00:00",
+                "wall_time": 2.,
+                "cpu_time": 1.,
+                "peak_rss": 1024 ** 2},
+               {"simulation": "Default",
+                "stage": "Themes",
+                "start": "2022-01-01T00:00:02",
+                "wall_time": 1.,
+                "cpu_time": 1.,
+                "peak_rss": None}]
+    
+    widget = ProfileDock()
+    qtbot.addWidget(widget)
+    
+    widget._update_profile(records)
+    
+    assert widget.profileTable.rowCount() == 2
+    assert widget.exportButton.isEnabled()
+    
+    widget._update_profile(None)
+    
+    assert widget.profileTable.rowCount() == 0
+    assert not widget.exportButton.isEnabled()
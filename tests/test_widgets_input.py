@@ -336,6 +336,77 @@ def test_InputDataTable_get_dataframe_none():
     assert (df.dtypes == ["int", "int"]).all()
 
 
+def test_InputDataTable_get_dataframe_not_modified():
+    
+    raw_dict = {"val1": [0, 1, 2, 3],
+                "val2": [0, 1, 4, 9]}
+                
+    vals_df = pd.DataFrame(raw_dict)
+    
+    window = InputDataTable(None,
+                            ["Test1", "Test2"],
+                            units=["test", None])
+    df = window._get_dataframe(vals_df)
+    
+    assert list(df.columns) == ["Test1 [test]", "Test2"]
+    assert list(vals_df.columns) == ["val1", "val2"]
+    assert np.shares_memory(df["Test1 [test]"].values, vals_df["val1"].values)
+
+
+def test_InputDataTable_paste_rows(qtbot):
+    
+    raw_dict = {"val1": [0, 1],
+                "val2": [0.5, 1.5]}
+                
+    vals_df = pd.DataFrame(raw_dict, columns=["val1", "val2"])
+    
+    window = InputDataTable(None,
+                            ["Test1", "Test2"],
+                            units=["test", None])
+    window._set_value(vals_df, dtypes=["int", "float"])
+    qtbot.addWidget(window)
+    
+    QtGui.QApplication.clipboard().setText("Test1\tTest2\n2\t2.5\n3\t\n")
+    window._paste_rows()
+    
+    test = window._get_result()
+    
+    assert list(test["Test1"]) == [0, 1, 2, 3]
+    assert np.isnan(test["Test2"].iloc[3])
+    assert list(vals_df["val1"]) == [0, 1]
+
+
+def test_InputDataTable_import_rows(qtbot, tmpdir):
+    
+    p = tmpdir.join("rows.csv")
+    p.write("0,0.5\n1,1.5\n")
+    
+    window = InputDataTable(None,
+                            ["Test1", "Test2"],
+                            units=["test", None])
+    window._set_value(None, dtypes=["int", "float"])
+    qtbot.addWidget(window)
+    
+    window._import_rows(str(p))
+    
+    test = window._get_result()
+    
+    assert list(test["Test1"]) == [0, 1]
+    assert list(test["Test2"]) == [0.5, 1.5]
+
+
+def test_InputDataTable_fixed_index_no_paste(qtbot):
+    
+    window = InputDataTable(None,
+                            ["Name", "Value"],
+                            fixed_index_col="Name",
+                            fixed_index_names=["a", "b"])
+    qtbot.addWidget(window)
+    
+    assert window.pasteAction is None
+    assert window.importAction is None
+
+
 def test_InputLineTable(qtbot):
     
     window = InputLineTable(units=["test", "test"])
@@ -17,6 +17,7 @@
 
 import pytest
 import pandas as pd
+from PyQt4 import QtCore
 
 from dtocean_app.widgets.output import OutputDataTable
 
@@ -50,6 +51,27 @@ def test_OutputDataTable_set_value(qtbot):
 
 
 
+def test_OutputDataTable_set_value_not_modified(qtbot):
+    
+    raw_dict = {"Test1": [0, 1, 2, 3],
+                "Test2": [0, 1, 4, 9]}
+                
+    vals_df = pd.DataFrame(raw_dict)
+    
+    window = OutputDataTable(None,
+                             ["Test1", "Test2"],
+                             units=["test", "test"])
+    window._set_value(vals_df)
+    qtbot.addWidget(window)
+    
+    model = window.datatable.model()
+    header = model.headerData(0, QtCore.Qt.Horizontal).toString()
+    
+    assert list(vals_df.columns) == ["Test1", "Test2"]
+    assert model.dataFrame() is vals_df
+    assert str(header) == "Test1 [test]"
+
+
 def test_OutputDataTable_set_value_None(qtbot):
     
     window = OutputDataTable(None,
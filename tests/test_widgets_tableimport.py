@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dtocean_app.widgets.tableimport import (coerce_column,
+                                             read_table,
+                                             read_table_text)
+
+
+def test_read_table_text_tabs():
+
+    text = "1\t0.5\ta\n2\t1.5\tb\n"
+    data = read_table_text(text, ["x", "y", "z"], ["int", "float", None])
+
+    assert list(data["x"]) == [1, 2]
+    assert data["x"].dtype.kind == "i"
+    assert list(data["y"]) == [0.5, 1.5]
+    assert list(data["z"]) == ["a", "b"]
+
+
+def test_read_table_text_header():
+
+    text = "x [m],y\n1,2\n"
+    data = read_table_text(text, ["x [m]", "y"], ["float", "float"])
+
+    assert len(data) == 1
+    assert list(data.iloc[0]) == [1., 2.]
+
+
+def test_read_table_text_empty():
+
+    data = read_table_text("", ["x", "y"])
+
+    assert data.empty
+    assert list(data.columns) == ["x", "y"]
+
+
+def test_read_table_text_bad_values():
+
+    text = "1,a\nb,2\n3,c\n"
+
+    with pytest.raises(ValueError) as excinfo:
+        read_table_text(text, ["x", "y"], ["int", "float"])
+
+    message = str(excinfo.value)
+
+    assert "'x' (int): 1 bad value(s) in rows 2" in message
+    assert "'y' (float): 2 bad value(s) in rows 1, 3" in message
+
+
+def test_read_table_chunks(tmpdir):
+
+    p = tmpdir.join("table.csv")
+    p.write("\n".join(["{},{}".format(i, i * 0.5) for i in range(25)]))
+
+    data = read_table(str(p), ["x", "y"], ["int", "float"], chunksize=10)
+
+    assert len(data) == 25
+    assert (data.index == range(25)).all()
+    assert data["y"].iloc[-1] == 12.
+
+
+@pytest.mark.parametrize("values, dtype, expected", [
+                            (["true", "No"], "bool", [True, False]),
+                            (["1", "2"], np.int64, [1, 2]),
+                            (["1.5", None], "float64", [1.5, np.nan])])
+def test_coerce_column(values, dtype, expected):
+
+    coerced, bad_rows = coerce_column(pd.Series(values), dtype)
+
+    assert len(bad_rows) == 0
+    assert pd.Series(expected).equals(coerced)
+
+
+def test_coerce_column_bad_int():
+
+    coerced, bad_rows = coerce_column(pd.Series(["1", "1.5", None]), "int")
+
+    assert list(bad_rows) == [1, 2]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+#    Copyright (C) 2022 Mathew Topper
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# pylint: disable=redefined-outer-name
+
+import numpy as np
+import pandas as pd
+import pytest
+from PyQt4 import QtCore
+
+from dtocean_app.widgets.tablemodel import (VirtualDataFrameModel,
+                                            get_unit_labels,
+                                            relabel_view)
+
+
+@pytest.fixture
+def data():
+
+    return pd.DataFrame({"a": [3, 1, 2, 0, 4],
+                         "b": [0.5, np.nan, 1.5, 2.5, 3.5],
+                         "c": ["e", "d", "c", "b", "a"]},
+                        columns=["a", "b", "c"])
+
+
+def get_display(model, row, column):
+
+    index = model.index(row, column)
+
+    return str(model.data(index).toString())
+
+
+def test_VirtualDataFrameModel_data(data):
+
+    model = VirtualDataFrameModel(data)
+
+    assert model.dataFrame() is data
+    assert model.rowCount() == 5
+    assert model.columnCount() == 3
+    assert get_display(model, 0, 0) == "3"
+    assert get_display(model, 0, 1) == "0.5"
+    assert get_display(model, 1, 1) == ""
+    assert get_display(model, 4, 2) == "a"
+
+
+def test_VirtualDataFrameModel_header(data):
+
+    model = VirtualDataFrameModel(data)
+
+    column = model.headerData(2, QtCore.Qt.Horizontal).toString()
+    row = model.headerData(3, QtCore.Qt.Vertical).toString()
+
+    assert str(column) == "c"
+    assert str(row) == "3"
+
+
+def test_VirtualDataFrameModel_fetch(data):
+
+    model = VirtualDataFrameModel(data, fetch_rows=2)
+
+    assert model.rowCount() == 2
+    assert model.canFetchMore()
+
+    model.fetchMore()
+    model.fetchMore()
+
+    assert model.rowCount() == 5
+    assert not model.canFetchMore()
+
+
+@pytest.mark.parametrize("order, expected", [
+                            (QtCore.Qt.AscendingOrder, ["0", "1", "2"]),
+                            (QtCore.Qt.DescendingOrder, ["4", "3", "2"])])
+def test_VirtualDataFrameModel_sort(data, order, expected):
+
+    model = VirtualDataFrameModel(data)
+    model.sort(0, order)
+
+    result = [get_display(model, row, 0) for row in range(3)]
+
+    assert result == expected
+    assert list(data["a"]) == [3, 1, 2, 0, 4]
+
+
+def test_VirtualDataFrameModel_not_editable(data):
+
+    model = VirtualDataFrameModel(data)
+    flags = model.flags(model.index(0, 0))
+
+    assert not flags & QtCore.Qt.ItemIsEditable
+
+
+def test_VirtualDataFrameModel_column_labels(data):
+
+    model = VirtualDataFrameModel()
+    model.setDataFrame(data, ["A [m]", "B [s]", "C"])
+
+    column = model.headerData(1, QtCore.Qt.Horizontal).toString()
+
+    assert str(column) == "B [s]"
+    assert list(data.columns) == ["a", "b", "c"]
+
+
+def test_VirtualDataFrameModel_column_labels_bad(data):
+
+    model = VirtualDataFrameModel()
+
+    with pytest.raises(ValueError):
+        model.setDataFrame(data, ["A [m]"])
+
+
+def test_get_unit_labels():
+
+    labels = get_unit_labels(["a", "b"], ["m", None])
+
+    assert labels == ["a [m]", "b"]
+
+
+def test_relabel_view(data):
+
+    view = relabel_view(data, ["A", "B", "C"])
+
+    assert list(view.columns) == ["A", "B", "C"]
+    assert list(data.columns) == ["a", "b", "c"]
+    assert np.shares_memory(view["A"].values, data["a"].values)